@@ -0,0 +1,178 @@
+import os
+from contextlib import asynccontextmanager
+
+from flask import Flask
+from flask_jwt_extended import JWTManager, decode_token
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt.exceptions import PyJWTError
+from sqlalchemy import select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from App.config import load_config
+from App.database import engine_options, configure_engine
+from App.models import Job, User
+from App.controllers.controllers import (
+    job_page_size,
+    jobs_page_statement,
+    jobs_page,
+    job_seeker_exists_statement,
+    job_seeker_applications_statement,
+    job_seeker_application_statement,
+    format_application_statuses,
+    format_application_status
+)
+
+# Asyncio read tier for job and application status reads.
+# It runs next to the Flask app against the same database, models and query
+# statements, through SQLAlchemy's async engine (aiosqlite for the default
+# SQLite file). Serve it with:
+#
+#   uvicorn --factory App.async_api:create_async_app --port 8081
+#   gunicorn -k uvicorn.workers.UvicornWorker "App.async_api:create_async_app()"
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql',
+}
+
+
+# Maps the Flask app's SQLALCHEMY_DATABASE_URI onto its asyncio driver.
+# Relative SQLite paths are resolved against the instance folder, like Flask-SQLAlchemy does.
+def async_database_url(uri, instance_path):
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No asyncio driver configured for '{backend}' databases.")
+    url = url.set(drivername=ASYNC_DRIVERS[backend])
+    if backend == 'sqlite' and url.database and url.database != ':memory:' and not os.path.isabs(url.database):
+        url = url.set(database=os.path.join(instance_path, url.database))
+    return url
+
+
+def _not_found(message):
+    return JSONResponse({'error': message}, status_code=404)
+
+# The (id, user_type) of the user whose access token came with the request, in the
+# Authorization header or the access cookie, or None without a valid one. Tokens are
+# checked by flask_jwt_extended against the Flask app's configuration.
+async def _current_user(request, session):
+    config = request.app.state.config
+    header = request.headers.get('Authorization', '')
+    token = header[len('Bearer '):] if header.startswith('Bearer ') else request.cookies.get(config['JWT_ACCESS_COOKIE_NAME'])
+    if not token:
+        return None
+    try:
+        with request.app.state.config_app.app_context():
+            claims = decode_token(token)
+    except (JWTExtendedException, PyJWTError):
+        return None
+    return (await session.execute(
+        select(User.id, User.user_type).where(User.id == int(claims['sub']), User.deleted_at.is_(None))
+    )).first()
+
+# Like the Flask routes: a job seeker's applications are theirs and the admins' to read
+async def _job_seeker_forbidden(request, session, job_seeker_id):
+    user = await _current_user(request, session)
+    if user is None:
+        return JSONResponse({'error': 'Missing or invalid access token.'}, status_code=401)
+    if user.user_type != 'admin' and user.id != job_seeker_id:
+        return JSONResponse({'message': 'only the job seeker can see their applications'}, status_code=403)
+    return None
+
+def _int_param(request, name):
+    value = request.query_params.get(name)
+    return int(value) if value not in (None, '') else None
+
+
+async def list_jobs_endpoint(request):
+    config = request.app.state.config
+    try:
+        limit = job_page_size(_int_param(request, 'limit'), config)
+        statement = jobs_page_statement(limit, request.query_params.get('after'))
+    except ValueError as e:
+        return JSONResponse({'error': str(e)}, status_code=400)
+    async with request.app.state.sessions() as session:
+        jobs = (await session.scalars(statement)).all()
+    jobs, next_cursor = jobs_page(jobs, limit)
+    return JSONResponse({'jobs': [job.get_json() for job in jobs], 'next': next_cursor})
+
+async def get_job_endpoint(request):
+    job_id = request.path_params['job_id']
+    async with request.app.state.sessions() as session:
+        job = await session.scalar(select(Job).where(Job.id == job_id, Job.deleted_at.is_(None)))
+    if not job:
+        return _not_found(f"Job with ID {job_id} does not exist.")
+    return JSONResponse(job.get_json())
+
+async def view_job_status_all_endpoint(request):
+    job_seeker_id = request.path_params['job_seeker_id']
+    async with request.app.state.sessions() as session:
+        forbidden = await _job_seeker_forbidden(request, session, job_seeker_id)
+        if forbidden:
+            return forbidden
+        if not await session.scalar(job_seeker_exists_statement(job_seeker_id)):
+            return _not_found(f"Job Seeker with ID {job_seeker_id} does not exist.")
+        rows = (await session.execute(job_seeker_applications_statement(job_seeker_id))).all()
+    return JSONResponse({'applications': format_application_statuses(rows)})
+
+async def view_job_status_endpoint(request):
+    job_seeker_id = request.path_params['job_seeker_id']
+    application_id = request.path_params['application_id']
+    async with request.app.state.sessions() as session:
+        forbidden = await _job_seeker_forbidden(request, session, job_seeker_id)
+        if forbidden:
+            return forbidden
+        row = (await session.execute(job_seeker_application_statement(job_seeker_id, application_id))).first()
+        if not row:
+            if not await session.scalar(job_seeker_exists_statement(job_seeker_id)):
+                return _not_found(f"Job Seeker with ID {job_seeker_id} does not exist.")
+            return _not_found(f"Application with ID {application_id} does not exist for Job Seeker {job_seeker_id}.")
+    return JSONResponse({'status': format_application_status(row)})
+
+async def health_endpoint(request):
+    return JSONResponse({'status': 'healthy'})
+
+
+def create_async_app(overrides={}):
+    # A bare Flask app only to load the same configuration and instance folder as create_app(),
+    # and to check access tokens with
+    config_app = Flask('App')
+    load_config(config_app, overrides)
+    JWTManager(config_app)
+    config = config_app.config
+
+    engine = create_async_engine(
+        async_database_url(config['SQLALCHEMY_DATABASE_URI'], config_app.instance_path),
+        **engine_options(config)
+    )
+    # Same pool settings and SQLite pragmas as the Flask app's engine
+    configure_engine(engine.sync_engine, config)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        await engine.dispose()
+
+    routes = [
+        Route('/api/jobs', list_jobs_endpoint),
+        Route('/api/jobs/{job_id:int}', get_job_endpoint),
+        Route('/health', health_endpoint),
+    ]
+    # Sharded applications (DB_SHARDS) are only read through the Flask app's routing session
+    if not config['DB_SHARDS']:
+        routes[2:2] = [
+            Route('/api/job_seekers/{job_seeker_id:int}/applications', view_job_status_all_endpoint),
+            Route('/api/job_seekers/{job_seeker_id:int}/applications/{application_id:int}', view_job_status_endpoint),
+        ]
+    app = Starlette(routes=routes, lifespan=lifespan)
+    app.state.config = config
+    app.state.config_app = config_app
+    app.state.engine = engine
+    app.state.sessions = sessions
+    return app
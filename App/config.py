@@ -15,5 +15,40 @@ def load_config(app, overrides):
     app.config["JWT_COOKIE_SECURE"] = True
     app.config["JWT_COOKIE_CSRF_PROTECT"] = False
     app.config['FLASK_ADMIN_SWATCH'] = 'darkly'
+    app.config.setdefault('JOB_PAGE_SIZE', 20)
+    app.config.setdefault('JOB_PAGE_SIZE_MAX', 100)
+    app.config.setdefault('USER_CACHE_SIZE', 1024)
+    app.config.setdefault('USER_CACHE_TTL', 60)
+    app.config.setdefault('PASSWORD_HASH_METHOD', 'pbkdf2:sha256')
+    app.config.setdefault('PASSWORD_SALT_LENGTH', 16)
+    app.config.setdefault('PASSWORD_HASH_WORKERS', os.cpu_count())
+    app.config.setdefault('DB_POOL_SIZE', 10)
+    app.config.setdefault('DB_MAX_OVERFLOW', 20)
+    app.config.setdefault('DB_POOL_TIMEOUT', 30)
+    app.config.setdefault('DB_POOL_RECYCLE', 1800)
+    app.config.setdefault('DB_POOL_PRE_PING', True)
+    app.config.setdefault('DB_GEVENT_WAIT_CALLBACK', True)
+    app.config.setdefault('DB_REPLICAS', [])
+    app.config.setdefault('DB_SHARDS', [])
+    app.config.setdefault('SQLITE_JOURNAL_MODE', 'WAL')
+    app.config.setdefault('SQLITE_BUSY_TIMEOUT', 5000)
+    app.config.setdefault('SQLITE_SYNCHRONOUS', 'NORMAL')
+    app.config.setdefault('SQLITE_FOREIGN_KEYS', True)
+    app.config.setdefault('SOFT_DELETE', False)
+    app.config.setdefault('PURGE_BATCH_SIZE', 500)
+    app.config.setdefault('ARCHIVE_AFTER_DAYS', 365)
+    app.config.setdefault('ARCHIVE_BATCH_SIZE', 500)
+    app.config.setdefault('EVENTS_POLL_INTERVAL', 1.0)
+    app.config.setdefault('EVENTS_LONG_POLL_TIMEOUT', 25)
+    app.config.setdefault('EVENTS_HEARTBEAT', 15)
+    app.config.setdefault('EVENTS_PAGE_SIZE', 100)
+    app.config.setdefault('RECOMMEND_LIMIT', 10)
+    app.config.setdefault('RECOMMEND_SYNC_BATCH_SIZE', 500)
+    app.config.setdefault('METRICS_ENABLED', True)
+    app.config.setdefault('METRICS_DIR', None)
+    app.config.setdefault('METRICS_FLUSH_INTERVAL', 5)
+    app.config.setdefault('METRICS_LATENCY_BUCKETS', (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10))
+    app.config.setdefault('METRICS_SLOW_REQUEST_SECONDS', None)
+    app.config.setdefault('METRICS_SLOW_REQUEST_QUERIES', 10)
     for key in overrides:
         app.config[key] = overrides[key]
\ No newline at end of file
@@ -1,4 +1,17 @@
 from .user import *
+from .user_cache import *
 from .auth import *
 from .initialize import *
 from .controllers import *
+from .read_models import *
+from .search import *
+from .recommend import *
+from .bulk_import import *
+from .versions import *
+from .counters import *
+from .shards import *
+from .categories import *
+from .events import *
+from .export import *
+from .purge import *
+from .archive import *
@@ -0,0 +1,160 @@
+from collections import Counter
+from datetime import datetime, timedelta
+
+from flask import abort, current_app
+from sqlalchemy import DateTime, and_, delete, exists, insert, literal, or_, select
+from App.models import db, Job, Application, ArchivedJob, ArchivedApplication
+from App.database import read_only
+from .search import unindex_jobs
+from .recommend import recommender_remove_jobs
+from .versions import bump_versions, ALL_JOBS, ARCHIVE, employer_scope
+from .counters import adjust_counters, removed_applications_changes
+from .categories import adjust_category_counts, removed_jobs_category_deltas
+from .shards import is_sharded, jobs_by_shard, scatter, delete_sharded_applications
+from .controllers import (
+    _removed_jobs_scopes,
+    decode_job_cursor,
+    jobs_page,
+    job_page_size,
+    job_seeker_exists_statement,
+    format_application_statuses
+)
+
+# Moves jobs posted before a cutoff, with their applications, out of the jobs
+# and applications tables into archived_jobs and archived_applications, oldest
+# first, one bounded transaction at a time: a batch takes whole jobs until
+# their rows plus their applications (read from Job.applicant_count) would
+# exceed batch_size. The hot tables and their indexes only hold live postings,
+# and the archive stays readable through the /api/archive endpoints.
+#
+# Archived jobs leave everything derived from the open jobs the way a removed
+# job does: the search index, the category facets, the recommender and the
+# application counts of their applicants. Only run one archiver at a time.
+
+ARCHIVED_JOB_COLUMNS = (
+    'id', 'category', 'category_id', 'description', 'date_posted', 'employer_id',
+    'applicant_count', 'pending_count', 'accepted_count', 'rejected_count',
+)
+ARCHIVED_APPLICATION_COLUMNS = ('application_id', 'job_seeker_id', 'job_id', 'application_text', 'is_accepted')
+
+
+# The date_posted before which jobs are archived, older_than_days (default ARCHIVE_AFTER_DAYS) before now
+def archive_cutoff(older_than_days=None):
+    if older_than_days is None:
+        older_than_days = current_app.config['ARCHIVE_AFTER_DAYS']
+    if older_than_days < 0:
+        raise ValueError("The age of archived jobs cannot be negative.")
+    return datetime.utcnow() - timedelta(days=older_than_days)
+
+# The oldest open jobs posted before the cutoff, as many whole jobs as fit in batch_size rows
+def _archive_job_ids(cutoff, batch_size):
+    rows = db.session.execute(
+        select(Job.id, Job.applicant_count)
+        .where(Job.date_posted < cutoff, Job.deleted_at.is_(None))
+        .order_by(Job.date_posted, Job.id)
+        .limit(batch_size)
+    ).all()
+    job_ids, moved = [], 0
+    for job_id, applicants in rows:
+        # A job with more applicants than a batch holds still goes, alone
+        if job_ids and moved + 1 + applicants > batch_size:
+            break
+        job_ids.append(job_id)
+        moved += 1 + applicants
+    return job_ids
+
+# Archives the next batch of jobs posted before the cutoff, in its own transaction.
+# Returns (jobs, applications) archived, or None when no job is left to archive
+def archive_batch(cutoff, batch_size=None):
+    batch_size = batch_size or current_app.config['ARCHIVE_BATCH_SIZE']
+    job_ids = _archive_job_ids(cutoff, batch_size)
+    if not job_ids:
+        db.session.rollback()
+        return None
+    jobs, applications = Job.__table__, Application.__table__
+    db.session.execute(insert(ArchivedJob.__table__).from_select(
+        [*ARCHIVED_JOB_COLUMNS, 'archived_at'],
+        select(*[jobs.c[column] for column in ARCHIVED_JOB_COLUMNS], literal(datetime.utcnow(), DateTime))
+        .where(jobs.c.id.in_(job_ids))
+    ))
+    shards = list(jobs_by_shard(job_ids))
+    applications_of_jobs = select(*[applications.c[column] for column in ARCHIVED_APPLICATION_COLUMNS]).where(applications.c.job_id.in_(job_ids))
+    if is_sharded():
+        # The archive is on the primary, the applications are not: they come over through Python
+        rows = [row._asdict() for row in scatter(applications_of_jobs, shards)]
+        if rows:
+            db.session.execute(insert(ArchivedApplication.__table__), rows)
+        archived_applications = len(rows)
+    else:
+        archived_applications = db.session.execute(
+            insert(ArchivedApplication.__table__).from_select(ARCHIVED_APPLICATION_COLUMNS, applications_of_jobs)
+        ).rowcount
+
+    unindex_jobs(job_ids)
+    adjust_category_counts(removed_jobs_category_deltas(Job.id.in_(job_ids)))
+    employer_ids = db.session.scalars(select(Job.employer_id).where(Job.id.in_(job_ids)).distinct())
+    bump_versions(ALL_JOBS, ARCHIVE, *map(employer_scope, employer_ids), *_removed_jobs_scopes(job_ids))
+    adjust_counters(removed_applications_changes(Application.job_id.in_(job_ids), shards))
+    delete_sharded_applications(Application.job_id.in_(job_ids), shards)
+    db.session.execute(delete(Application).where(Application.job_id.in_(job_ids)))
+    db.session.execute(delete(Job).where(Job.id.in_(job_ids)))
+    db.session.commit()
+    recommender_remove_jobs(job_ids)
+    return len(job_ids), archived_applications
+
+# Controller function to archive the jobs posted before the cutoff, and their applications, in batches [ADMIN]
+# Stops after max_batches transactions if given; returns a Counter of the rows archived by kind
+def archive_jobs(cutoff, batch_size=None, max_batches=None):
+    archived = Counter()
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        result = archive_batch(cutoff, batch_size)
+        if result is None:
+            break
+        archived['jobs'] += result[0]
+        archived['applications'] += result[1]
+        batches += 1
+    return archived
+
+# Controller function to list one page of archived jobs, newest first [ALL_USERS]
+# Takes the same cursors as the job listing; employer_id keeps only that employer's jobs
+@read_only
+def list_archived_jobs(limit=None, after=None, employer_id=None):
+    limit = job_page_size(limit, current_app.config)
+    statement = select(ArchivedJob).order_by(ArchivedJob.date_posted.desc(), ArchivedJob.id.desc())
+    if employer_id is not None:
+        statement = statement.where(ArchivedJob.employer_id == employer_id)
+    if after:
+        date_posted, job_id = decode_job_cursor(after)
+        statement = statement.where(or_(
+            ArchivedJob.date_posted < date_posted,
+            and_(ArchivedJob.date_posted == date_posted, ArchivedJob.id < job_id)
+        ))
+    jobs = db.session.scalars(statement.limit(limit + 1)).all()
+    return jobs_page(jobs, limit)
+
+# Controller function to view a single archived job [ALL_USERS]
+@read_only
+def get_archived_job(job_id):
+    return db.session.get(ArchivedJob, job_id)
+
+# Controller function to retrieve the applications of an archived job [EMPLOYER]
+@read_only
+def get_archived_applicants(job_id):
+    if not db.session.query(exists().where(ArchivedJob.id == job_id)).scalar():
+        abort(404)
+    return db.session.scalars(
+        select(ArchivedApplication).where(ArchivedApplication.job_id == job_id).order_by(ArchivedApplication.application_id)
+    ).all()
+
+# Controller function for job seekers to view the status of their archived applications [JOB_SEEKER]
+@read_only
+def view_archived_job_status_all(job_seeker_id):
+    if not db.session.execute(job_seeker_exists_statement(job_seeker_id)).scalar():
+        return f"Job Seeker with ID {job_seeker_id} does not exist."
+    return format_application_statuses(db.session.execute(
+        select(ArchivedApplication.job_id, ArchivedJob.category, ArchivedJob.description, ArchivedApplication.is_accepted)
+        .join(ArchivedJob, ArchivedApplication.job_id == ArchivedJob.id)
+        .where(ArchivedApplication.job_seeker_id == job_seeker_id)
+        .order_by(ArchivedApplication.application_id)
+    ))
@@ -1,9 +1,10 @@
-from flask_jwt_extended import create_access_token, jwt_required, JWTManager, get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended import create_access_token, jwt_required, JWTManager, get_jwt_identity, get_current_user, verify_jwt_in_request
 
 from App.models import User
+from .user_cache import setup_user_cache, get_cached_user
 
 def login(username, password):
-  user = User.query.filter_by(username=username).first()
+  user = User.query.filter_by(username=username, deleted_at=None).first()
   if user and user.check_password(password):
     return create_access_token(identity=username)
   return None
@@ -11,19 +12,21 @@ def login(username, password):
 
 def setup_jwt(app):
   jwt = JWTManager(app)
+  setup_user_cache(app)
 
   # configure's flask jwt to resolve get_current_identity() to the corresponding user's ID
+  # (as a string, since PyJWT rejects tokens whose subject is not one)
   @jwt.user_identity_loader
   def user_identity_lookup(identity):
-    user = User.query.filter_by(username=identity).one_or_none()
+    user = User.query.filter_by(username=identity, deleted_at=None).one_or_none()
     if user:
-        return user.id
+        return str(user.id)
     return None
 
   @jwt.user_lookup_loader
   def user_lookup_callback(_jwt_header, jwt_data):
     identity = jwt_data["sub"]
-    return User.query.get(identity)
+    return get_cached_user(identity)
 
   return jwt
 
@@ -32,13 +35,11 @@ def setup_jwt(app):
 def add_auth_context(app):
   @app.context_processor
   def inject_user():
+      # Anonymous requests are expected here, so a missing token is not an error;
+      # the user comes from the same per-request lookup as flask_jwt_extended.current_user
       try:
-          verify_jwt_in_request()
-          user_id = get_jwt_identity()
-          current_user = User.query.get(user_id)
-          is_authenticated = True
-      except Exception as e:
-          print(e)
-          is_authenticated = False
+          verify_jwt_in_request(optional=True)
+          current_user = get_current_user()
+      except Exception:
           current_user = None
-      return dict(is_authenticated=is_authenticated, current_user=current_user)
\ No newline at end of file
+      return dict(is_authenticated=current_user is not None, current_user=current_user)
\ No newline at end of file
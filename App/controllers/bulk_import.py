@@ -0,0 +1,275 @@
+import csv
+import json
+from collections import Counter
+from itertools import islice
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from App.models import db, User, Admin, Employer, JobSeeker, Job, Application
+from App.passwords import hash_passwords
+from .search import index_jobs
+from .versions import bump_versions, ALL_JOBS, employer_scope, job_scope, job_seeker_scope
+from .counters import adjust_counters
+from .categories import category_ids, category_key, adjust_category_counts
+from .shards import is_sharded, jobs_by_shard, scatter, insert_sharded_applications
+
+# Bulk import reads CSV or JSONL files lazily and processes them in chunks.
+# Each chunk is validated with one query per lookup (usernames, emails, ids),
+# inserted with a single executemany per table and committed on its own, so a
+# bad row or a failed chunk never aborts the rest of the run.
+
+DEFAULT_CHUNK_SIZE = 500
+
+USER_ROLES = {'admin': Admin, 'employer': Employer, 'job_seeker': JobSeeker}
+
+
+class ImportReport:
+    def __init__(self, kind):
+        self.kind = kind
+        self.created = 0
+        self.errors = []
+
+    def error(self, line, message):
+        self.errors.append((line, message))
+
+    def get_json(self):
+        return {
+            'created': self.created,
+            'errors': [{'line': line, 'message': message} for line, message in sorted(self.errors)]
+        }
+
+    def __str__(self):
+        lines = [f"Imported {self.created} {self.kind}, {len(self.errors)} rows rejected."]
+        lines += [f"  line {line}: {message}" for line, message in sorted(self.errors)]
+        return "\n".join(lines)
+
+
+# Yields (line number, row dict or None, parse error or None) from a .csv or .jsonl file
+def read_rows(path):
+    if path.lower().endswith('.csv'):
+        with open(path, newline='', encoding='utf-8') as file:
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row, None
+        return
+
+    with open(path, encoding='utf-8') as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield line_number, None, f"Invalid JSON: {e}"
+                continue
+            if not isinstance(row, dict):
+                yield line_number, None, "Expected a JSON object."
+                continue
+            yield line_number, row, None
+
+# Yields rows from a list of dicts (e.g. a JSON request body) the way read_rows does, numbered from 1
+def json_rows(items):
+    for number, row in enumerate(items, start=1):
+        if isinstance(row, dict):
+            yield number, row, None
+        else:
+            yield number, None, "Expected a JSON object."
+
+def _chunks(rows, chunk_size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def _missing(row, fields):
+    missing = [field for field in fields if row.get(field) in (None, '')]
+    if missing:
+        return f"Missing {', '.join(missing)}."
+    return None
+
+# JSON rows can hold lists, numbers or objects where text belongs
+def _not_text(row, fields):
+    wrong = [field for field in fields if row.get(field) is not None and not isinstance(row[field], str)]
+    if wrong:
+        return f"{', '.join(wrong)} must be text."
+    return None
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+# Runs one chunk's inserts in its own transaction, rejecting the whole chunk if the database refuses it
+def _commit_chunk(report, lines, insert_chunk):
+    if not lines:
+        return
+    try:
+        insert_chunk()
+        db.session.commit()
+        report.created += len(lines)
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        message = str(getattr(e, 'orig', e))
+        for line in lines:
+            report.error(line, f"Chunk rejected by the database: {message}")
+
+
+# Controller function to import users from CSV/JSONL rows [ADMIN]
+# Rows need username, password, email and role; employers may give company_name
+def import_users(rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    report = ImportReport('users')
+    for chunk in _chunks(rows, chunk_size):
+        # Earlier chunks are found in the database once committed; a rejected one leaves nothing behind
+        seen_usernames, seen_emails = set(), set()
+        candidates = []
+        for line, row, error in chunk:
+            error = error or _missing(row, ['username', 'password', 'email', 'role'])
+            error = error or _not_text(row, ['username', 'password', 'email', 'role', 'company_name'])
+            if not error and row['role'] not in USER_ROLES:
+                error = f"Invalid role '{row['role']}'. Choose from 'admin', 'employer', or 'job_seeker'."
+            if error:
+                report.error(line, error)
+            else:
+                candidates.append((line, row))
+
+        usernames = [row['username'] for _, row in candidates]
+        emails = [row['email'] for _, row in candidates]
+        taken_usernames = {name for (name,) in db.session.query(User.username).filter(User.username.in_(usernames))}
+        taken_emails = {email for (email,) in db.session.query(User.email).filter(User.email.in_(emails))}
+
+        accepted = []
+        for line, row in candidates:
+            if row['username'] in taken_usernames or row['username'] in seen_usernames:
+                report.error(line, f"Username '{row['username']}' is already taken.")
+                continue
+            if row['email'] in taken_emails or row['email'] in seen_emails:
+                report.error(line, f"Email '{row['email']}' is already registered.")
+                continue
+            seen_usernames.add(row['username'])
+            seen_emails.add(row['email'])
+            accepted.append((line, row))
+
+        # The chunk's passwords are hashed in parallel instead of one after another
+        hashes = hash_passwords(row['password'] for _, row in accepted)
+        by_role = {role: [] for role in USER_ROLES}
+        lines = []
+        for (line, row), password_hash in zip(accepted, hashes):
+            values = {
+                'username': row['username'],
+                'password': password_hash,
+                'email': row['email'],
+                'user_type': row['role']
+            }
+            if row['role'] == 'employer':
+                values['company_name'] = row.get('company_name') or "DefaultCompany"
+            by_role[row['role']].append(values)
+            lines.append(line)
+
+        def insert_chunk():
+            for role, values in by_role.items():
+                if values:
+                    db.session.execute(insert(USER_ROLES[role]), values)
+        _commit_chunk(report, lines, insert_chunk)
+    return report
+
+# Controller function to import job postings from CSV/JSONL rows [ADMIN]
+# Rows need category, description and employer_id
+def import_jobs(rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    report = ImportReport('jobs')
+    for chunk in _chunks(rows, chunk_size):
+        candidates = []
+        for line, row, error in chunk:
+            error = error or _missing(row, ['category', 'description', 'employer_id'])
+            error = error or _not_text(row, ['category', 'description'])
+            if not error and _as_int(row['employer_id']) is None:
+                error = f"Invalid employer_id '{row['employer_id']}'."
+            if error:
+                report.error(line, error)
+            else:
+                candidates.append((line, row))
+
+        employer_ids = {_as_int(row['employer_id']) for _, row in candidates}
+        existing = {
+            employer_id for (employer_id,)
+            in db.session.query(Employer.id).filter(Employer.id.in_(employer_ids), Employer.deleted_at.is_(None))
+        }
+
+        values, lines = [], []
+        for line, row in candidates:
+            employer_id = _as_int(row['employer_id'])
+            if employer_id not in existing:
+                report.error(line, f"Employer with ID {employer_id} does not exist.")
+                continue
+            values.append({'category': row['category'], 'description': row['description'], 'employer_id': employer_id})
+            lines.append(line)
+
+        def insert_chunk():
+            ids = category_ids(value['category'] for value in values)
+            for value in values:
+                value['category_id'] = ids[category_key(value['category'])]
+            if db.session.get_bind().dialect.insert_executemany_returning:
+                jobs = db.session.scalars(insert(Job).returning(Job), values).all()
+            else:
+                # MySQL has no INSERT ... RETURNING: the ORM inserts row by row and reads each new id
+                jobs = [Job(**value) for value in values]
+                db.session.add_all(jobs)
+                db.session.flush()
+            index_jobs(jobs)
+            adjust_category_counts(Counter(job.category_id for job in jobs))
+            bump_versions(ALL_JOBS, *[employer_scope(job.employer_id) for job in jobs])
+        _commit_chunk(report, lines, insert_chunk)
+    return report
+
+# Controller function to import applications from CSV/JSONL rows [ADMIN]
+# Rows need job_id, job_seeker_id and application_text
+def import_applications(rows, chunk_size=DEFAULT_CHUNK_SIZE):
+    report = ImportReport('applications')
+    for chunk in _chunks(rows, chunk_size):
+        # As for users, only repeats within the chunk; committed chunks are in the database
+        seen = set()
+        candidates = []
+        for line, row, error in chunk:
+            error = error or _missing(row, ['job_id', 'job_seeker_id', 'application_text'])
+            error = error or _not_text(row, ['application_text'])
+            if not error and (_as_int(row['job_id']) is None or _as_int(row['job_seeker_id']) is None):
+                error = "job_id and job_seeker_id must be integers."
+            if error:
+                report.error(line, error)
+            else:
+                candidates.append((line, _as_int(row['job_id']), _as_int(row['job_seeker_id']), row['application_text']))
+
+        job_ids = {job_id for _, job_id, _, _ in candidates}
+        seeker_ids = {seeker_id for _, _, seeker_id, _ in candidates}
+        existing_jobs = {job_id for (job_id,) in db.session.query(Job.id).filter(Job.id.in_(job_ids), Job.deleted_at.is_(None))}
+        existing_seekers = {seeker_id for (seeker_id,) in db.session.query(JobSeeker.id).filter(JobSeeker.id.in_(seeker_ids))}
+        applied = set(scatter(
+            select(Application.job_id, Application.job_seeker_id)
+            .where(Application.job_id.in_(job_ids), Application.job_seeker_id.in_(seeker_ids)),
+            list(jobs_by_shard(job_ids))
+        ))
+
+        values, lines = [], []
+        for line, job_id, seeker_id, text in candidates:
+            if job_id not in existing_jobs:
+                report.error(line, f"Job with ID {job_id} does not exist.")
+            elif seeker_id not in existing_seekers:
+                report.error(line, f"Job Seeker with ID {seeker_id} does not exist.")
+            elif (job_id, seeker_id) in applied or (job_id, seeker_id) in seen:
+                report.error(line, f"Job Seeker {seeker_id} has already applied for Job {job_id}.")
+            else:
+                seen.add((job_id, seeker_id))
+                values.append({'job_id': job_id, 'job_seeker_id': seeker_id, 'application_text': text})
+                lines.append(line)
+
+        def insert_chunk():
+            if is_sharded():
+                insert_sharded_applications(values)
+            else:
+                db.session.execute(insert(Application), values)
+            adjust_counters((row['job_id'], row['job_seeker_id'], None, 1) for row in values)
+            bump_versions(*[job_scope(row['job_id']) for row in values], *[job_seeker_scope(row['job_seeker_id']) for row in values])
+        _commit_chunk(report, lines, insert_chunk)
+    return report
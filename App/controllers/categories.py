@@ -0,0 +1,126 @@
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from App.models import db, Job, Category, CategoryFacet
+from App.database import read_only, dialect_insert
+from .versions import bump_versions, ALL_JOBS
+
+# Categories are normalized into the categories table: jobs posted as
+# "Data Analyst", "data analyst" or "Data  Analyst " all point at one row
+# (Job.category_id), and Job.category keeps the text as posted.
+# category_facets holds the number of open jobs per category. Writers keep it
+# up to date in the transaction that adds or removes jobs, so the facet counts
+# and the category filter of the listing are index lookups instead of a scan
+# and a group-by. `flask admin rebuild_categories` links jobs without a
+# category and recounts every facet.
+
+
+# The lookup form of a category: spacing collapsed, case folded
+def category_key(name):
+    return " ".join((name or '').split()).casefold()[:100]
+
+def _display_name(name):
+    return " ".join((name or '').split())[:100]
+
+# Ids of the categories of these names by category_key, creating the missing
+# ones inside the caller's transaction
+def category_ids(names):
+    wanted = {}
+    for name in names:
+        wanted.setdefault(category_key(name), _display_name(name))
+    table = Category.__table__
+    ids = dict(db.session.execute(select(table.c.key, table.c.id).where(table.c.key.in_(wanted))).all())
+    missing = [{'key': key, 'name': name} for key, name in wanted.items() if key not in ids]
+    if missing:
+        dialect = db.session.get_bind().dialect.name
+        if dialect in ('sqlite', 'postgresql'):
+            # Another writer may add the same category in between; its row is as good as ours
+            db.session.execute(dialect_insert(dialect)(table).on_conflict_do_nothing(index_elements=[table.c.key]), missing)
+        else:
+            db.session.execute(insert(table), missing)
+        ids.update(db.session.execute(
+            select(table.c.key, table.c.id).where(table.c.key.in_([row['key'] for row in missing]))
+        ).all())
+    return ids
+
+# Applies {category_id: change in open jobs} inside the caller's transaction
+def adjust_category_counts(deltas):
+    rows = [{'category_id': category_id, 'job_count': delta} for category_id, delta in sorted(deltas.items()) if category_id is not None and delta]
+    if not rows:
+        return
+    table = CategoryFacet.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        upsert = dialect_insert(dialect)(table)
+        db.session.execute(upsert.on_conflict_do_update(
+            index_elements=[table.c.category_id],
+            set_={'job_count': table.c.job_count + upsert.excluded.job_count}
+        ), rows)
+        return
+    for row in rows:
+        result = db.session.execute(
+            update(table).where(table.c.category_id == row['category_id']).values(job_count=table.c.job_count + row['job_count'])
+        )
+        if not result.rowcount:
+            db.session.execute(insert(table), row)
+
+# Facet changes that take back every open job matching the condition, grouped in SQL.
+# Called before the jobs are deleted or soft deleted
+def removed_jobs_category_deltas(condition):
+    rows = db.session.execute(
+        select(Job.category_id, func.count())
+        .where(condition, Job.deleted_at.is_(None))
+        .group_by(Job.category_id)
+    )
+    return {category_id: -count for category_id, count in rows}
+
+def recount_category_facets():
+    table = CategoryFacet.__table__
+    db.session.execute(delete(table))
+    db.session.execute(insert(table).from_select(
+        ['category_id', 'job_count'],
+        select(Job.category_id, func.count())
+        .where(Job.category_id.is_not(None), Job.deleted_at.is_(None))
+        .group_by(Job.category_id)
+    ))
+
+# Controller function to link every job to its category and recount the facets [ADMIN]
+def rebuild_categories(batch_size=500):
+    table = Job.__table__
+    linked, after = 0, 0
+    while True:
+        rows = db.session.execute(
+            select(table.c.id, table.c.category)
+            .where(table.c.category_id.is_(None), table.c.id > after)
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        ids = category_ids(category for _, category in rows)
+        db.session.execute(
+            update(table).where(table.c.id == bindparam('job_id')).values(category_id=bindparam('linked_id')),
+            [{'job_id': job_id, 'linked_id': ids[category_key(category)]} for job_id, category in rows]
+        )
+        linked += len(rows)
+        after = rows[-1].id
+    recount_category_facets()
+    # The facets and the category filter of the listings may have changed
+    bump_versions(ALL_JOBS)
+    db.session.commit()
+    categories = db.session.query(func.count(Category.id)).scalar()
+    return f"Linked {linked} jobs to their categories; {categories} categories counted."
+
+# The id of the category of this name, whatever its case and spacing; None if there is none
+def find_category_id(name):
+    table = Category.__table__
+    return db.session.execute(select(table.c.id).where(table.c.key == category_key(name))).scalar()
+
+# Controller function for the number of open jobs per category, most jobs first [ALL_USERS]
+@read_only
+def get_category_facets():
+    rows = db.session.execute(
+        select(Category.id, Category.name, CategoryFacet.job_count)
+        .join(CategoryFacet, CategoryFacet.category_id == Category.id)
+        .where(CategoryFacet.job_count > 0)
+        .order_by(CategoryFacet.job_count.desc(), Category.name)
+    )
+    return [{'id': category_id, 'name': name, 'jobs': count} for category_id, name, count in rows]
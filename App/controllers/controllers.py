@@ -1,5 +1,30 @@
-from App.models import db, User, Admin, Employer, JobSeeker, Job, Application
-from werkzeug.security import generate_password_hash, check_password_hash
+from datetime import datetime
+from flask import abort, current_app
+from sqlalchemy import and_, delete, exists, insert, literal, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from App.models import db, User, Admin, Employer, JobSeeker, Job, Application, ApplicationDirectory
+from .search import index_job, unindex_jobs
+from .recommend import recommender_add_jobs, recommender_remove_jobs
+from .user_cache import invalidate_cached_user
+from .versions import bump_versions, ALL_JOBS, ARCHIVE, employer_scope, job_scope, job_seeker_scope
+from .counters import adjust_counters, removed_applications_changes
+from .events import record_status_events
+from .categories import category_ids, category_key, adjust_category_counts, removed_jobs_category_deltas, find_category_id
+from .read_models import JobRow, UserRow, ApplicationRow, JOB_ROW_COLUMNS, USER_ROW_COLUMNS, APPLICATION_ROW_COLUMNS, as_rows
+from .shards import (
+    is_sharded,
+    job_shard,
+    jobs_by_shard,
+    place_job,
+    application_shard,
+    applications_by_shard,
+    scatter,
+    allocate_application_id,
+    insert_sharded_application,
+    delete_sharded_applications
+)
+from App.passwords import hash_password, verify_password
+from App.database import read_only, dialect_insert, using_shard, create_db, drop_shard_tables
 
 # Controller functions
 
@@ -19,7 +44,7 @@ def create_user(username, password, email, role):
     if role not in ['admin', 'employer', 'job_seeker']:
         return f"Invalid role '{role}'. Choose from 'admin', 'employer', or 'job_seeker'."
 
-    hashed_password = generate_password_hash(password)
+    hashed_password = hash_password(password)
 
     # Create the user based on the role
     if role == 'employer':
@@ -39,121 +64,380 @@ def create_user(username, password, email, role):
 
 # Controller function to log in a user
 def login_user(username, password):
-    user = User.query.filter_by(username=username).first()  # Find user by username
-    if user and check_password_hash(user.password, password):  # Check password
+    user = User.query.filter_by(username=username, deleted_at=None).first()  # Find user by username
+    if user and verify_password(user.password, password):  # Check password
         return f"User {username} logged in successfully!"
     else:
         return "Invalid username or password."
 
 # Controller function to accept or reject an application [EMPLOYER]
 def review_application(application_id, is_accepted):
-    application = Application.query.get(application_id)
+    table = Application.__table__
+    with using_shard(application_shard(application_id)):
+        # Locked until commit, so a concurrent review waits and the counters move from the status it leaves
+        application = db.session.execute(
+            select(table.c.job_id, table.c.job_seeker_id, table.c.is_accepted)
+            .where(table.c.application_id == application_id)
+            .with_for_update()
+        ).first()
+        if application and application.is_accepted is not is_accepted:
+            db.session.execute(update(table).where(table.c.application_id == application_id).values(is_accepted=is_accepted))
     if not application:
         return f"Application with ID {application_id} does not exist."
     
-    application.is_accepted = is_accepted
+    if application.is_accepted is not is_accepted:
+        adjust_counters([
+            (application.job_id, application.job_seeker_id, application.is_accepted, -1),
+            (application.job_id, application.job_seeker_id, is_accepted, 1)
+        ])
+        record_status_events([(application_id, application.job_id, application.job_seeker_id, application_status(is_accepted))])
+    bump_versions(job_scope(application.job_id), job_seeker_scope(application.job_seeker_id))
     db.session.commit()
     
     status = 'accepted' if is_accepted else 'rejected'
     return f'Application {application_id} has been {status}.'
 
+# Controller function to accept and reject many applications of one job in one transaction [EMPLOYER]
+# With reject_rest every other pending application of the job is rejected as well.
+# Returns {application_id: outcome}, where ids that don't exist, belong to another
+# job or are listed for both decisions are refused and left unchanged.
+def review_applications(job_id, accept=(), reject=(), reject_rest=False):
+    raw_job_id = job_id
+    job_id = _as_id(job_id)
+    if job_id is None or not db.session.query(exists().where(Job.id == job_id, Job.deleted_at.is_(None))).scalar():
+        return f"Job with ID {raw_job_id} does not exist."
+
+    accept, reject = {int(i) for i in accept}, {int(i) for i in reject}
+    outcomes = {application_id: "Refused: listed to both accept and reject." for application_id in accept & reject}
+    accept, reject = accept - reject, reject - accept
+
+    # One query finds the requested applications and, for reject_rest, the job's pending ones,
+    # on the job's shard: ids of applications to jobs on other shards are not found there.
+    # The rows stay locked until commit, as in review_application, so the counter changes hold.
+    shard = job_shard(job_id)
+    condition = Application.application_id.in_(accept | reject)
+    if reject_rest:
+        condition = or_(condition, and_(Application.job_id == job_id, Application.is_accepted.is_(None)))
+    with using_shard(shard):
+        rows = db.session.execute(
+            select(Application.application_id, Application.job_id, Application.job_seeker_id, Application.is_accepted)
+            .where(condition)
+            .with_for_update()
+        ).all()
+
+    decisions = {True: [], False: []}
+    found, seeker_ids, changes, events = set(), set(), [], []
+    for application_id, application_job_id, job_seeker_id, was_accepted in rows:
+        found.add(application_id)
+        if application_job_id != job_id:
+            outcomes[application_id] = f"Refused: belongs to Job {application_job_id}."
+            continue
+        if application_id in outcomes:
+            continue
+        is_accepted = application_id in accept
+        decisions[is_accepted].append(application_id)
+        seeker_ids.add(job_seeker_id)
+        if was_accepted is not is_accepted:
+            changes += [(job_id, job_seeker_id, was_accepted, -1), (job_id, job_seeker_id, is_accepted, 1)]
+            events.append((application_id, job_id, job_seeker_id, application_status(is_accepted)))
+    for application_id in (accept | reject) - found:
+        outcomes[application_id] = "Refused: does not exist."
+
+    # One UPDATE per decision, whatever the number of applications
+    for is_accepted, application_ids in decisions.items():
+        if application_ids:
+            with using_shard(shard):
+                db.session.execute(
+                    update(Application)
+                    .where(Application.job_id == job_id, Application.application_id.in_(application_ids))
+                    .values(is_accepted=is_accepted)
+                )
+            for application_id in application_ids:
+                outcomes[application_id] = application_status(is_accepted)
+    adjust_counters(changes)
+    record_status_events(sorted(events))
+    if seeker_ids:
+        bump_versions(job_scope(job_id), *[job_seeker_scope(seeker_id) for seeker_id in seeker_ids])
+    db.session.commit()
+    return dict(sorted(outcomes.items()))
+
+# Maps Application.is_accepted to the status shown to users
+def application_status(is_accepted):
+    if is_accepted is True:
+        return "Accepted"
+    if is_accepted is False:
+        return "Rejected"
+    return "Pending"
+
+# The statements behind the job seeker status views are shared with the async read API (App/async_api.py)
+def job_seeker_exists_statement(job_seeker_id):
+    return select(exists().where(JobSeeker.id == job_seeker_id))
+
+# All applications of a job seeker with the job details joined in, oldest first
+def job_seeker_applications_statement(job_seeker_id):
+    return (
+        select(Application.job_id, Job.category, Job.description, Application.is_accepted)
+        .join(Job, Application.job_id == Job.id)
+        .where(Application.job_seeker_id == job_seeker_id, Job.deleted_at.is_(None))
+        .order_by(Application.application_id)
+    )
+
+def job_seeker_application_statement(job_seeker_id, application_id):
+    return (
+        select(Job.id, Job.category, Job.description, Application.is_accepted)
+        .join(Application, Application.job_id == Job.id)
+        .where(Application.application_id == application_id, Application.job_seeker_id == job_seeker_id, Job.deleted_at.is_(None))
+    )
+
+# Scatter-gather form of the two statements above, for sharded applications: the job seeker's
+# applications from every shard (or the application's), oldest first, then their open jobs from the primary
+def sharded_job_seeker_applications(job_seeker_id, application_id=None):
+    statement = select(Application.application_id, Application.job_id, Application.is_accepted).where(Application.job_seeker_id == job_seeker_id)
+    shards = None
+    if application_id is not None:
+        statement = statement.where(Application.application_id == application_id)
+        shards = list(applications_by_shard([application_id]))
+    applications = sorted(scatter(statement, shards))
+    jobs = {
+        job_id: (category, description)
+        for job_id, category, description in db.session.execute(
+            select(Job.id, Job.category, Job.description)
+            .where(Job.id.in_({job_id for _, job_id, _ in applications}), Job.deleted_at.is_(None))
+        )
+    }
+    return [(job_id, *jobs[job_id], is_accepted) for _, job_id, is_accepted in applications if job_id in jobs]
+
+def format_application_statuses(rows):
+    return [
+        {
+            "job_id": job_id,
+            "job_category": category,
+            "description": description,
+            "status": application_status(is_accepted)
+        }
+        for job_id, category, description, is_accepted in rows
+    ]
+
+def format_application_status(row):
+    job_id, category, description, is_accepted = row
+    return f"Job ID: {job_id}, Category: {category}, Description: {description}, Status: {application_status(is_accepted)}"
+
 # Controller function for job seekers to view their accepted applications [JOB_SEEKER]
+@read_only
 def view_job_status_all(job_seeker_id):
-    job_seeker = JobSeeker.query.get(job_seeker_id)
-    if not job_seeker:
+    if not db.session.execute(job_seeker_exists_statement(job_seeker_id)).scalar():
         return f"Job Seeker with ID {job_seeker_id} does not exist."
 
-    # Get all applications and their statuses for the job seeker
-    applications_status = []
-    
-    for app in job_seeker.applications:
-        status = "Pending"
-        if app.is_accepted is True:
-            status = "Accepted"
-        elif app.is_accepted is False:
-            status = "Rejected"
-
-        # Collect job details with the status
-        applications_status.append({
-            "job_id": app.job_id,
-            "job_category": app.job.category,
-            "description": app.job.description,
-            "status": status
-        })
-
-    return applications_status
+    if is_sharded():
+        return format_application_statuses(sharded_job_seeker_applications(job_seeker_id))
+    # Get all applications and their statuses for the job seeker, with the job details joined in one query
+    return format_application_statuses(db.session.execute(job_seeker_applications_statement(job_seeker_id)))
 
+@read_only
 def view_job_status(job_seeker_id, application_id):
-    # Retrieve the job seeker
-    job_seeker = JobSeeker.query.get(job_seeker_id)
-    if not job_seeker:
-        return f"Job Seeker with ID {job_seeker_id} does not exist."
-
-    # Retrieve the specific application for the job seeker
-    application = Application.query.filter_by(application_id=application_id, job_seeker_id=job_seeker_id).first()
-    if not application:
+    # Retrieve the specific application for the job seeker together with its job
+    if is_sharded():
+        row = next(iter(sharded_job_seeker_applications(job_seeker_id, application_id)), None)
+    else:
+        row = db.session.execute(job_seeker_application_statement(job_seeker_id, application_id)).first()
+    if not row:
+        if not db.session.execute(job_seeker_exists_statement(job_seeker_id)).scalar():
+            return f"Job Seeker with ID {job_seeker_id} does not exist."
         return f"Application with ID {application_id} does not exist for Job Seeker {job_seeker_id}."
 
-    status = "Pending"
-    if application.is_accepted is True:
-        status = "Accepted"
-    elif application.is_accepted is False:
-        status = "Rejected"
-
-    # Check is not needed for this because of data integrity
-    job = Job.query.get(application.job_id)
-    return f"Job ID: {job.id}, Category: {job.category}, Description: {job.description}, Status: {status}"
+    return format_application_status(row)
 
 
 # Controller function to create a job advertisement [EMPLOYER]
 def create_job(category, description, employer_id):
     employer = Employer.query.get(employer_id)
-    if not employer:
+    if not employer or employer.deleted_at is not None:
         return f"Employer with ID {employer_id} does not exist. Job not created."
 
-    job = Job(category=category, description=description, employer_id=employer_id)
+    category_id = category_ids([category])[category_key(category)]
+    job = Job(category=category, category_id=category_id, description=description, employer_id=employer_id)
     db.session.add(job)
+    db.session.flush()
+    index_job(job)
+    adjust_category_counts({category_id: 1})
+    bump_versions(ALL_JOBS, employer_scope(employer.id))
+    added = (job.id, category, description)
     db.session.commit()
+    recommender_add_jobs([added])
     return f"Job '{category}' created successfully under Employer ID {employer_id}."
 
+# Coerces an id given on the command line or in a URL, None when it cannot be an id
+def _as_id(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+# Builds "INSERT ... SELECT ... WHERE <job and seeker exist>" that skips rows hitting the unique (job_id, job_seeker_id) index
+def _insert_application_statement(job_id, job_seeker_id, application_text):
+    values = select(
+        literal(job_id, db.Integer),
+        literal(job_seeker_id, db.Integer),
+        literal(application_text, db.Text)
+    ).where(
+        exists().where(Job.id == job_id, Job.deleted_at.is_(None)),
+        exists().where(JobSeeker.id == job_seeker_id)
+    )
+    columns = ['job_id', 'job_seeker_id', 'application_text']
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        return dialect_insert(dialect)(Application).from_select(columns, values).on_conflict_do_nothing()
+    statement = insert(Application).from_select(columns, values)
+    if dialect == 'mysql':
+        return statement.prefix_with('IGNORE')
+    return statement
+
+# The same checks with sharded applications: the job and job seeker checks allocate the id on the
+# primary, then the job's shard inserts the application unless its unique index finds one already
+def _insert_sharded_application(job_id, job_seeker_id, application_text):
+    application_id = allocate_application_id(job_id, job_seeker_id)
+    if application_id is None:
+        return 0
+    with using_shard(place_job(job_id)):
+        return insert_sharded_application(application_id, job_id, job_seeker_id, application_text)
+
 # Controller function for job seekers to apply to a job [JOB_SEEKER]
 def apply_to_job(job_id, job_seeker_id, application_text):
-    # Check if the job exists
-    job = Job.query.get(job_id)
-    if not job:
-        return f"Job with ID {job_id} does not exist."
-
-    # Check if the job seeker exists
-    job_seeker = JobSeeker.query.get(job_seeker_id)
-    if not job_seeker:
-        return f"Job Seeker with ID {job_seeker_id} does not exist."
-
-    # Check for duplicate applications
-    existing_application = Application.query.filter_by(job_id=job_id, job_seeker_id=job_seeker_id).first()
-    if existing_application:
-        return f"Job Seeker {job_seeker_id} has already applied for Job {job_id}."
-
-    # Create the application if all validations pass
-    application = Application(job_id=job_id, job_seeker_id=job_seeker_id, application_text=application_text)
-    db.session.add(application)
-    db.session.commit()
-    return f"Application submitted for Job {job_id} by Job Seeker {job_seeker_id}."
-
-# Controller function for job seekers to apply to a job [ALL_USERS]
+    job_id, raw_job_id = _as_id(job_id), job_id
+    job_seeker_id, raw_job_seeker_id = _as_id(job_seeker_id), job_seeker_id
+
+    # The job check, job seeker check, duplicate check and insert are a single statement
+    inserted = 0
+    if job_id is not None and job_seeker_id is not None:
+        try:
+            if is_sharded():
+                inserted = _insert_sharded_application(job_id, job_seeker_id, application_text)
+            else:
+                inserted = db.session.execute(_insert_application_statement(job_id, job_seeker_id, application_text)).rowcount
+            if inserted:
+                adjust_counters([(job_id, job_seeker_id, None, 1)])
+                bump_versions(job_scope(job_id), job_seeker_scope(job_seeker_id))
+                db.session.commit()
+            else:
+                db.session.rollback()
+        except IntegrityError:
+            db.session.rollback()
+    if inserted:
+        return f"Application submitted for Job {raw_job_id} by Job Seeker {raw_job_seeker_id}."
+
+    # Nothing was inserted, so work out which check failed
+    if job_id is None or not db.session.query(exists().where(Job.id == job_id, Job.deleted_at.is_(None))).scalar():
+        return f"Job with ID {raw_job_id} does not exist."
+    if job_seeker_id is None or not db.session.query(exists().where(JobSeeker.id == job_seeker_id)).scalar():
+        return f"Job Seeker with ID {raw_job_seeker_id} does not exist."
+    return f"Job Seeker {raw_job_seeker_id} has already applied for Job {raw_job_id}."
+
+# Formats a single job posting the way the job listing commands print it
+def format_job(job):
+    return f"Job ID: {job.id}, Category: {job.category}, Description: {job.description}, Date Posted: {job.date_posted}, Employer ID: {job.employer_id}"
+
+# Cursors mark the last job of a page as "<date_posted>_<id>" so the next page can resume after it
+def encode_job_cursor(job):
+    return f"{job.date_posted.isoformat()}_{job.id}"
+
+def decode_job_cursor(cursor):
+    try:
+        date_posted, job_id = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(date_posted), int(job_id)
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid job cursor '{cursor}'.")
+
+def job_page_size(limit, config):
+    limit = min(int(config['JOB_PAGE_SIZE'] if limit is None else limit), config['JOB_PAGE_SIZE_MAX'])
+    if limit < 1:
+        raise ValueError("Page size must be at least 1.")
+    return limit
+
+# Selects the jobs after the cursor, newest first, plus one extra row that tells whether another page follows
+# (Job instances, or only the given columns), optionally only those of one category
+def jobs_page_statement(limit, after=None, columns=None, category_id=None):
+    statement = select(*columns) if columns else select(Job)
+    statement = statement.where(Job.deleted_at.is_(None)).order_by(Job.date_posted.desc(), Job.id.desc())
+    if category_id is not None:
+        statement = statement.where(Job.category_id == category_id)
+    if after:
+        date_posted, job_id = decode_job_cursor(after)
+        statement = statement.where(or_(
+            Job.date_posted < date_posted,
+            and_(Job.date_posted == date_posted, Job.id < job_id)
+        ))
+    return statement.limit(limit + 1)
+
+def jobs_page(jobs, limit):
+    if len(jobs) > limit:
+        jobs = jobs[:limit]
+        return jobs, encode_job_cursor(jobs[-1])
+    return jobs, None
+
+# Controller function to list one page of jobs, newest first [ALL_USERS]
+# Returns the jobs on the page and the cursor of the next page (None on the last page)
+@read_only
+def list_jobs(limit=None, after=None):
+    limit = job_page_size(limit, current_app.config)
+    jobs = db.session.scalars(jobs_page_statement(limit, after)).all()
+    return jobs_page(jobs, limit)
+
+# Controller function to list one page of jobs as JobRow tuples, newest first [ALL_USERS]
+# category (a name) or category_id keeps only the jobs of that category
+@read_only
+def list_job_rows(limit=None, after=None, category=None, category_id=None):
+    limit = job_page_size(limit, current_app.config)
+    if category is not None:
+        category_id = find_category_id(category)
+        if category_id is None:
+            return [], None
+    rows = as_rows(JobRow, db.session.execute(jobs_page_statement(limit, after, JOB_ROW_COLUMNS, category_id)))
+    return jobs_page(rows, limit)
+
+# Generator over every job after the cursor, newest first, one window of rows at a time
+def iter_jobs(after=None, batch_size=None):
+    while True:
+        jobs, after = list_jobs(batch_size, after)
+        yield from jobs
+        if after is None:
+            return
+
+def iter_job_rows(after=None, batch_size=None, category=None):
+    while True:
+        rows, after = list_job_rows(batch_size, after, category)
+        yield from rows
+        if after is None:
+            return
+
+# Controller function to view a single job [ALL_USERS]
+@read_only
+def get_job(job_id):
+    job = db.session.get(Job, job_id)
+    if job is None or job.deleted_at is not None:
+        return None
+    return job
+
+# Controller function to list an employer's jobs, newest first [ALL_USERS]
+@read_only
+def get_jobs_for_employer(employer_id):
+    # Selecting from the Employer entity joins in users, where deleted_at lives
+    if not db.session.query(select(Employer.id).where(Employer.id == employer_id, Employer.deleted_at.is_(None)).exists()).scalar():
+        return f"Employer with ID {employer_id} does not exist."
+    return Job.query.filter_by(employer_id=employer_id, deleted_at=None).order_by(Job.date_posted.desc(), Job.id.desc()).all()
+
+# Controller function to list all jobs [ALL_USERS]
+@read_only
 def get_all_jobs():
-    jobs = Job.query.all()
-    if not jobs:
+    lines = [format_job(job) for job in iter_job_rows(batch_size=current_app.config['JOB_PAGE_SIZE_MAX'])]
+    if not lines:
         return "No jobs available."
-    
-    jobs_str = "\n--- Job Postings ---\n"
-    for job in jobs:
-        jobs_str += f"Job ID: {job.id}, Category: {job.category}, Description: {job.description}, Date Posted: {job.date_posted}, Employer ID: {job.employer_id}\n"
-    
-    return jobs_str
+
+    return "\n--- Job Postings ---\n" + "".join(line + "\n" for line in lines)
 
 # Controller function for job seekers to apply to a job [ADMIN]
+@read_only
 def get_all_users():
-    users = User.query.all()
+    users = as_rows(UserRow, db.session.execute(select(*USER_ROW_COLUMNS).where(User.__table__.c.deleted_at.is_(None))))
     if not users:
         return "No users found."
     
@@ -163,38 +447,111 @@ def get_all_users():
     
     return users_str
 
-# Controller function to retrieve applicants for a specific job [EMPLOYER]
+# Controller function to retrieve applicants for a specific job as ApplicationRow tuples [EMPLOYER]
+@read_only
 def get_applicants_for_job(job_id):
-    job = Job.query.get_or_404(job_id)
-    return job.applications
+    if not db.session.query(exists().where(Job.id == job_id, Job.deleted_at.is_(None))).scalar():
+        abort(404)
+    table = Application.__table__
+    with using_shard(job_shard(job_id)):
+        return as_rows(ApplicationRow, db.session.execute(
+            select(*APPLICATION_ROW_COLUMNS).where(table.c.job_id == job_id).order_by(table.c.application_id)
+        ))
+
+# Version scopes that change when these jobs go away: the jobs and everyone who applied to them
+def _removed_jobs_scopes(job_ids):
+    if not job_ids:
+        return []
+    seeker_ids = scatter(select(Application.job_seeker_id).where(Application.job_id.in_(job_ids)).distinct(), list(jobs_by_shard(job_ids)))
+    return [job_scope(job_id) for job_id in job_ids] + [job_seeker_scope(seeker_id) for (seeker_id,) in seeker_ids]
+
+# With SOFT_DELETE, employers and jobs are only marked deleted and hidden, and
+# `flask admin purge` deletes them in bounded batches; job seekers and
+# applications are small enough to always be deleted straight away.
+def _soft_delete():
+    return current_app.config['SOFT_DELETE']
 
 # Controller function for removing a user [ADMIN]
 def remove_user(user_id):
     user = User.query.get(user_id)
-    if not user:
+    if not user or user.deleted_at is not None:
         return f"User with ID {user_id} does not exist."
     
+    # An employer's job listings are deleted with them, so drop them from the search index too
+    if isinstance(user, Employer):
+        job_ids = [job_id for (job_id,) in db.session.query(Job.id).filter_by(employer_id=user.id, deleted_at=None)]
+        unindex_jobs(job_ids)
+        adjust_category_counts(removed_jobs_category_deltas(Job.employer_id == user.id))
+        # Their archived jobs go too when the employer row does (ON DELETE CASCADE)
+        bump_versions(ALL_JOBS, ARCHIVE, employer_scope(user.id), *_removed_jobs_scopes(job_ids))
+        if _soft_delete():
+            # Hidden now; the jobs, their applications and the employer are purged in batches later
+            deleted_at = datetime.utcnow()
+            user.deleted_at = deleted_at
+            db.session.execute(update(Job).where(Job.employer_id == user.id, Job.deleted_at.is_(None)).values(deleted_at=deleted_at))
+            db.session.commit()
+            recommender_remove_jobs(job_ids)
+            invalidate_cached_user(user_id)
+            return f"User with ID {user_id} removed successfully."
+        shards = list(jobs_by_shard(job_ids))
+        adjust_counters(removed_applications_changes(Application.job_id.in_(job_ids), shards))
+        delete_sharded_applications(Application.job_id.in_(job_ids), shards)
+    elif isinstance(user, JobSeeker):
+        changes = removed_applications_changes(Application.job_seeker_id == user.id)
+        adjust_counters(changes)
+        bump_versions(ARCHIVE, job_seeker_scope(user.id), *[job_scope(job_id) for job_id, _, _, _ in changes])
+        delete_sharded_applications(Application.job_seeker_id == user.id)
+    # The database deletes the user's jobs and applications (ON DELETE CASCADE), shards aside
     db.session.delete(user)
     db.session.commit()
+    if isinstance(user, Employer):
+        recommender_remove_jobs(job_ids)
+    invalidate_cached_user(user_id)
     return f"User with ID {user_id} removed successfully."
 
 # Controller function for removing a job [ADMIN]
 def remove_job(job_id):
     job = Job.query.get(job_id)
-    if not job:
+    if not job or job.deleted_at is not None:
         return f"Job with ID {job_id} does not exist."
     
+    removed_id = job.id
+    unindex_jobs([job.id])
+    adjust_category_counts({job.category_id: -1})
+    bump_versions(ALL_JOBS, employer_scope(job.employer_id), *_removed_jobs_scopes([job.id]))
+    if _soft_delete():
+        job.deleted_at = datetime.utcnow()
+        db.session.commit()
+        recommender_remove_jobs([removed_id])
+        return f"Job with ID {job_id} removed successfully."
+    # The job's applications go with it, so its applicants' counts drop
+    shards = [job_shard(job.id)]
+    adjust_counters(removed_applications_changes(Application.job_id == job.id, shards))
+    delete_sharded_applications(Application.job_id == job.id, shards)
     db.session.delete(job)
     db.session.commit()
+    recommender_remove_jobs([removed_id])
     return f"Job with ID {job_id} removed successfully."
 
 # Controller function for removing an application [ADMIN]
 def remove_application(application_id):
-    application = Application.query.get(application_id)
+    table = Application.__table__
+    with using_shard(application_shard(application_id)):
+        # Locked until commit, so a concurrent review waits and the counters move from the status it leaves
+        application = db.session.execute(
+            select(table.c.job_id, table.c.job_seeker_id, table.c.is_accepted)
+            .where(table.c.application_id == application_id)
+            .with_for_update()
+        ).first()
+        if application:
+            db.session.execute(delete(table).where(table.c.application_id == application_id))
     if not application:
         return f"Application with ID {application_id} does not exist."
     
-    db.session.delete(application)
+    adjust_counters([(application.job_id, application.job_seeker_id, application.is_accepted, -1)])
+    bump_versions(job_scope(application.job_id), job_seeker_scope(application.job_seeker_id))
+    if is_sharded():
+        db.session.execute(delete(ApplicationDirectory).where(ApplicationDirectory.application_id == application_id))
     db.session.commit()
     return f"Application with ID {application_id} removed successfully."
 
@@ -204,38 +561,9 @@ def drop_database(admin_id):
     if not admin:
         return f"Admin with ID {admin_id} does not exist."
     db.drop_all()
+    drop_shard_tables()
     return f"All tables dropped."
 
-# Controller view the entire database [ADMIN]
-def get_all_entities():
-    users = User.query.all()
-    jobs = Job.query.all()
-    applications = Application.query.all()
-
-    users_str = "\n--- Users ---\n"
-    if users:
-        for user in users:
-            users_str += f'UserID: {user.id} Username: {user.username}, Role: {user.user_type}\n'
-
-    jobs_str = "\n--- Jobs ---\n"
-    if jobs:
-        for job in jobs:
-            jobs_str += f'Job ID: {job.id}, Category: {job.category}, Description: {job.description}, Employer ID: {job.employer_id}\n'
-
-    applications_str = "\n--- Applications ---\n"
-    if applications:
-        for application in applications:
-            if application.is_accepted is True:
-                status = "Accepted"
-            elif application.is_accepted is False:
-                status = "Rejected"
-            else:
-                status = "Pending"
-            
-            applications_str += f'Application ID: {application.application_id}, Job ID: {application.job_id}, Job Seeker ID: {application.job_seeker_id}, Status: {status}\n'
-
-    return users_str + jobs_str + applications_str
-
 # Controller function to initialize the database [ADMIN]
 def initialize():
-    db.create_all()
+    create_db()
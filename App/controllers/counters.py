@@ -0,0 +1,134 @@
+from collections import defaultdict
+
+from sqlalchemy import bindparam, func, select, update
+from App.models import db, Job, JobSeeker, Application
+from App.database import read_only
+from .shards import scatter, is_sharded
+from .versions import bump_versions, job_scope, job_seeker_scope
+
+# Every job and job seeker carries its application counts (total, pending,
+# accepted, rejected) so dashboards read one row instead of every application.
+# Writers call adjust_counters in the transaction that changes applications:
+# one executemany UPDATE per table, whatever the number of rows touched.
+# `flask admin recount` rebuilds them from the applications table (or the shards).
+
+STATUS_COLUMNS = {None: 'pending_count', True: 'accepted_count', False: 'rejected_count'}
+
+# Counter columns of each table; the total comes first
+JOB_COUNTERS = ('applicant_count', 'pending_count', 'accepted_count', 'rejected_count')
+JOB_SEEKER_COUNTERS = ('application_count', 'pending_count', 'accepted_count', 'rejected_count')
+
+
+def _deltas(changes, key_index, total_column):
+    deltas = defaultdict(lambda: defaultdict(int))
+    for change in changes:
+        key, is_accepted, delta = change[key_index], change[2], change[3]
+        deltas[key][total_column] += delta
+        deltas[key][STATUS_COLUMNS[is_accepted]] += delta
+    return deltas
+
+def _apply_deltas(model, columns, deltas):
+    rows = [
+        {'counter_id': key, **{f'd_{column}': changes[column] for column in columns}}
+        for key, changes in deltas.items()
+        if any(changes[column] for column in columns)
+    ]
+    if not rows:
+        return
+    table = model.__table__
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam('counter_id'))
+        .values({column: table.c[column] + bindparam(f'd_{column}') for column in columns})
+    )
+    db.session.execute(statement, rows)
+
+# Applies counter changes inside the caller's transaction.
+# changes are (job_id, job_seeker_id, is_accepted, delta) tuples, e.g. (3, 7, None, 1) for a new application
+def adjust_counters(changes):
+    changes = list(changes)
+    if not changes:
+        return
+    _apply_deltas(Job, JOB_COUNTERS, _deltas(changes, 0, 'applicant_count'))
+    _apply_deltas(JobSeeker, JOB_SEEKER_COUNTERS, _deltas(changes, 1, 'application_count'))
+
+# Counter changes that take back every application matching the condition, grouped in SQL.
+# Called before the applications are deleted, e.g. by a cascade from their job or job seeker.
+# Asks every application shard, or only the given ones when the caller knows where the applications are
+def removed_applications_changes(condition, shards=None):
+    rows = scatter(
+        select(Application.job_id, Application.job_seeker_id, Application.is_accepted, func.count())
+        .where(condition)
+        .group_by(Application.job_id, Application.job_seeker_id, Application.is_accepted),
+        shards
+    )
+    return [(job_id, job_seeker_id, is_accepted, -count) for job_id, job_seeker_id, is_accepted, count in rows]
+
+def _recount_statement(model, columns, foreign_key):
+    table = model.__table__
+    applications = Application.__table__
+
+    def count(*conditions):
+        return (
+            select(func.count())
+            .where(applications.c[foreign_key] == table.c.id, *conditions)
+            .scalar_subquery()
+        )
+    total, pending, accepted, rejected = columns
+    return update(table).values({
+        total: count(),
+        pending: count(applications.c.is_accepted.is_(None)),
+        accepted: count(applications.c.is_accepted.is_(True)),
+        rejected: count(applications.c.is_accepted.is_(False)),
+    })
+
+# With shards the applications are in other databases: the counters start from zero
+# and each shard adds its counts per job and per job seeker
+def _recount_sharded(model, columns, foreign_key):
+    db.session.execute(update(model.__table__).values(dict.fromkeys(columns, 0)))
+    key = Application.__table__.c[foreign_key]
+    rows = scatter(select(key, Application.is_accepted, func.count()).group_by(key, Application.is_accepted))
+    _apply_deltas(model, columns, _deltas([(key, None, is_accepted, count) for key, is_accepted, count in rows], 0, columns[0]))
+
+# {id: counter values} of every row of the table
+def _counter_values(model, columns):
+    table = model.__table__
+    return {row[0]: tuple(row[1:]) for row in db.session.execute(select(table.c.id, *[table.c[column] for column in columns]))}
+
+# Controller function to rebuild every counter from the applications table [ADMIN]
+# The jobs and job seekers whose counters were wrong get their versions bumped, so cached counts are refreshed
+def recount_applications():
+    jobs_before = _counter_values(Job, JOB_COUNTERS)
+    job_seekers_before = _counter_values(JobSeeker, JOB_SEEKER_COUNTERS)
+    if is_sharded():
+        _recount_sharded(Job, JOB_COUNTERS, 'job_id')
+        _recount_sharded(JobSeeker, JOB_SEEKER_COUNTERS, 'job_seeker_id')
+    else:
+        db.session.execute(_recount_statement(Job, JOB_COUNTERS, 'job_id'))
+        db.session.execute(_recount_statement(JobSeeker, JOB_SEEKER_COUNTERS, 'job_seeker_id'))
+    bump_versions(
+        *[job_scope(job_id) for job_id, values in _counter_values(Job, JOB_COUNTERS).items() if jobs_before.get(job_id) != values],
+        *[job_seeker_scope(job_seeker_id) for job_seeker_id, values in _counter_values(JobSeeker, JOB_SEEKER_COUNTERS).items()
+          if job_seekers_before.get(job_seeker_id) != values]
+    )
+    db.session.commit()
+    jobs = db.session.query(func.count(Job.id)).scalar()
+    job_seekers = db.session.query(func.count(JobSeeker.id)).scalar()
+    return f"Application counters rebuilt for {jobs} jobs and {job_seekers} job seekers."
+
+# Controller function to view a job's application counts [EMPLOYER]
+@read_only
+def get_job_counts(job_id):
+    # The counters may have moved since this session loaded the row
+    job = db.session.get(Job, job_id, populate_existing=True)
+    if not job or job.deleted_at is not None:
+        return f"Job with ID {job_id} does not exist."
+    return job.get_counts_json()
+
+# Controller function to view a job seeker's application counts [JOB_SEEKER]
+@read_only
+def get_job_seeker_counts(job_seeker_id):
+    job_seeker = db.session.get(JobSeeker, job_seeker_id, populate_existing=True)
+    if not job_seeker:
+        return f"Job Seeker with ID {job_seeker_id} does not exist."
+    return job_seeker.get_counts_json()
@@ -0,0 +1,159 @@
+import os
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, func, insert, select
+from App.models import db, ApplicationEvent
+
+# Every application status change is written to application_events in the
+# transaction that makes it, and job seekers follow their events instead of
+# polling the status views: GET /api/job_seekers/<id>/events?since=<cursor>
+# (long poll) and GET /api/job_seekers/<id>/events/stream (Server-Sent Events).
+#
+# Waiting clients hold no database connection. One EventPoller per worker
+# process looks for new events every EVENTS_POLL_INTERVAL seconds, and only
+# while someone is waiting, then wakes the clients of the job seekers concerned.
+# Under the gevent worker the poller and the waiting requests are greenlets,
+# so an idle client costs a greenlet and a socket.
+
+LOCK_KEY = 0x6a0b5e7e  # pg_advisory_xact_lock key of the event writers
+
+
+# Adds events inside the caller's transaction.
+# events are (application_id, job_id, job_seeker_id, status) tuples
+def record_status_events(events):
+    rows = [
+        {'application_id': application_id, 'job_id': job_id, 'job_seeker_id': job_seeker_id, 'status': status, 'created_at': datetime.utcnow()}
+        for application_id, job_id, job_seeker_id, status in events
+    ]
+    if not rows:
+        return
+    # Readers move their cursor past every id they have seen, so ids must become
+    # visible in order. PostgreSQL hands out sequence values before commit; writers
+    # take turns until they commit. SQLite has a single writer already.
+    if db.session.get_bind().dialect.name == 'postgresql':
+        db.session.execute(select(func.pg_advisory_xact_lock(LOCK_KEY)))
+    db.session.execute(insert(ApplicationEvent), rows)
+
+def _event_json(row):
+    return {**row, 'created_at': row['created_at'].isoformat()}
+
+# A job seeker's events after the cursor, oldest first
+def get_application_events(job_seeker_id, since=0, limit=None):
+    limit = limit or current_app.config['EVENTS_PAGE_SIZE']
+    table = ApplicationEvent.__table__
+    rows = db.session.execute(
+        select(table.c.id, table.c.application_id, table.c.job_id, table.c.job_seeker_id, table.c.status, table.c.created_at)
+        .where(table.c.job_seeker_id == job_seeker_id, table.c.id > since)
+        .order_by(table.c.id)
+        .limit(limit)
+    ).mappings()
+    return [_event_json(row) for row in rows]
+
+# The newest event id, the cursor of a client that only wants what happens from now on
+def latest_event_id():
+    return db.session.query(func.coalesce(func.max(ApplicationEvent.id), 0)).scalar()
+
+# Controller function to delete events older than the given number of days [ADMIN]
+def prune_events(days):
+    result = db.session.execute(
+        delete(ApplicationEvent).where(ApplicationEvent.created_at < datetime.utcnow() - timedelta(days=days))
+    )
+    db.session.commit()
+    return f"Removed {result.rowcount} application events older than {days} days."
+
+
+class EventPoller:
+    def __init__(self, app, interval):
+        self.app = app
+        self.interval = interval
+        self.last_id = None
+        self._waiters = defaultdict(set)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def _start(self):
+        # Started by the first waiter, in the worker process that serves it
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self.app.app_context():
+            self.last_id = latest_event_id()
+            db.session.remove()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name='event-poller', daemon=True)
+        self._thread.start()
+
+    def subscribe(self, job_seeker_id):
+        waiter = threading.Event()
+        with self._lock:
+            self._start()
+            self._waiters[job_seeker_id].add(waiter)
+        return waiter
+
+    def unsubscribe(self, job_seeker_id, waiter):
+        with self._lock:
+            waiters = self._waiters.get(job_seeker_id)
+            if waiters is not None:
+                waiters.discard(waiter)
+                if not waiters:
+                    del self._waiters[job_seeker_id]
+
+    def poll(self):
+        with self._lock:
+            if not self._waiters:
+                return
+        table = ApplicationEvent.__table__
+        with self.app.app_context():
+            try:
+                rows = db.session.execute(
+                    select(table.c.job_seeker_id, func.max(table.c.id))
+                    .where(table.c.id > self.last_id)
+                    .group_by(table.c.job_seeker_id)
+                ).all()
+            finally:
+                db.session.remove()
+        if not rows:
+            return
+        self.last_id = max(self.last_id, *(last_id for _, last_id in rows))
+        with self._lock:
+            for job_seeker_id, _ in rows:
+                for waiter in self._waiters.get(job_seeker_id, ()):
+                    waiter.set()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.poll()
+            except Exception:
+                self.app.logger.exception("Polling application events failed")
+
+def get_event_poller():
+    app = current_app._get_current_object()
+    poller = app.extensions.get('event_poller')
+    if poller is None:
+        poller = app.extensions.setdefault('event_poller', EventPoller(app, app.config['EVENTS_POLL_INTERVAL']))
+    return poller
+
+# Controller function to wait up to timeout seconds for a job seeker's events after the cursor [JOB_SEEKER]
+# Returns as soon as there are any; an empty list when the time is up
+def wait_for_application_events(job_seeker_id, since=0, timeout=0):
+    poller = get_event_poller() if timeout > 0 else None
+    # Subscribe before looking, so an event committed in between still wakes us
+    waiter = poller.subscribe(job_seeker_id) if poller else None
+    try:
+        events = get_application_events(job_seeker_id, since)
+        if events or waiter is None:
+            return events
+        # Give the connection back to the pool for as long as we wait
+        db.session.close()
+        if not waiter.wait(timeout):
+            return []
+        return get_application_events(job_seeker_id, since)
+    finally:
+        if waiter is not None:
+            poller.unsubscribe(job_seeker_id, waiter)
@@ -0,0 +1,147 @@
+import csv
+import heapq
+import io
+import json
+from itertools import islice
+from operator import itemgetter
+
+from sqlalchemy import select
+from App.models import db, User, Job, Application
+from App.database import read_only, using_shard
+from .controllers import application_status
+from .shards import is_sharded, application_shards
+
+# Streaming export of users, jobs and applications.
+# Rows are fetched batch_size at a time as plain column tuples (no ORM objects
+# held in the session) and turned into output lines by generators, so memory
+# stays flat whatever the table sizes and the first lines are written while
+# the rest is still being read.
+#
+# since/until filter jobs on date_posted, and applications on the date_posted
+# of the job they were made for; users have no date and are never filtered.
+
+EXPORT_TABLES = ('users', 'jobs', 'applications')
+EXPORT_FORMATS = ('text', 'csv', 'jsonl')
+DEFAULT_BATCH_SIZE = 1000
+
+TEXT_HEADERS = {
+    'users': "\n--- Users ---\n",
+    'jobs': "\n--- Jobs ---\n",
+    'applications': "\n--- Applications ---\n",
+}
+
+
+def _date_filters(statement, column, since, until):
+    if since is not None:
+        statement = statement.where(column >= since)
+    if until is not None:
+        statement = statement.where(column < until)
+    return statement
+
+def _statement(table, since, until):
+    if table == 'users':
+        return select(User.id, User.username, User.email, User.user_type).order_by(User.id)
+    if table == 'jobs':
+        statement = select(Job.id, Job.category, Job.description, Job.date_posted, Job.employer_id).order_by(Job.id)
+        return _date_filters(statement, Job.date_posted, since, until)
+    statement = (
+        select(Application.application_id, Application.job_id, Application.job_seeker_id, Application.is_accepted)
+        .order_by(Application.application_id)
+    )
+    if since is not None or until is not None:
+        statement = _date_filters(statement.join(Job, Application.job_id == Job.id), Job.date_posted, since, until)
+    return statement
+
+def _fieldnames(table):
+    fieldnames = list(_statement(table, None, None).selected_columns.keys())
+    if table == 'applications':
+        fieldnames.append('status')
+    return fieldnames
+
+# Runs the statement now, on the current bind, and streams its rows batch_size at a time
+def _stream(statement, batch_size):
+    result = db.session.execute(statement.execution_options(yield_per=batch_size))
+    return (row for partition in result.mappings().partitions() for row in partition)
+
+# Sharded applications: every shard streamed at once and merged in application_id order.
+# Their jobs' dates are on the primary, so since/until filter a batch of rows at a time
+def _sharded_applications(since, until, batch_size):
+    streams = []
+    for shard in application_shards():
+        with using_shard(shard):
+            streams.append(_stream(_statement('applications', None, None), batch_size))
+    rows = heapq.merge(*streams, key=itemgetter('application_id'))
+    if since is None and until is None:
+        yield from rows
+        return
+    for batch in iter(lambda: list(islice(rows, batch_size)), []):
+        dated = set(db.session.scalars(
+            _date_filters(select(Job.id).where(Job.id.in_({row['job_id'] for row in batch})), Job.date_posted, since, until)
+        ))
+        yield from (row for row in batch if row['job_id'] in dated)
+
+# Yields one dict per row of the table, reading batch_size rows at a time
+def iter_rows(table, since=None, until=None, batch_size=DEFAULT_BATCH_SIZE):
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown table '{table}'. Choose from {', '.join(EXPORT_TABLES)}.")
+    if table == 'applications' and is_sharded():
+        rows = _sharded_applications(since, until, batch_size)
+    else:
+        rows = _stream(_statement(table, since, until), batch_size)
+    for row in rows:
+        row = dict(row)
+        if table == 'applications':
+            row['status'] = application_status(row['is_accepted'])
+        yield row
+
+
+def _text_line(table, row):
+    if table == 'users':
+        return f"UserID: {row['id']} Username: {row['username']}, Role: {row['user_type']}\n"
+    if table == 'jobs':
+        return f"Job ID: {row['id']}, Category: {row['category']}, Description: {row['description']}, Employer ID: {row['employer_id']}\n"
+    return f"Application ID: {row['application_id']}, Job ID: {row['job_id']}, Job Seeker ID: {row['job_seeker_id']}, Status: {row['status']}\n"
+
+def _text(table, rows):
+    yield TEXT_HEADERS[table]
+    for row in rows:
+        yield _text_line(table, row)
+
+def _csv(table, rows, fieldnames, first):
+    # Each table is its own CSV section with a header row, separated by a blank line
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, lineterminator="\n")
+    if not first:
+        buffer.write("\n")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({key: value.isoformat() if hasattr(value, 'isoformat') else value for key, value in row.items()})
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def _jsonl(table, rows):
+    for row in rows:
+        yield json.dumps({'table': table, **row}, default=lambda value: value.isoformat()) + "\n"
+
+# Controller function to export tables as text, CSV or JSONL lines [ADMIN]
+# A generator: nothing is read until the first line is asked for
+@read_only
+def export_entities(tables=None, format='text', since=None, until=None, batch_size=DEFAULT_BATCH_SIZE):
+    if format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format '{format}'. Choose from {', '.join(EXPORT_FORMATS)}.")
+    tables = [table for table in EXPORT_TABLES if not tables or table in tables]
+    for number, table in enumerate(tables):
+        rows = iter_rows(table, since, until, batch_size)
+        if format == 'text':
+            yield from _text(table, rows)
+        elif format == 'csv':
+            yield from _csv(table, rows, _fieldnames(table), number == 0)
+        else:
+            yield from _jsonl(table, rows)
+
+# Controller view the entire database [ADMIN]
+def get_all_entities():
+    return "".join(export_entities(format='text'))
@@ -1,8 +1,9 @@
 from .controllers import create_user
-from App.database import db
+from App.database import db, create_db, drop_shard_tables
 
 
 def initialize():
     db.drop_all()
-    db.create_all()
+    drop_shard_tables()
+    create_db()
     create_user('bob', 'bobpass1', 'bob@mail.com', 'employer')
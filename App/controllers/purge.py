@@ -0,0 +1,117 @@
+from collections import Counter
+
+from flask import current_app
+from sqlalchemy import delete, exists, select
+from App.models import db, User, Employer, Job, JobTerm, Application, JobShard
+from App.database import using_shard
+from .counters import adjust_counters, removed_applications_changes
+from .versions import bump_versions, ARCHIVE
+from .shards import is_sharded, jobs_by_shard, delete_sharded_applications
+
+# Purges what SOFT_DELETE removals left behind, one bounded transaction at a
+# time: first the applications of deleted jobs, then the deleted jobs, then
+# deleted employers once none of their jobs are left. No transaction touches
+# more than batch_size rows, so the database is never locked for long and a
+# purge can be stopped and resumed at any point.
+#
+# Only run one purge at a time (e.g. a single `flask admin purge --watch`).
+
+
+# With shards, a deleted job keeps its shard map row until its applications are purged from its shard
+def _purge_sharded_applications(batch_size):
+    job_ids = db.session.scalars(
+        select(Job.id)
+        .join(JobShard, JobShard.job_id == Job.id)
+        .where(Job.deleted_at.is_not(None))
+        .limit(batch_size)
+    ).all()
+    purged = 0
+    for shard, shard_job_ids in jobs_by_shard(job_ids).items():
+        limit = batch_size - purged
+        with using_shard(shard):
+            application_ids = db.session.scalars(
+                select(Application.application_id).where(Application.job_id.in_(shard_job_ids)).limit(limit)
+            ).all()
+        if application_ids:
+            adjust_counters(removed_applications_changes(Application.application_id.in_(application_ids), [shard]))
+            delete_sharded_applications(Application.application_id.in_(application_ids), [shard])
+            purged += len(application_ids)
+        if len(application_ids) < limit:
+            # Nothing of these jobs is left on the shard
+            db.session.execute(delete(JobShard).where(JobShard.job_id.in_(shard_job_ids)))
+        if purged >= batch_size:
+            break
+    return purged
+
+def _purge_applications(batch_size):
+    if is_sharded():
+        return _purge_sharded_applications(batch_size)
+    application_ids = db.session.scalars(
+        select(Application.application_id)
+        .join(Job, Application.job_id == Job.id)
+        .where(Job.deleted_at.is_not(None))
+        .limit(batch_size)
+    ).all()
+    if application_ids:
+        adjust_counters(removed_applications_changes(Application.application_id.in_(application_ids)))
+        db.session.execute(delete(Application).where(Application.application_id.in_(application_ids)))
+    return len(application_ids)
+
+def _purge_jobs(batch_size):
+    # A sharded job's applications are gone once its shard map row is
+    applications = JobShard if is_sharded() else Application
+    job_ids = db.session.scalars(
+        select(Job.id)
+        .where(Job.deleted_at.is_not(None), ~exists().where(applications.job_id == Job.id))
+        .limit(batch_size)
+    ).all()
+    if job_ids:
+        db.session.execute(delete(JobTerm).where(JobTerm.job_id.in_(job_ids)))
+        db.session.execute(delete(Job).where(Job.id.in_(job_ids)))
+    return len(job_ids)
+
+def _purge_employers(batch_size):
+    employer_ids = db.session.scalars(
+        select(User.id)
+        .where(User.deleted_at.is_not(None), ~exists().where(Job.employer_id == User.id))
+        .limit(batch_size)
+    ).all()
+    if employer_ids:
+        # Both rows of the joined inheritance, without relying on the foreign key cascade
+        db.session.execute(delete(Employer.__table__).where(Employer.__table__.c.id.in_(employer_ids)))
+        db.session.execute(delete(User.__table__).where(User.__table__.c.id.in_(employer_ids)))
+        # Their archived jobs are deleted with them (ON DELETE CASCADE)
+        bump_versions(ARCHIVE)
+    return len(employer_ids)
+
+STEPS = (
+    ('applications', _purge_applications),
+    ('jobs', _purge_jobs),
+    ('employers', _purge_employers),
+)
+
+# Purges at most batch_size rows of the first kind that has any left, in its own transaction.
+# Returns (kind, rows purged), or None when there is nothing left to purge
+def purge_batch(batch_size=None):
+    batch_size = batch_size or current_app.config['PURGE_BATCH_SIZE']
+    for kind, step in STEPS:
+        purged = step(batch_size)
+        if purged:
+            db.session.commit()
+            return kind, purged
+    db.session.rollback()
+    return None
+
+# Controller function to purge soft deleted employers and jobs in batches [ADMIN]
+# Stops after max_batches transactions if given; returns a Counter of the rows purged by kind
+def purge_deleted(batch_size=None, max_batches=None):
+    purged = Counter()
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        result = purge_batch(batch_size)
+        if result is None:
+            break
+        kind, count = result
+        purged[kind] += count
+        batches += 1
+    return purged
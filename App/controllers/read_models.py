@@ -0,0 +1,48 @@
+from collections import namedtuple
+
+from App.models import Job, User, Application
+
+# Read models for the list paths. They select only the columns a listing shows,
+# with Core, into namedtuples: no ORM instances, no identity map and no
+# polymorphic User loading. A row costs one tuple instead of an instance, its
+# state and its __dict__. The field names match the models, so code that only
+# reads attributes (format_job, the CLI) takes either.
+
+class JobRow(namedtuple('JobRow', 'id category description date_posted employer_id')):
+    __slots__ = ()
+
+    def get_json(self):
+        return {
+            'id': self.id,
+            'category': self.category,
+            'description': self.description,
+            'date_posted': self.date_posted.isoformat() if self.date_posted else None,
+            'employer_id': self.employer_id
+        }
+
+class UserRow(namedtuple('UserRow', 'id username user_type')):
+    __slots__ = ()
+
+    def get_json(self):
+        return {
+            'id': self.id,
+            'username': self.username
+        }
+
+class ApplicationRow(namedtuple('ApplicationRow', 'application_id job_id job_seeker_id application_text is_accepted')):
+    __slots__ = ()
+
+    def get_json(self):
+        return self._asdict()
+
+
+def _columns(table, row_class):
+    return tuple(table.c[name] for name in row_class._fields)
+
+JOB_ROW_COLUMNS = _columns(Job.__table__, JobRow)
+USER_ROW_COLUMNS = _columns(User.__table__, UserRow)
+APPLICATION_ROW_COLUMNS = _columns(Application.__table__, ApplicationRow)
+
+# Builds DTOs from the rows of a Core select of the row class's columns
+def as_rows(row_class, result):
+    return list(map(row_class._make, result))
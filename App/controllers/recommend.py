@@ -0,0 +1,56 @@
+from collections import Counter
+
+from flask import current_app
+from sqlalchemy import select
+
+from App.models import db, Job, JobSeeker, Application
+from App.database import read_only
+from .search import tokenize
+from .shards import scatter
+
+# Job recommendations rank every open job by the cosine similarity of its
+# TF-IDF vector (category and description, the category counting
+# CATEGORY_WEIGHT times like in search) to a profile built from the job
+# seeker's application texts. Each worker scores them with a JobRecommender
+# (recommender.py), built on its first recommendation.
+
+
+def get_job_recommender():
+    app = current_app._get_current_object()
+    recommender = app.extensions.get('job_recommender')
+    if recommender is None:
+        # Imported here so NumPy stays out of the CLI's startup
+        from .recommender import JobRecommender
+        recommender = app.extensions.setdefault('job_recommender', JobRecommender())
+    return recommender
+
+# Keep this worker's matrix current after create_job/remove_job commit; a
+# worker that hasn't built one yet will load the jobs when it does.
+# jobs are (id, category, description) tuples
+def recommender_add_jobs(jobs):
+    recommender = current_app.extensions.get('job_recommender')
+    if recommender is not None:
+        recommender.add_jobs(jobs)
+
+def recommender_remove_jobs(job_ids):
+    recommender = current_app.extensions.get('job_recommender')
+    if recommender is not None:
+        recommender.remove_jobs(job_ids)
+
+# Controller function to recommend open jobs to a job seeker, best match first [JOB_SEEKER]
+# Returns (job, score) pairs, leaving out jobs they already applied to
+# limit defaults to RECOMMEND_LIMIT
+@read_only
+def recommend_jobs(job_seeker_id, limit=None):
+    limit = limit or current_app.config['RECOMMEND_LIMIT']
+    if not db.session.query(JobSeeker.id).filter_by(id=job_seeker_id).first():
+        return f"Job Seeker with ID {job_seeker_id} does not exist."
+    recommender = get_job_recommender()
+    recommender.sync()
+    applications = scatter(
+        select(Application.job_id, Application.application_text).where(Application.job_seeker_id == job_seeker_id)
+    )
+    tokens = Counter(token for _, text in applications for token in tokenize(text))
+    best = recommender.recommend(tokens, limit, exclude={job_id for job_id, _ in applications})
+    jobs = {job.id: job for job in Job.query.filter(Job.id.in_([job_id for job_id, _ in best]), Job.deleted_at.is_(None))}
+    return [(jobs[job_id], score) for job_id, score in best if job_id in jobs]
@@ -0,0 +1,212 @@
+import heapq
+import threading
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import func, select
+
+from App.models import db, Job, ArchivedJob
+from .search import tokenize, CATEGORY_WEIGHT
+from .versions import get_version, ALL_JOBS
+
+# The in-memory matrix behind job recommendations (see recommend.py). It lives
+# apart from the controllers App.controllers imports, so NumPy is only loaded
+# by the first worker request that recommends jobs, not by every CLI start.
+#
+# Each worker keeps the term counts of all open jobs in memory as a sparse
+# matrix in coordinate form (parallel NumPy arrays of row, term and count), so
+# scoring every job is a couple of vectorized passes over the non-zero entries.
+# create_job and remove_job add and drop rows as they happen in this worker;
+# jobs changed by other workers or imports are caught up when the jobs version
+# (cache_versions) moves: jobs above the highest id seen are added, and jobs
+# soft deleted or archived since the last catch-up are dropped. A count of the
+# open jobs up to that id tells whether anything else went (a hard delete) or
+# came late (an id handed out before one already seen), and only then are all
+# open ids compared. Nothing is rebuilt: removed rows are masked, and compacted
+# away once they make up half the matrix.
+
+
+def _grown(array, size):
+    # Room for at least `size` entries, doubling so appends stay amortized O(1)
+    if size <= len(array):
+        return array
+    grown = np.zeros(max(size, 2 * len(array), 64), dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class JobRecommender:
+    def __init__(self):
+        self.version = None
+        self.synced_at = None  # When the last catch-up started
+        self.last_job_id = 0  # The highest job id ever added
+        self.terms = {}  # term: column
+        self.rows = {}  # job id: row
+        self.job_ids = np.zeros(0, dtype=np.int64)
+        self.alive = np.zeros(0, dtype=bool)
+        self.row_entries = np.zeros(0, dtype=np.int64)  # A row's entries start here and run to the next row's
+        self.document_frequency = np.zeros(0, dtype=np.int64)
+        self.entry_rows = np.zeros(0, dtype=np.int32)
+        self.entry_terms = np.zeros(0, dtype=np.int32)
+        self.entry_counts = np.zeros(0, dtype=np.float32)
+        self.row_count = 0
+        self.entry_count = 0
+        self.dead_entries = 0
+        self._weights = None  # TF-IDF weights of the entries and row norms, until the next change
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def _column(self, term):
+        column = self.terms.get(term)
+        if column is None:
+            column = self.terms[term] = len(self.terms)
+            self.document_frequency = _grown(self.document_frequency, column + 1)
+        return column
+
+    # jobs are (id, category, description) tuples
+    def add_jobs(self, jobs):
+        with self._lock:
+            for job_id, category, description in jobs:
+                if job_id in self.rows:
+                    continue
+                counts = Counter()
+                for token in tokenize(category):
+                    counts[self._column(token)] += CATEGORY_WEIGHT
+                for token in tokenize(description):
+                    counts[self._column(token)] += 1
+                row = self.row_count
+                self.rows[job_id] = row
+                self.last_job_id = max(self.last_job_id, job_id)
+                self.row_count += 1
+                self.job_ids = _grown(self.job_ids, self.row_count)
+                self.alive = _grown(self.alive, self.row_count)
+                self.row_entries = _grown(self.row_entries, self.row_count + 1)
+                self.job_ids[row] = job_id
+                self.alive[row] = True
+
+                start, end = self.entry_count, self.entry_count + len(counts)
+                self.entry_rows = _grown(self.entry_rows, end)
+                self.entry_terms = _grown(self.entry_terms, end)
+                self.entry_counts = _grown(self.entry_counts, end)
+                columns = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+                self.entry_rows[start:end] = row
+                self.entry_terms[start:end] = columns
+                self.entry_counts[start:end] = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+                self.document_frequency[columns] += 1
+                self.entry_count = end
+                self.row_entries[row + 1] = end
+            self._weights = None
+
+    def remove_jobs(self, job_ids):
+        with self._lock:
+            for job_id in job_ids:
+                row = self.rows.pop(job_id, None)
+                if row is None:
+                    continue
+                self.alive[row] = False
+                start, end = self.row_entries[row], self.row_entries[row + 1]
+                self.document_frequency[self.entry_terms[start:end]] -= 1
+                self.dead_entries += end - start
+            if self.dead_entries * 2 > self.entry_count:
+                self._compact()
+            self._weights = None
+
+    def _compact(self):
+        live_rows = np.flatnonzero(self.alive[:self.row_count])
+        new_row = np.full(self.row_count, -1, dtype=np.int32)
+        new_row[live_rows] = np.arange(len(live_rows), dtype=np.int32)
+        keep = self.alive[self.entry_rows[:self.entry_count]]
+        self.entry_rows = new_row[self.entry_rows[:self.entry_count][keep]]
+        self.entry_terms = self.entry_terms[:self.entry_count][keep]
+        self.entry_counts = self.entry_counts[:self.entry_count][keep]
+        self.row_entries = np.concatenate(([0], np.cumsum(np.diff(self.row_entries[:self.row_count + 1])[live_rows])))
+        self.job_ids = self.job_ids[live_rows]
+        self.alive = np.ones(len(live_rows), dtype=bool)
+        self.rows = {int(job_id): row for row, job_id in enumerate(self.job_ids)}
+        self.row_count = len(live_rows)
+        self.entry_count = len(self.entry_rows)
+        self.dead_entries = 0
+
+    def _idf(self):
+        # Smoothed, so a term in every job still counts a little
+        return np.log((1 + len(self.rows)) / (1 + self.document_frequency[:len(self.terms)])) + 1
+
+    def _entry_weights(self):
+        if self._weights is None:
+            rows = self.entry_rows[:self.entry_count]
+            idf = self._idf()
+            weights = self.entry_counts[:self.entry_count] * idf[self.entry_terms[:self.entry_count]]
+            weights[~self.alive[rows]] = 0
+            norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=self.row_count))
+            self._weights = idf, weights, norms
+        return self._weights
+
+    # The top `limit` (job id, score) pairs for a profile of token counts, best first
+    def recommend(self, tokens, limit, exclude=()):
+        with self._lock:
+            if not self.rows:
+                return []
+            idf, weights, norms = self._entry_weights()
+            profile = np.zeros(len(self.terms), dtype=np.float64)
+            for token, count in tokens.items():
+                column = self.terms.get(token)
+                if column is not None:
+                    profile[column] = count * idf[column]
+            profile_norm = np.linalg.norm(profile)
+            if not profile_norm:
+                return []
+            rows = self.entry_rows[:self.entry_count]
+            dots = np.bincount(rows, weights=weights * profile[self.entry_terms[:self.entry_count]], minlength=self.row_count)
+            scores = np.divide(dots, norms * profile_norm, out=np.zeros(self.row_count), where=norms > 0)
+            excluded = [self.rows[job_id] for job_id in exclude if job_id in self.rows]
+            scores[excluded] = 0
+            candidates = np.flatnonzero(scores > 0)
+            best = heapq.nlargest(limit, zip(scores[candidates].tolist(), self.job_ids[candidates].tolist()))
+        return [(job_id, score) for score, job_id in best]
+
+    # Brings the matrix up to date with the open jobs in the database
+    def sync(self):
+        started = datetime.utcnow()
+        version, _ = get_version(*ALL_JOBS)
+        if version == self.version:
+            return
+        if self.synced_at is not None:
+            self.remove_jobs(db.session.scalars(select(Job.id).where(Job.deleted_at >= self.synced_at)).all())
+            self.remove_jobs(db.session.scalars(select(ArchivedJob.id).where(ArchivedJob.archived_at >= self.synced_at)).all())
+        self._add_jobs_after(self.last_job_id)
+        open_jobs = db.session.scalar(select(func.count()).where(Job.id <= self.last_job_id, Job.deleted_at.is_(None)))
+        if open_jobs != len(self):
+            self._compare_open_jobs()
+        self.version, self.synced_at = version, started
+
+    # Adds the open jobs above the given id, RECOMMEND_SYNC_BATCH_SIZE per query
+    def _add_jobs_after(self, job_id):
+        batch_size = current_app.config['RECOMMEND_SYNC_BATCH_SIZE']
+        while True:
+            jobs = db.session.execute(
+                select(Job.id, Job.category, Job.description)
+                .where(Job.id > job_id, Job.deleted_at.is_(None))
+                .order_by(Job.id)
+                .limit(batch_size)
+            ).all()
+            self.add_jobs(jobs)
+            if len(jobs) < batch_size:
+                return
+            job_id = jobs[-1].id
+
+    # Every open id against the matrix's, for the changes the deltas can't see
+    def _compare_open_jobs(self):
+        open_ids = set(db.session.scalars(select(Job.id).where(Job.deleted_at.is_(None))))
+        with self._lock:
+            removed = [job_id for job_id in self.rows if job_id not in open_ids]
+            added = sorted(open_ids.difference(self.rows))
+        self.remove_jobs(removed)
+        batch_size = current_app.config['RECOMMEND_SYNC_BATCH_SIZE']
+        for start in range(0, len(added), batch_size):
+            self.add_jobs(db.session.execute(
+                select(Job.id, Job.category, Job.description).where(Job.id.in_(added[start:start + batch_size]))
+            ).all())
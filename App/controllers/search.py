@@ -0,0 +1,165 @@
+import re
+from collections import Counter
+
+from flask import current_app
+from sqlalchemy import case, event, func, text
+from App.models import db, Job, JobTerm
+from App.database import read_only
+from .versions import bump_versions, ALL_JOBS
+
+# Job search keeps an inverted index over Job.category and Job.description.
+# On SQLite the index is an FTS5 virtual table keyed by job id, everywhere else
+# the job_terms table is filled from the same tokenizer in Python.
+
+FTS_TABLE = 'jobs_fts'
+CATEGORY_WEIGHT = 2
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(value):
+    return [token.lower() for token in _TOKEN_RE.findall(value or '')]
+
+def _uses_fts5(connection):
+    if connection.dialect.name != 'sqlite':
+        return False
+    # Checked once per pooled connection rather than on every index update
+    if 'fts5' not in connection.info:
+        connection.info['fts5'] = bool(connection.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar())
+    return connection.info['fts5']
+
+def _create_fts_table(connection):
+    connection.execute(text(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(category, description, tokenize='unicode61')"
+    ))
+
+# The virtual table lives and dies with the jobs table so create_all/drop_all manage it
+@event.listens_for(Job.__table__, 'after_create')
+def _after_jobs_create(target, connection, **kw):
+    if _uses_fts5(connection):
+        _create_fts_table(connection)
+
+@event.listens_for(Job.__table__, 'before_drop')
+def _before_jobs_drop(target, connection, **kw):
+    if connection.dialect.name == 'sqlite':
+        connection.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+
+
+def _job_terms(job):
+    weights = Counter()
+    for token in tokenize(job.category):
+        weights[token] += CATEGORY_WEIGHT
+    for token in tokenize(job.description):
+        weights[token] += 1
+    return [{'term': term[:100], 'job_id': job.id, 'weight': weight} for term, weight in weights.items()]
+
+# Adds or refreshes jobs in the search index inside the caller's transaction
+def index_jobs(jobs):
+    jobs = list(jobs)
+    if not jobs:
+        return
+    connection = db.session.connection()
+    unindex_jobs([job.id for job in jobs])
+    if _uses_fts5(connection):
+        connection.execute(
+            text(f"INSERT INTO {FTS_TABLE} (rowid, category, description) VALUES (:id, :category, :description)"),
+            [{'id': job.id, 'category': job.category, 'description': job.description} for job in jobs]
+        )
+    else:
+        rows = [row for job in jobs for row in _job_terms(job)]
+        if rows:
+            connection.execute(JobTerm.__table__.insert(), rows)
+
+def index_job(job):
+    index_jobs([job])
+
+# Removes jobs from the search index inside the caller's transaction
+def unindex_jobs(job_ids):
+    job_ids = [int(job_id) for job_id in job_ids]
+    if not job_ids:
+        return
+    connection = db.session.connection()
+    if _uses_fts5(connection):
+        connection.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), [{'id': job_id} for job_id in job_ids])
+    else:
+        connection.execute(JobTerm.__table__.delete().where(JobTerm.job_id.in_(job_ids)))
+
+# Controller function to rebuild the search index from the open jobs [ADMIN]
+def rebuild_search_index(batch_size=1000):
+    connection = db.session.connection()
+    if _uses_fts5(connection):
+        _create_fts_table(connection)
+        connection.execute(text(f"DELETE FROM {FTS_TABLE}"))
+        connection.execute(text(f"INSERT INTO {FTS_TABLE} (rowid, category, description) SELECT id, category, description FROM jobs WHERE deleted_at IS NULL"))
+    else:
+        connection.execute(JobTerm.__table__.delete())
+        batch = []
+        for job in Job.query.filter(Job.deleted_at.is_(None)).order_by(Job.id).yield_per(batch_size):
+            batch.extend(_job_terms(job))
+            if len(batch) >= batch_size:
+                connection.execute(JobTerm.__table__.insert(), batch)
+                batch = []
+        if batch:
+            connection.execute(JobTerm.__table__.insert(), batch)
+    # Search results are cached on the jobs version
+    bump_versions(ALL_JOBS)
+    db.session.commit()
+    count = Job.query.filter(Job.deleted_at.is_(None)).count()
+    return f"Search index rebuilt for {count} jobs."
+
+
+def _search_fts5(tokens, limit):
+    # Every token is quoted so user input can never be parsed as FTS5 query syntax
+    match = " ".join('"' + token.replace('"', '""') + '"' for token in tokens)
+    statement = text(
+        f"SELECT jobs.* FROM {FTS_TABLE} JOIN jobs ON jobs.id = {FTS_TABLE}.rowid "
+        f"WHERE {FTS_TABLE} MATCH :match ORDER BY bm25({FTS_TABLE}, {float(CATEGORY_WEIGHT)}, 1.0) LIMIT :limit"
+    )
+    return db.session.query(Job).from_statement(statement).params(match=match, limit=limit).all()
+
+def _search_terms(tokens, limit):
+    terms = sorted(set(token[:100] for token in tokens))
+    document_frequency = dict(
+        db.session.query(JobTerm.term, func.count(JobTerm.job_id))
+        .filter(JobTerm.term.in_(terms))
+        .group_by(JobTerm.term)
+        .all()
+    )
+    # A job has to contain every term, so a missing term means no results
+    if len(document_frequency) < len(terms):
+        return []
+
+    # Rarer terms count for more; the weights only need to order jobs, so 1/df stands in for idf
+    idf = case(
+        {term: 1.0 / count for term, count in document_frequency.items()},
+        value=JobTerm.term
+    )
+    score = func.sum(JobTerm.weight * idf).label('score')
+    ranked = (
+        db.session.query(JobTerm.job_id, score)
+        .filter(JobTerm.term.in_(terms))
+        .group_by(JobTerm.job_id)
+        .having(func.count(JobTerm.term) == len(terms))
+        .subquery()
+    )
+    return (
+        db.session.query(Job)
+        .join(ranked, ranked.c.job_id == Job.id)
+        .order_by(ranked.c.score.desc(), Job.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+# Controller function to search jobs by category and description, best match first [ALL_USERS]
+# At most JOB_PAGE_SIZE_MAX results; a limit below 1 raises ValueError like the listings' page size
+@read_only
+def search_jobs(terms, limit=20):
+    if limit < 1:
+        raise ValueError("Page size must be at least 1.")
+    limit = min(limit, current_app.config['JOB_PAGE_SIZE_MAX'])
+    tokens = tokenize(terms)
+    if not tokens:
+        return []
+    if _uses_fts5(db.session.connection()):
+        return _search_fts5(tokens, limit)
+    return _search_terms(tokens, limit)
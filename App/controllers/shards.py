@@ -0,0 +1,256 @@
+from collections import defaultdict
+
+from flask import current_app
+from sqlalchemy import delete, exists, func, insert, literal, select, update
+from App.models import db, Job, JobSeeker, Application, JobShard, ApplicationDirectory, SHARD_APPLICATIONS
+from App.database import using_shard, dialect_insert, read_only
+
+# Applications can be spread over several databases (DB_SHARDS), by job: all
+# the applications of a job live on one shard, which job_shards records. Every
+# other table stays on the primary, and so do the application counters, events
+# and cache versions, which writers keep up to date as before. With DB_SHARDS
+# empty the applications table of the primary is the one and only shard, None,
+# and the writers and reads below are the queries they always were.
+#
+# - Writes for a job (apply_to_job, review_applications) and reads of its
+#   applicants go to the job's shard. Routes that only have an application id
+#   find its job in application_directory, which also hands out application ids
+#   unique across the shards.
+# - Reads by job seeker (view_job_status_all, recommendations) and removals of
+#   job seekers ask every shard and merge the rows (scatter-gather).
+# - `flask admin rebalance` moves a job's applications to another shard.
+#
+# A write that touches a shard and the primary commits the two one after the
+# other, not atomically; `flask admin recount` rebuilds the counters from the shards.
+
+# Rows per INSERT when a job's applications move to another shard
+MOVE_CHUNK_SIZE = 500
+
+NOT_SHARDED = "Applications are not sharded, set DB_SHARDS."
+
+def shard_binds():
+    return current_app.extensions.get('shard_binds', [])
+
+def is_sharded():
+    return bool(shard_binds())
+
+# Where applications live: the shard binds, or [None] (the primary) when DB_SHARDS is empty
+def application_shards():
+    return shard_binds() or [None]
+
+# The shard a job's applications go to when nobody applied to it yet
+def default_shard(job_id):
+    binds = shard_binds()
+    return binds[job_id % len(binds)]
+
+# {job_id: shard} of the jobs applied to so far; without shards every job is on the primary (None)
+def job_shards(job_ids):
+    job_ids = set(job_ids)
+    if not is_sharded():
+        return dict.fromkeys(job_ids)
+    table = JobShard.__table__
+    return dict(db.session.execute(select(table.c.job_id, table.c.shard).where(table.c.job_id.in_(job_ids))).all())
+
+# The shard to find a job's applications on
+def job_shard(job_id):
+    if not is_sharded():
+        return None
+    return job_shards([job_id]).get(job_id) or default_shard(job_id)
+
+# {job_id: shard} of the jobs' applications, giving jobs without one their default shard.
+# Inside the caller's transaction; FOR SHARE makes applications wait for a rebalance of their job
+def place_jobs(job_ids):
+    job_ids = sorted(set(job_ids))
+    if not is_sharded():
+        return dict.fromkeys(job_ids)
+    table = JobShard.__table__
+    rows = [{'job_id': job_id, 'shard': default_shard(job_id)} for job_id in job_ids]
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        db.session.execute(dialect_insert(dialect)(table).on_conflict_do_nothing(), rows)
+    else:
+        placed = set(db.session.scalars(select(table.c.job_id).where(table.c.job_id.in_(job_ids))))
+        missing = [row for row in rows if row['job_id'] not in placed]
+        if missing:
+            db.session.execute(insert(table), missing)
+    return dict(db.session.execute(
+        select(table.c.job_id, table.c.shard).where(table.c.job_id.in_(job_ids)).with_for_update(read=True)
+    ).all())
+
+def place_job(job_id):
+    return place_jobs([job_id])[job_id]
+
+# {shard: [job_id, ...]} of the jobs that may have applications
+def jobs_by_shard(job_ids):
+    grouped = defaultdict(list)
+    for job_id, shard in job_shards(job_ids).items():
+        grouped[shard].append(job_id)
+    return dict(grouped)
+
+# {shard: [application_id, ...]}, leaving out ids that don't exist when sharded
+def applications_by_shard(application_ids):
+    application_ids = list(application_ids)
+    if not is_sharded():
+        return {None: application_ids} if application_ids else {}
+    directory, table = ApplicationDirectory.__table__, JobShard.__table__
+    grouped = defaultdict(list)
+    for application_id, shard in db.session.execute(
+        select(directory.c.application_id, table.c.shard)
+        .join(table, table.c.job_id == directory.c.job_id)
+        .where(directory.c.application_id.in_(application_ids))
+    ):
+        grouped[shard].append(application_id)
+    return dict(grouped)
+
+# The shard of an application. None without shards, and for ids the directory doesn't know,
+# whose lookups then go to the primary's applications table and find nothing
+def application_shard(application_id):
+    return next(iter(applications_by_shard([application_id])), None)
+
+# All the rows of the statement from every shard (or the ones given), one shard after the other
+def scatter(statement, shards=None):
+    rows = []
+    for shard in application_shards() if shards is None else shards:
+        with using_shard(shard):
+            rows.extend(db.session.execute(statement).all())
+    return rows
+
+# A new id from application_directory for an application to a job, if the job is open and the job seeker
+# exists; None otherwise. Taking the primary's write lock first orders it after any rebalance of the job
+def allocate_application_id(job_id, job_seeker_id):
+    directory = ApplicationDirectory.__table__
+    return db.session.execute(
+        insert(directory).from_select(
+            ['job_id'],
+            select(literal(job_id, db.Integer)).where(
+                exists().where(Job.id == job_id, Job.deleted_at.is_(None)),
+                exists().where(JobSeeker.id == job_seeker_id)
+            )
+        ).returning(directory.c.application_id)
+    ).scalar()
+
+# Inserts an application with its directory id on the current shard; 0 rows if the job seeker already applied
+def insert_sharded_application(application_id, job_id, job_seeker_id, application_text):
+    values = {'application_id': application_id, 'job_id': job_id, 'job_seeker_id': job_seeker_id, 'application_text': application_text}
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        statement = dialect_insert(dialect)(SHARD_APPLICATIONS).values(values).on_conflict_do_nothing()
+    else:
+        statement = insert(SHARD_APPLICATIONS).values(values).prefix_with('IGNORE')
+    return db.session.execute(statement).rowcount
+
+# Inserts new applications, dicts of job_id, job_seeker_id and application_text, on their jobs' shards
+# with ids from the directory. The caller has made sure none of them exists yet
+def insert_sharded_applications(values):
+    directory = ApplicationDirectory.__table__
+    application_ids = db.session.scalars(
+        insert(directory).returning(directory.c.application_id, sort_by_parameter_order=True),
+        [{'job_id': row['job_id']} for row in values]
+    ).all()
+    shards = place_jobs(row['job_id'] for row in values)
+    grouped = defaultdict(list)
+    for application_id, row in zip(application_ids, values):
+        grouped[shards[row['job_id']]].append({**row, 'application_id': application_id})
+    for shard, rows in grouped.items():
+        with using_shard(shard):
+            db.session.execute(insert(SHARD_APPLICATIONS), rows)
+
+# Deletes the applications matching the condition from every shard, with their directory entries.
+# Only needed with shards: on the primary the database deletes them with their job or job seeker
+def delete_sharded_applications(condition, shards=None):
+    if not is_sharded():
+        return
+    application_ids = []
+    for shard in application_shards() if shards is None else shards:
+        with using_shard(shard):
+            ids = db.session.scalars(select(Application.application_id).where(condition)).all()
+            if ids:
+                db.session.execute(delete(Application.__table__).where(Application.__table__.c.application_id.in_(ids)))
+        application_ids += ids
+    if application_ids:
+        db.session.execute(delete(ApplicationDirectory).where(ApplicationDirectory.application_id.in_(application_ids)))
+
+
+# Moves a job's applications to another shard and points the shard map there, in one transaction.
+# Returns the number of applications moved
+def move_job(job_id, target):
+    table = JobShard.__table__
+    source = db.session.execute(select(table.c.shard).where(table.c.job_id == job_id)).scalar()
+    if source is None:
+        db.session.execute(insert(table).values(job_id=job_id, shard=target))
+        db.session.commit()
+        return 0
+    # Changing the map row first holds back applications to the job until the move commits (see place_job)
+    db.session.execute(update(table).where(table.c.job_id == job_id).values(shard=target))
+    with using_shard(source):
+        rows = [dict(row) for row in db.session.execute(
+            select(SHARD_APPLICATIONS).where(SHARD_APPLICATIONS.c.job_id == job_id).order_by(SHARD_APPLICATIONS.c.application_id)
+        ).mappings()]
+    with using_shard(target):
+        for start in range(0, len(rows), MOVE_CHUNK_SIZE):
+            db.session.execute(insert(SHARD_APPLICATIONS), rows[start:start + MOVE_CHUNK_SIZE])
+    with using_shard(source):
+        db.session.execute(delete(SHARD_APPLICATIONS).where(SHARD_APPLICATIONS.c.job_id == job_id))
+    db.session.commit()
+    return len(rows)
+
+# Controller function to move the applications of a job to a shard [ADMIN]
+def rebalance_job(job_id, shard):
+    if not is_sharded():
+        return NOT_SHARDED
+    if shard not in shard_binds():
+        return f"Unknown shard '{shard}'. Choose from {', '.join(shard_binds())}."
+    if not db.session.query(exists().where(Job.id == job_id)).scalar():
+        return f"Job with ID {job_id} does not exist."
+    if job_shards([job_id]).get(job_id) == shard:
+        return f"Job {job_id} is already on {shard}."
+    moved = move_job(job_id, shard)
+    return f"Moved {moved} applications of Job {job_id} to {shard}."
+
+# {shard: applications} counted from the jobs' applicant counters, without asking the shards
+def shard_sizes():
+    table = JobShard.__table__
+    sizes = dict.fromkeys(shard_binds(), 0)
+    for shard, count in db.session.execute(
+        select(table.c.shard, func.coalesce(func.sum(Job.applicant_count), 0))
+        .join(Job, Job.id == table.c.job_id)
+        .group_by(table.c.shard)
+    ):
+        sizes[shard] = count
+    return sizes
+
+# Controller function to even out the shards by moving whole jobs from the fullest to the emptiest shard [ADMIN]
+# Each move takes the biggest job that narrows the gap; returns [(job_id, source, target, applications)]
+def rebalance_shards(max_moves=10):
+    if not is_sharded():
+        return NOT_SHARDED
+    table = JobShard.__table__
+    moves = []
+    while len(moves) < max_moves:
+        sizes = shard_sizes()
+        fullest, emptiest = max(sizes, key=sizes.get), min(sizes, key=sizes.get)
+        gap = sizes[fullest] - sizes[emptiest]
+        job = db.session.execute(
+            select(Job.id, Job.applicant_count)
+            .join(table, table.c.job_id == Job.id)
+            .where(table.c.shard == fullest, Job.applicant_count > 0, Job.applicant_count < gap)
+            .order_by(Job.applicant_count.desc(), Job.id)
+            .limit(1)
+        ).first()
+        db.session.rollback()
+        if job is None:
+            break
+        moves.append((job.id, fullest, emptiest, move_job(job.id, emptiest)))
+    return moves
+
+# Controller function for the number of jobs and applications on each shard [ADMIN]
+@read_only
+def get_shard_status():
+    status = []
+    for shard in application_shards():
+        with using_shard(shard):
+            jobs, applications = db.session.execute(
+                select(func.count(SHARD_APPLICATIONS.c.job_id.distinct()), func.count())
+            ).one()
+        status.append({'shard': shard or 'primary', 'jobs': jobs, 'applications': applications})
+    return status
@@ -1,5 +1,9 @@
+from sqlalchemy import select
+
 from App.models import User
 from App.database import db
+from .read_models import UserRow, USER_ROW_COLUMNS, as_rows
+from .user_cache import invalidate_cached_user
 
 # def create_user(username, password):
 #     newuser = User(username=username, password=password)
@@ -14,20 +18,18 @@ def get_user(id):
     return User.query.get(id)
 
 def get_all_users():
-    return User.query.all()
+    return User.query.filter_by(deleted_at=None).all()
 
 def get_all_users_json():
-    users = User.query.all()
-    if not users:
-        return []
-    users = [user.get_json() for user in users]
-    return users
+    users = as_rows(UserRow, db.session.execute(select(*USER_ROW_COLUMNS).where(User.deleted_at.is_(None))))
+    return [user.get_json() for user in users]
 
 def update_user(id, username):
     user = get_user(id)
     if user:
         user.username = username
         db.session.add(user)
-        return db.session.commit()
+        db.session.commit()
+        invalidate_cached_user(id)
     return None
     
\ No newline at end of file
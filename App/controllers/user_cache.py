@@ -0,0 +1,119 @@
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, g
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from App.models import db, User
+
+# Resolving the logged in user costs no queries once it is cached.
+# Each worker process keeps a bounded LRU of users' column values that expire
+# after USER_CACHE_TTL seconds, and each request memoizes the instance it
+# rebuilt from them in flask.g. Other workers only see a change once their
+# entry expires, so the TTL bounds how stale a cached user can be.
+
+
+class UserCache:
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+            self._entries.move_to_end(user_id)
+            return value
+
+    def set(self, user_id, value):
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def setup_user_cache(app):
+    cache = UserCache(app.config['USER_CACHE_SIZE'], app.config['USER_CACHE_TTL'])
+    app.extensions['user_cache'] = cache
+
+    # create_app keeps an app context pushed, so g outlives a request unless the memo is reset
+    @app.before_request
+    def reset_cached_users():
+        g.pop('_cached_users', None)
+
+    return cache
+
+def _user_cache():
+    return current_app.extensions.get('user_cache')
+
+def _as_user_id(user_id):
+    try:
+        return int(user_id)
+    except (TypeError, ValueError):
+        return None
+
+# Only plain column values are cached, never instances bound to another request's session
+def _snapshot(user):
+    mapper = inspect(user).mapper
+    return mapper.class_, {attr.key: getattr(user, attr.key) for attr in mapper.column_attrs}
+
+def _restore(snapshot):
+    cls, values = snapshot
+    user = inspect(cls).class_manager.new_instance()
+    for key, value in values.items():
+        setattr(user, key, value)
+    # Attach to this request's session as an already loaded row, without a SELECT
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+# Returns the user with this id, going to the database only on a cache miss
+def get_cached_user(user_id):
+    user_id = _as_user_id(user_id)
+    if user_id is None:
+        return None
+
+    memo = g.setdefault('_cached_users', {})
+    if user_id in memo:
+        return memo[user_id]
+
+    cache = _user_cache()
+    snapshot = cache.get(user_id) if cache is not None else None
+    if snapshot is not None:
+        user = _restore(snapshot)
+    else:
+        user = db.session.get(User, user_id)
+        if user is not None and user.deleted_at is not None:
+            user = None
+        if user is not None and cache is not None:
+            cache.set(user_id, _snapshot(user))
+    memo[user_id] = user
+    return user
+
+# Drops a user from the process cache and the request memo after it changed or was removed
+def invalidate_cached_user(user_id):
+    user_id = _as_user_id(user_id)
+    cache = _user_cache()
+    if cache is not None:
+        cache.invalidate(user_id)
+    g.get('_cached_users', {}).pop(user_id, None)
@@ -0,0 +1,79 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, literal_column, select, update, insert
+
+from App.models import db, CacheVersion
+from App.database import read_only, dialect_insert
+
+# Writes bump the version of every view they change, in the same transaction,
+# and the read endpoints turn (version, updated_at) into ETag/Last-Modified so
+# unchanged data can be answered with 304 Not Modified.
+
+ALL_JOBS = ('jobs', 0)
+ARCHIVE = ('archive', 0)
+
+def employer_scope(employer_id):
+    return ('employer', int(employer_id))
+
+def job_scope(job_id):
+    return ('job', int(job_id))
+
+def job_seeker_scope(job_seeker_id):
+    return ('job_seeker', int(job_seeker_id))
+
+
+# Last-Modified only has whole seconds, so every version of a scope gets an updated_at in a
+# later second than the one before: now, or the start of the next second if that is still
+# ahead. Two writes in one second can then never share a Last-Modified (If-Modified-Since).
+def _next_updated_at(dialect, previous, now):
+    if dialect == 'sqlite':
+        # Stored as text that sorts like the time; strftime drops the fraction of the second
+        return func.max(now, func.strftime('%Y-%m-%d %H:%M:%S', previous, '+1 second'))
+    return func.greatest(now, func.date_trunc('second', previous) + literal_column("interval '1 second'"))
+
+# Increments the given (scope, key) counters inside the caller's transaction
+def bump_versions(*scopes):
+    scopes = sorted(set(scopes))
+    if not scopes:
+        return
+    now = datetime.utcnow()
+    rows = [{'scope': scope, 'key': key, 'version': 1, 'updated_at': now} for scope, key in scopes]
+    table = CacheVersion.__table__
+    dialect = db.session.get_bind().dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        upsert = dialect_insert(dialect)(table)
+        db.session.execute(upsert.on_conflict_do_update(
+            index_elements=[table.c.scope, table.c.key],
+            set_={
+                'version': table.c.version + 1,
+                'updated_at': _next_updated_at(dialect, table.c.updated_at, upsert.excluded.updated_at)
+            }
+        ), rows)
+        return
+    for row in rows:
+        previous = db.session.execute(
+            select(table.c.updated_at).where(table.c.scope == row['scope'], table.c.key == row['key']).with_for_update()
+        ).first()
+        if previous is None:
+            db.session.execute(insert(table), row)
+            continue
+        updated_at = now
+        if previous.updated_at is not None:
+            updated_at = max(now, previous.updated_at.replace(microsecond=0) + timedelta(seconds=1))
+        db.session.execute(
+            update(table)
+            .where(table.c.scope == row['scope'], table.c.key == row['key'])
+            .values(version=table.c.version + 1, updated_at=updated_at)
+        )
+
+# Returns (version, updated_at) for a scope with a single Core query; (0, None) if it never changed
+# Read from the same replica as the data it versions, so an ETag never runs ahead of the body
+@read_only
+def get_version(scope, key):
+    table = CacheVersion.__table__
+    row = db.session.execute(
+        select(table.c.version, table.c.updated_at).where(table.c.scope == scope, table.c.key == int(key))
+    ).first()
+    if row is None:
+        return 0, None
+    return row.version, row.updated_at
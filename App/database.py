@@ -1,14 +1,323 @@
+import functools
+import importlib
+import inspect
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+from App.passwords import gevent_patched
+
+
+_read_only = ContextVar('read_only', default=False)
+_shard = ContextVar('shard', default=None)
+
+# Reads of controllers marked @read_only go to a replica bind (DB_REPLICAS), everything else to the primary.
+# Once the session has written, by a flush or an INSERT/UPDATE/DELETE run through execute(),
+# it reads from the primary for the rest of the request, so a request always sees its own
+# writes whatever the replica lag.
+# Inside using_shard(bind), statements go to that application shard (DB_SHARDS) instead.
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        shard = _shard.get()
+        if shard is not None and bind is None:
+            return self._db.engines[shard]
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        # Core writes never flush, so they mark the session here
+        if clause is not None and getattr(clause, 'is_dml', False):
+            self.info['wrote_primary'] = True
+        if bind is not None or not _read_only.get() or self._flushing or self.info.get('wrote_primary'):
+            return engine
+        # Models on a bind of their own are never replicated
+        engines = self._db.engines
+        if engine is not engines.get(None):
+            return engine
+        replicas = current_app.extensions.get('replica_binds')
+        if not replicas:
+            return engine
+        # One replica per request, so its reads see a single point in time
+        if self.info.get('replica') not in replicas:
+            self.info['replica'] = random.choice(replicas)
+        return engines[self.info['replica']]
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _stick_to_primary(session, flush_context):
+    session.info['wrote_primary'] = True
+
+# Marks a controller whose queries may be served by a replica
+def read_only(function):
+    if inspect.isgeneratorfunction(function):
+        return _read_only_generator(function)
+
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        token = _read_only.set(True)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            _read_only.reset(token)
+    return wrapper
+
+# Generators run in steps, so the routing only applies while the generator itself runs
+def _read_only_generator(function):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        generator = function(*args, **kwargs)
+        while True:
+            token = _read_only.set(True)
+            try:
+                item = next(generator)
+            except StopIteration:
+                return
+            finally:
+                _read_only.reset(token)
+            yield item
+    return wrapper
+
+# Runs the statements of the block on an application shard bind; None leaves them on the primary.
+# The session keeps one transaction per database it used and commits them all together
+@contextmanager
+def using_shard(bind):
+    token = _shard.set(bind)
+    try:
+        yield
+    finally:
+        _shard.reset(token)
 
+# Forgets the chosen replica and the request's writes, at the start of every request
+def reset_routing():
+    db.session.info.pop('wrote_primary', None)
+    db.session.info.pop('replica', None)
+
+
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+
+# Engine settings come from the DB_* and SQLITE_* config keys (see load_config).
+# Explicit SQLALCHEMY_ENGINE_OPTIONS still win over anything built here.
+#
+# - Pool: size, overflow, checkout timeout, recycle and pre-ping for every
+#   database with a connection pool (in-memory SQLite has a single connection).
+# - SQLite: WAL journal so readers never wait for the writer, busy_timeout so a
+#   writer waits for the lock instead of failing with "database is locked", and
+#   the synchronous level, all set on every new connection.
+# - PostgreSQL under the gevent worker: psycopg2 waits on its socket through
+#   gevent, so a query yields to other greenlets instead of blocking the hub.
+# - Replicas: every URI in DB_REPLICAS becomes a bind named replica_<n>, which
+#   RoutingSession uses for @read_only controllers.
+# - Shards: every URI in DB_SHARDS becomes a bind named shard_<n> holding only
+#   an applications table (see App/controllers/shards.py).
+
+SQLITE_SYNCHRONOUS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
 
-db = SQLAlchemy()
 
 def get_migrate(app):
+    # Flask-Migrate pulls in alembic, which only the `flask db` commands need
+    from flask_migrate import Migrate
     return Migrate(app, db)
 
 def create_db():
-    db.create_all()
-    
+    # Only the primary's models: Flask-SQLAlchemy keeps an (empty) metadata for every
+    # replica and shard bind any app in the process has configured
+    db.create_all(bind_key=None)
+    create_shard_tables()
+
+# The applications table of every shard; the primary's tables come from db.create_all()
+def create_shard_tables():
+    from App.models import SHARD_METADATA
+    for bind in current_app.extensions.get('shard_binds', []):
+        SHARD_METADATA.create_all(db.engines[bind])
+
+def drop_shard_tables():
+    from App.models import SHARD_METADATA
+    for bind in current_app.extensions.get('shard_binds', []):
+        SHARD_METADATA.drop_all(db.engines[bind])
+
+# The insert() of the 'sqlite' or 'postgresql' dialect, which has ON CONFLICT.
+# Imported when needed: the engine has already loaded its own dialect, and a CLI
+# command against SQLite never pays for importing the PostgreSQL one.
+def dialect_insert(dialect):
+    return importlib.import_module(f'sqlalchemy.dialects.{dialect}').insert
+
+def _is_memory_sqlite(url):
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+# SQLAlchemy engine options for the configured database
+def engine_options(config):
+    url = make_url(config['SQLALCHEMY_DATABASE_URI'])
+    if _is_memory_sqlite(url):
+        return {}
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+    }
+
+def sqlite_pragmas(config, url):
+    pragmas = [f"busy_timeout = {int(config['SQLITE_BUSY_TIMEOUT'])}"]
+    synchronous = str(config['SQLITE_SYNCHRONOUS']).upper()
+    if synchronous not in SQLITE_SYNCHRONOUS:
+        raise ValueError(f"SQLITE_SYNCHRONOUS must be one of {', '.join(SQLITE_SYNCHRONOUS)}, not '{synchronous}'.")
+    pragmas.append(f"synchronous = {synchronous}")
+    # SQLite only enforces foreign keys, and so ON DELETE CASCADE, when asked to on each connection
+    if config['SQLITE_FOREIGN_KEYS']:
+        pragmas.append("foreign_keys = ON")
+    # The journal mode is a property of the file, an in-memory database has none to change
+    if config['SQLITE_JOURNAL_MODE'] and not _is_memory_sqlite(url):
+        pragmas.insert(0, f"journal_mode = {config['SQLITE_JOURNAL_MODE']}")
+    return pragmas
+
+def _apply_sqlite_pragmas(engine, pragmas):
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(f"PRAGMA {pragma}")
+        finally:
+            cursor.close()
+
+
+def _gevent_wait_callback(connection, timeout=None):
+    # psycopg2's asynchronous protocol, waiting on the socket through gevent
+    from gevent.socket import wait_read, wait_write
+    from psycopg2 import extensions, OperationalError
+    while True:
+        state = connection.poll()
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            wait_read(connection.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(connection.fileno(), timeout=timeout)
+        else:
+            raise OperationalError(f"Bad result from poll: {state}")
+
+def enable_psycopg2_gevent():
+    from psycopg2 import extensions
+    if extensions.get_wait_callback() is None:
+        extensions.set_wait_callback(_gevent_wait_callback)
+
+
+class PoolStats:
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.invalidated = 0
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+
+    def get_json(self):
+        return {
+            'connects': self.connects,
+            'checkouts': self.checkouts,
+            'checked_out': self.checked_out,
+            'peak_checked_out': self.peak_checked_out,
+            'invalidated': self.invalidated,
+            'since': self.started_at,
+        }
+
+def _track_pool(engine):
+    stats = PoolStats()
+
+    @event.listens_for(engine, 'connect')
+    def on_connect(dbapi_connection, connection_record):
+        with stats._lock:
+            stats.connects += 1
+
+    @event.listens_for(engine, 'checkout')
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        with stats._lock:
+            stats.checkouts += 1
+            stats.checked_out += 1
+            stats.peak_checked_out = max(stats.peak_checked_out, stats.checked_out)
+
+    @event.listens_for(engine, 'checkin')
+    def on_checkin(dbapi_connection, connection_record):
+        with stats._lock:
+            stats.checked_out = max(0, stats.checked_out - 1)
+
+    @event.listens_for(engine, 'invalidate')
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        with stats._lock:
+            stats.invalidated += 1
+
+    return stats
+
+# Adds the pragmas and pool tracking to an engine built from this config
+def configure_engine(engine, config):
+    if engine.dialect.name == 'sqlite':
+        _apply_sqlite_pragmas(engine, sqlite_pragmas(config, engine.url))
+    elif engine.dialect.driver == 'psycopg2' and config['DB_GEVENT_WAIT_CALLBACK'] and gevent_patched():
+        enable_psycopg2_gevent()
+    return _track_pool(engine)
+
+def replica_binds(config):
+    return {f'replica_{number}': uri for number, uri in enumerate(config['DB_REPLICAS'])}
+
+def shard_binds(config):
+    return {f'shard_{number}': uri for number, uri in enumerate(config['DB_SHARDS'])}
+
 def init_db(app):
-    db.init_app(app)
\ No newline at end of file
+    replicas = replica_binds(app.config)
+    shards = shard_binds(app.config)
+    app.config['SQLALCHEMY_BINDS'] = {**app.config.get('SQLALCHEMY_BINDS', {}), **replicas, **shards}
+    app.extensions['replica_binds'] = list(replicas)
+    app.extensions['shard_binds'] = list(shards)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        **engine_options(app.config),
+        **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {})
+    }
+    db.init_app(app)
+    with app.app_context():
+        app.extensions['pool_stats'] = {
+            bind: configure_engine(engine, app.config) for bind, engine in db.engines.items()
+        }
+    app.before_request(reset_routing)
+
+# Copies the primary SQLite database into every SQLite replica, for trying out replicas locally
+def sync_sqlite_replicas(app):
+    with app.app_context():
+        primary = db.engines[None]
+        if primary.dialect.name != 'sqlite':
+            raise ValueError(f"Replicas of a {primary.dialect.name} database are kept in sync by the database server.")
+        synced = []
+        for bind in app.extensions.get('replica_binds', []):
+            replica = db.engines[bind]
+            source, target = primary.raw_connection(), replica.raw_connection()
+            try:
+                source.driver_connection.backup(target.driver_connection)
+            finally:
+                target.close()
+                source.close()
+            synced.append(bind)
+        return synced
+
+# Usage of every engine's pool in this worker process, keyed by bind ('default' for the main database)
+def pool_status(app):
+    status = {}
+    with app.app_context():
+        for bind, engine in db.engines.items():
+            pool = engine.pool
+            entry = {'pool': type(pool).__name__, 'status': pool.status()}
+            # Only queue pools have a size and an overflow to report
+            for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+                if hasattr(pool, name):
+                    entry[name] = getattr(pool, name)()
+            if hasattr(pool, '_max_overflow'):
+                entry['max_overflow'] = pool._max_overflow
+            stats = app.extensions.get('pool_stats', {}).get(bind)
+            if stats is not None:
+                entry.update(stats.get_json())
+            status[bind or 'default'] = entry
+    return status
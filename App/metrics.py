@@ -0,0 +1,248 @@
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+from App.database import db
+
+# Request and SQL metrics in the Prometheus text format, served at /metrics.
+#
+# Every request is counted by route (the rule, e.g. /api/jobs/<int:job_id>,
+# so ids don't multiply the series), method and status, and its latency and
+# the number and time of the SQL statements it ran go into histograms.
+#
+# Each gunicorn worker keeps its own numbers. With METRICS_DIR set, workers
+# write them to METRICS_DIR/metrics-<pid>-<start>.json at most every
+# METRICS_FLUSH_INTERVAL seconds, and /metrics adds up every file, so whichever
+# worker answers reports the whole server (other workers' numbers may be that
+# many seconds old). Files of workers that have exited keep counting, so counters
+# never go backwards; gunicorn_config.py empties the directory when the server starts.
+#
+# With METRICS_SLOW_REQUEST_SECONDS set, requests slower than that are logged
+# with their slowest statements.
+
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+# name: (type, help)
+METRICS = {
+    'http_requests_total': ('counter', 'Requests served, by route, method and status'),
+    'http_request_duration_seconds': ('histogram', 'Time to build the response, by route and method'),
+    'http_request_db_statements': ('histogram', 'SQL statements run per request, by route and method'),
+    'http_request_db_seconds_total': ('counter', 'Time spent running SQL statements, by route and method'),
+}
+LABELS = {
+    'http_requests_total': ('blueprint', 'route', 'method', 'status'),
+    'http_request_duration_seconds': ('blueprint', 'route', 'method'),
+    'http_request_db_statements': ('blueprint', 'route', 'method'),
+    'http_request_db_seconds_total': ('blueprint', 'route', 'method'),
+}
+
+
+class Histogram:
+    def __init__(self, buckets, counts=None, total=0.0, count=0):
+        self.buckets = buckets
+        # Observations per bucket, not cumulative; the last one is +Inf
+        self.counts = counts or [0] * (len(buckets) + 1)
+        self.sum = total
+        self.count = count
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def add(self, other):
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+
+class Metrics:
+    def __init__(self, latency_buckets, directory=None, flush_interval=5):
+        self.buckets = {
+            'http_request_duration_seconds': tuple(latency_buckets),
+            'http_request_db_statements': STATEMENT_BUCKETS,
+        }
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.path = os.path.join(directory, f'metrics-{os.getpid()}-{time.time_ns()}.json') if directory else None
+        self._flushed_at = 0.0
+        self._lock = threading.Lock()
+        self._series = {name: {} for name in METRICS}
+
+    def observe_request(self, blueprint, route, method, status, seconds, statements, statement_seconds):
+        key = (blueprint, route, method)
+        with self._lock:
+            requests = self._series['http_requests_total']
+            requests[key + (str(status),)] = requests.get(key + (str(status),), 0) + 1
+            for name, value in (('http_request_duration_seconds', seconds), ('http_request_db_statements', statements)):
+                series = self._series[name]
+                if key not in series:
+                    series[key] = Histogram(self.buckets[name])
+                series[key].observe(value)
+            db_seconds = self._series['http_request_db_seconds_total']
+            db_seconds[key] = db_seconds.get(key, 0.0) + statement_seconds
+        if self.path and time.monotonic() - self._flushed_at >= self.flush_interval:
+            self.flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                name: [
+                    [list(key), [value.counts, value.sum, value.count] if isinstance(value, Histogram) else value]
+                    for key, value in series.items()
+                ]
+                for name, series in self._series.items()
+            }
+
+    def flush(self):
+        self._flushed_at = time.monotonic()
+        os.makedirs(self.directory, exist_ok=True)
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(self.snapshot(), file)
+        os.replace(temporary, self.path)
+
+    def _merged(self):
+        snapshots = [self.snapshot()]
+        if self.directory:
+            for path in glob.glob(os.path.join(self.directory, 'metrics-*.json')):
+                if path == self.path:
+                    continue
+                try:
+                    with open(path) as file:
+                        snapshots.append(json.load(file))
+                except (OSError, ValueError):
+                    continue  # A worker is replacing it right now
+        merged = {name: {} for name in METRICS}
+        for snapshot in snapshots:
+            for name, series in snapshot.items():
+                if name not in merged:
+                    continue
+                for key, value in series:
+                    key = tuple(key)
+                    if METRICS[name][0] == 'histogram':
+                        histogram = Histogram(self.buckets[name], *value)
+                        if key in merged[name]:
+                            merged[name][key].add(histogram)
+                        else:
+                            merged[name][key] = histogram
+                    else:
+                        merged[name][key] = merged[name].get(key, 0) + value
+        return merged
+
+    def render(self):
+        lines = []
+        for name, series in self._merged().items():
+            kind, description = METRICS[name]
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, value in sorted(series.items()):
+                labels = _labels(LABELS[name], key)
+                if kind != 'histogram':
+                    lines.append(f"{name}{{{labels}}} {_number(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(list(value.buckets) + ['+Inf'], value.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{_number(bound)}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {_number(value.sum)}")
+                lines.append(f"{name}_count{{{labels}}} {value.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names, values):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+def _number(value):
+    if isinstance(value, str):
+        return value
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class RequestStatements:
+    def __init__(self, keep):
+        self.count = 0
+        self.seconds = 0.0
+        # (seconds, statement) of every statement, only kept for the slow request log
+        self.statements = [] if keep else None
+
+# The start time lives on the statement's execution context, which goes away with it,
+# so a statement that fails (and never gets an after_cursor_execute) leaves nothing behind
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context.metrics_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, 'metrics_started', None)
+    if started is None:
+        return
+    seconds = time.perf_counter() - started
+    if not has_request_context():
+        return
+    statements = g.get('metrics_statements')
+    if statements is None:
+        return
+    statements.count += 1
+    statements.seconds += seconds
+    if statements.statements is not None:
+        statements.statements.append((seconds, statement))
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+    g.metrics_statements = RequestStatements(keep=bool(current_app.config['METRICS_SLOW_REQUEST_SECONDS']))
+
+def _log_slow_request(route, status, seconds, statements):
+    slowest = sorted(statements.statements, key=lambda item: item[0], reverse=True)
+    lines = [
+        f"Slow request: {request.method} {request.full_path.rstrip('?')} ({route}) {status} in {seconds:.3f}s, "
+        f"{statements.count} SQL statements in {statements.seconds:.3f}s"
+    ]
+    for statement_seconds, statement in slowest[:current_app.config['METRICS_SLOW_REQUEST_QUERIES']]:
+        lines.append(f"  {statement_seconds * 1000:9.1f} ms  {' '.join(statement.split())[:500]}")
+    current_app.logger.warning("\n".join(lines))
+
+def _finish_request(response):
+    started = g.pop('metrics_started', None)
+    statements = g.pop('metrics_statements', None)
+    if started is None or statements is None:
+        return response
+    seconds = time.perf_counter() - started
+    route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+    current_app.extensions['metrics'].observe_request(
+        request.blueprint or '', route, request.method, response.status_code,
+        seconds, statements.count, statements.seconds
+    )
+    threshold = current_app.config['METRICS_SLOW_REQUEST_SECONDS']
+    if threshold and seconds >= threshold:
+        _log_slow_request(route, response.status_code, seconds, statements)
+    return response
+
+def init_metrics(app):
+    if not app.config['METRICS_ENABLED']:
+        return
+    metrics = Metrics(app.config['METRICS_LATENCY_BUCKETS'], app.config['METRICS_DIR'], app.config['METRICS_FLUSH_INTERVAL'])
+    app.extensions['metrics'] = metrics
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    if metrics.path:
+        # What the last requests added since the last flush
+        atexit.register(metrics.flush)
+
+# The Prometheus text of every worker's metrics, or None when metrics are off
+def render_metrics(app):
+    metrics = app.extensions.get('metrics')
+    return metrics.render() if metrics else None
@@ -1,6 +1,12 @@
 from .admin import *
 from .application import *
+from .application_event import *
+from .archive import *
+from .cache_version import *
+from .category import *
 from .employer import *
 from .job_seeker import *
 from .job import *
+from .job_term import *
+from .shard import *
 from .user import *
\ No newline at end of file
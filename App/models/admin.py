@@ -3,7 +3,7 @@ from .user import User
 
 class Admin(User):
     __tablename__ = 'admins'
-    id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
 
     __mapper_args__ = {
         'polymorphic_identity': 'admin',
@@ -3,10 +3,38 @@ from App.database import db
 class Application(db.Model):
     __tablename__ = 'applications'
     application_id = db.Column(db.Integer, primary_key=True)
-    job_seeker_id = db.Column(db.Integer, db.ForeignKey('job_seekers.id'), nullable=False)
-    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id'), nullable=False)
+    job_seeker_id = db.Column(db.Integer, db.ForeignKey('job_seekers.id', ondelete='CASCADE'), nullable=False, index=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id', ondelete='CASCADE'), nullable=False)
     application_text = db.Column(db.Text, nullable=False)
     is_accepted = db.Column(db.Boolean, default=None, nullable=True)
 
+    # A job seeker can apply to a job only once; the index also serves lookups by job_id.
+    # AUTOINCREMENT keeps SQLite from handing out the ids of archived applications again
+    __table_args__ = (
+        db.Index('ix_applications_job_id_job_seeker_id', 'job_id', 'job_seeker_id', unique=True),
+        {'sqlite_autoincrement': True},
+    )
+
+    def get_json(self):
+        return {
+            'application_id': self.application_id,
+            'job_id': self.job_id,
+            'job_seeker_id': self.job_seeker_id,
+            'application_text': self.application_text,
+            'is_accepted': self.is_accepted
+        }
+
     def __repr__(self):
         return f'<Application {self.application_id} by JobSeeker {self.job_seeker_id} for Job {self.job_id}>'
+
+# The applications table as each shard (DB_SHARDS) holds it: the same columns and
+# indexes, without foreign keys to the jobs and job seekers that live on the primary.
+# Its application_id is given by the primary's application_directory.
+SHARD_METADATA = db.MetaData()
+SHARD_APPLICATIONS = db.Table(
+    Application.__tablename__, SHARD_METADATA,
+    *[db.Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable, autoincrement=False)
+      for column in Application.__table__.columns],
+)
+for index in Application.__table__.indexes:
+    db.Index(index.name, *[SHARD_APPLICATIONS.c[column.name] for column in index.columns], unique=index.unique)
@@ -0,0 +1,33 @@
+from datetime import datetime
+from App.database import db
+
+# Outbox of application status changes, read by the job seeker event feeds.
+# id is the feed cursor: a client that has seen event n asks for id > n.
+class ApplicationEvent(db.Model):
+    __tablename__ = 'application_events'
+    id = db.Column(db.Integer, primary_key=True)
+    job_seeker_id = db.Column(db.Integer, db.ForeignKey('job_seekers.id', ondelete='CASCADE'), nullable=False)
+    # No foreign keys: an event outlives the application and job it reports on
+    application_id = db.Column(db.Integer, nullable=False)
+    job_id = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    # AUTOINCREMENT keeps SQLite from reusing ids once old events are pruned
+    __table_args__ = (
+        db.Index('ix_application_events_job_seeker_id_id', 'job_seeker_id', 'id'),
+        {'sqlite_autoincrement': True},
+    )
+
+    def get_json(self):
+        return {
+            'id': self.id,
+            'application_id': self.application_id,
+            'job_id': self.job_id,
+            'job_seeker_id': self.job_seeker_id,
+            'status': self.status,
+            'created_at': self.created_at.isoformat()
+        }
+
+    def __repr__(self):
+        return f'<ApplicationEvent {self.id}: Application {self.application_id} {self.status}>'
@@ -0,0 +1,58 @@
+from datetime import datetime
+from App.database import db
+
+# Jobs moved out of the jobs table by `flask admin archive_jobs`, as they were
+# when archived. Ids are the ones they had, so links to an archived job keep working
+class ArchivedJob(db.Model):
+    __tablename__ = 'archived_jobs'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    category = db.Column(db.String(100), nullable=False)
+    # No foreign key: categories are never deleted, and the archive only keeps the id for reference
+    category_id = db.Column(db.Integer, nullable=True)
+    description = db.Column(db.Text, nullable=False)
+    date_posted = db.Column(db.DateTime, nullable=False, index=True)
+    employer_id = db.Column(db.Integer, db.ForeignKey('employers.id', ondelete='CASCADE'), nullable=False, index=True)
+
+    # The application counts of the job when it was archived
+    applicant_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    pending_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    accepted_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rejected_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    # Indexed for the workers' recommenders, which drop the jobs archived since they last looked
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def get_json(self):
+        return {
+            'id': self.id,
+            'category': self.category,
+            'description': self.description,
+            'date_posted': self.date_posted.isoformat() if self.date_posted else None,
+            'employer_id': self.employer_id,
+            'applicants': self.applicant_count,
+            'archived_at': self.archived_at.isoformat()
+        }
+
+    def __repr__(self):
+        return f'<ArchivedJob {self.id} {self.category}>'
+
+# The applications of archived jobs, moved along with their job
+class ArchivedApplication(db.Model):
+    __tablename__ = 'archived_applications'
+    application_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    job_seeker_id = db.Column(db.Integer, db.ForeignKey('job_seekers.id', ondelete='CASCADE'), nullable=False, index=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('archived_jobs.id', ondelete='CASCADE'), nullable=False, index=True)
+    application_text = db.Column(db.Text, nullable=False)
+    is_accepted = db.Column(db.Boolean, default=None, nullable=True)
+
+    def get_json(self):
+        return {
+            'application_id': self.application_id,
+            'job_id': self.job_id,
+            'job_seeker_id': self.job_seeker_id,
+            'application_text': self.application_text,
+            'is_accepted': self.is_accepted
+        }
+
+    def __repr__(self):
+        return f'<ArchivedApplication {self.application_id} by JobSeeker {self.job_seeker_id} for Job {self.job_id}>'
@@ -0,0 +1,14 @@
+from datetime import datetime
+from App.database import db
+
+# Version counters behind the ETag/Last-Modified headers of the read endpoints.
+# scope is 'jobs' (key 0, the whole listing), 'archive' (key 0), 'employer', 'job' or 'job_seeker' (key is the id)
+class CacheVersion(db.Model):
+    __tablename__ = 'cache_versions'
+    scope = db.Column(db.String(20), primary_key=True)
+    key = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<CacheVersion {self.scope}:{self.key} v{self.version}>'
@@ -0,0 +1,27 @@
+from App.database import db
+
+# Job categories, normalized: jobs point at one row per distinct category, whatever
+# the case and spacing they were posted with. key is the lookup form (see category_key)
+class Category(db.Model):
+    __tablename__ = 'categories'
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    key = db.Column(db.String(100), nullable=False, unique=True)
+
+    def get_json(self):
+        return {
+            'id': self.id,
+            'name': self.name
+        }
+
+    def __repr__(self):
+        return f'<Category {self.id} {self.name}>'
+
+# Open jobs per category, kept up to date by App/controllers/categories.py
+class CategoryFacet(db.Model):
+    __tablename__ = 'category_facets'
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.id', ondelete='CASCADE'), primary_key=True, autoincrement=False)
+    job_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    def __repr__(self):
+        return f'<CategoryFacet {self.category_id}: {self.job_count} jobs>'
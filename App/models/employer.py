@@ -3,11 +3,12 @@ from .user import User
 
 class Employer(User):
     __tablename__ = 'employers'
-    id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
     company_name = db.Column(db.String(100), nullable=False)
 
-    # Set in such a way that if a Employer gets deleted, their job_listings gets deleted as well
-    job_listings = db.relationship('Job', backref='employer', lazy=True, cascade="all, delete-orphan")
+    # Set in such a way that if a Employer gets deleted, their job_listings gets deleted as well.
+    # The database does the deleting (ON DELETE CASCADE), so the listings are never loaded for it
+    job_listings = db.relationship('Job', backref='employer', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
 
     __mapper_args__ = {
         'polymorphic_identity': 'employer',
@@ -5,9 +5,46 @@ class Job(db.Model):
     __tablename__ = 'jobs'
     id = db.Column(db.Integer, primary_key=True)
     category = db.Column(db.String(100), nullable=False)
+    # The normalized category; category keeps the text as posted
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=True)
     description = db.Column(db.Text, nullable=False)
-    date_posted = db.Column(db.DateTime, default=datetime.utcnow)
-    employer_id = db.Column(db.Integer, db.ForeignKey('employers.id'), nullable=False)
+    # Never NULL: the listings page on (date_posted, id) and put both in their cursors
+    date_posted = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    employer_id = db.Column(db.Integer, db.ForeignKey('employers.id', ondelete='CASCADE'), nullable=False, index=True)
 
-    # Set in such a way that if a Job gets deleted, all the applications for that job gets deleted as well
-    applications = db.relationship('Application', backref='job', lazy=True, cascade="all, delete-orphan")
+    # Denormalized application counts, kept up to date by App/controllers/counters.py
+    applicant_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    pending_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    accepted_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rejected_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    # Set when the job is soft deleted (SOFT_DELETE); the row is purged later by `flask admin purge`
+    deleted_at = db.Column(db.DateTime, nullable=True, index=True)
+
+    # Jobs of a category, newest first, in the order of the listing.
+    # AUTOINCREMENT keeps SQLite from handing out the ids of archived jobs again
+    __table_args__ = (
+        db.Index('ix_jobs_category_id_date_posted_id', 'category_id', 'date_posted', 'id'),
+        {'sqlite_autoincrement': True},
+    )
+
+    # Set in such a way that if a Job gets deleted, all the applications for that job gets deleted as well, by the database
+    applications = db.relationship('Application', backref='job', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
+
+    def get_json(self):
+        return {
+            'id': self.id,
+            'category': self.category,
+            'description': self.description,
+            'date_posted': self.date_posted.isoformat() if self.date_posted else None,
+            'employer_id': self.employer_id
+        }
+
+    def get_counts_json(self):
+        return {
+            'job_id': self.id,
+            'applicants': self.applicant_count,
+            'pending': self.pending_count,
+            'accepted': self.accepted_count,
+            'rejected': self.rejected_count
+        }
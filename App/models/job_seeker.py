@@ -3,10 +3,16 @@ from .user import User
 
 class JobSeeker(User):
     __tablename__ = 'job_seekers'
-    id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
 
-    # Set in such a way that if a JobSeeker gets deleted, their applications gets deleted as well
-    applications = db.relationship('Application', backref='job_seeker', lazy=True, cascade="all, delete-orphan")
+    # Denormalized application counts, kept up to date by App/controllers/counters.py
+    application_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    pending_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    accepted_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    rejected_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    # Set in such a way that if a JobSeeker gets deleted, their applications gets deleted as well, by the database
+    applications = db.relationship('Application', backref='job_seeker', lazy=True, cascade="all, delete-orphan", passive_deletes=True)
 
     __mapper_args__ = {
         'polymorphic_identity': 'job_seeker',
@@ -14,3 +20,12 @@ class JobSeeker(User):
 
     def __init__(self, username, password, email):
         super().__init__(username, password, email, user_type='job_seeker')  # Call the parent class constructor
+
+    def get_counts_json(self):
+        return {
+            'job_seeker_id': self.id,
+            'applications': self.application_count,
+            'pending': self.pending_count,
+            'accepted': self.accepted_count,
+            'rejected': self.rejected_count
+        }
@@ -0,0 +1,11 @@
+from App.database import db
+
+# Inverted index used for job search on databases without SQLite FTS5
+class JobTerm(db.Model):
+    __tablename__ = 'job_terms'
+    term = db.Column(db.String(100), primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id', ondelete='CASCADE'), primary_key=True, index=True)
+    weight = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        return f'<JobTerm {self.term} in Job {self.job_id}>'
@@ -0,0 +1,27 @@
+from App.database import db
+
+# The shard map: which application shard (a DB_SHARDS bind, e.g. shard_1) holds the
+# applications of a job. A job gets its row when it is first applied to, on the
+# shard job_id picks out of DB_SHARDS, and keeps it until `flask admin rebalance` moves it
+class JobShard(db.Model):
+    __tablename__ = 'job_shards'
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id', ondelete='CASCADE'), primary_key=True, autoincrement=False)
+    shard = db.Column(db.String(50), nullable=False, index=True)
+
+    def __repr__(self):
+        return f'<JobShard Job {self.job_id} on {self.shard}>'
+
+# Hands out application ids that are unique across the shards, and maps each one
+# back to its job, and so to its shard, for the routes that only know the application id
+class ApplicationDirectory(db.Model):
+    __tablename__ = 'application_directory'
+    application_id = db.Column(db.Integer, primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('jobs.id', ondelete='CASCADE'), nullable=False, index=True)
+
+    # AUTOINCREMENT keeps SQLite from reusing the ids of removed applications
+    __table_args__ = (
+        {'sqlite_autoincrement': True},
+    )
+
+    def __repr__(self):
+        return f'<ApplicationDirectory {self.application_id} for Job {self.job_id}>'
@@ -1,5 +1,5 @@
-from werkzeug.security import check_password_hash, generate_password_hash
 from App.database import db
+from App.passwords import hash_password, verify_password
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -8,6 +8,8 @@ class User(db.Model):
     password = db.Column(db.String(128), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     user_type = db.Column(db.String(50), nullable=False)
+    # Set when the user is soft deleted (SOFT_DELETE); the row is purged later by `flask admin purge`
+    deleted_at = db.Column(db.DateTime, nullable=True, index=True)
 
     __mapper_args__ = {
         'polymorphic_identity': 'user',
@@ -28,8 +30,8 @@ class User(db.Model):
 
     def set_password(self, password):
         """Create hashed password."""
-        self.password = generate_password_hash(password)
+        self.password = hash_password(password)
     
     def check_password(self, password):
         """Check hashed password."""
-        return check_password_hash(self.password, password)
+        return verify_password(self.password, password)
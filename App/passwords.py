@@ -0,0 +1,76 @@
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, has_app_context
+from werkzeug.security import generate_password_hash, check_password_hash
+
+# Password hashing is CPU bound (PBKDF2/scrypt), and under the gevent worker a
+# hash computed inline blocks every other greenlet in the process. Hashes are
+# therefore computed on real OS threads: hashlib releases the GIL while it
+# hashes, so the hub keeps serving requests and bulk hashing uses every core.
+
+DEFAULT_METHOD = 'pbkdf2:sha256'
+DEFAULT_SALT_LENGTH = 16
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _setting(key, default):
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
+def _workers():
+    return _setting('PASSWORD_HASH_WORKERS', None) or os.cpu_count() or 1
+
+def gevent_patched():
+    # gevent is only imported by its worker class, so this never imports it
+    monkey = sys.modules.get('gevent.monkey')
+    return monkey is not None and monkey.is_module_patched('threading')
+
+def _thread_pool():
+    # Built on first use so it belongs to the worker process rather than the gunicorn master
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            if gevent_patched():
+                # ThreadPoolExecutor would only start greenlets once threading is patched
+                from gevent.threadpool import ThreadPool
+                _pool = ThreadPool(_workers())
+            else:
+                _pool = ThreadPoolExecutor(_workers(), thread_name_prefix='password-hash')
+        return _pool
+
+def _run(function, *args):
+    if gevent_patched():
+        return _thread_pool().apply(function, args)
+    # Without gevent the calling thread would just wait, so hash inline
+    return function(*args)
+
+def _map(function, *iterables):
+    pool = _thread_pool()
+    if gevent_patched():
+        return list(pool.imap(function, *iterables))
+    return list(pool.map(function, *iterables))
+
+
+def hash_password(password):
+    method = _setting('PASSWORD_HASH_METHOD', DEFAULT_METHOD)
+    salt_length = _setting('PASSWORD_SALT_LENGTH', DEFAULT_SALT_LENGTH)
+    return _run(generate_password_hash, password, method, salt_length)
+
+def verify_password(password_hash, password):
+    return _run(check_password_hash, password_hash, password)
+
+# Hashes many passwords at once, spread across PASSWORD_HASH_WORKERS threads
+def hash_passwords(passwords):
+    passwords = list(passwords)
+    if not passwords:
+        return []
+    method = _setting('PASSWORD_HASH_METHOD', DEFAULT_METHOD)
+    salt_length = _setting('PASSWORD_SALT_LENGTH', DEFAULT_SALT_LENGTH)
+    count = len(passwords)
+    return _map(generate_password_hash, passwords, [method] * count, [salt_length] * count)
@@ -0,0 +1,82 @@
+import json
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+# Measures how long a fresh process takes to get an app ready, the cost every
+# `flask ...` invocation pays before its command runs. Each run is a new
+# interpreter started with -X importtime:
+#
+# - interpreter: starting Python itself (`python -c pass`)
+# - imports: importing App.main, by the package each module belongs to
+# - create_app: each startup phase, including the imports it makes lazily
+#
+# Every figure is the best of the runs, so one slow run doesn't skew it.
+
+IMPORTS_MARKER = '--- imports'
+CREATE_APP_MARKER = '--- create_app'
+
+PROFILE_SCRIPT = f"""
+import json, sys
+sys.stderr.write('{IMPORTS_MARKER}\\n')
+from App.main import create_app
+sys.stderr.write('{CREATE_APP_MARKER}\\n')
+app = create_app(lean=sys.argv[1] == 'lean')
+print(json.dumps(app.extensions['startup_phases']))
+"""
+
+
+def _imports_by_package(importtime):
+    # Self time of every module imported between the markers, summed by top-level package
+    packages = defaultdict(int)
+    lines = importtime.splitlines()
+    for line in lines[lines.index(IMPORTS_MARKER) + 1:]:
+        if line == CREATE_APP_MARKER:
+            break
+        if not line.startswith('import time:'):
+            continue
+        own, _, name = line[len('import time:'):].split('|')
+        packages[name.strip().split('.')[0]] += int(own)
+    return {package: microseconds / 1000 for package, microseconds in packages.items()}
+
+def _run(arguments):
+    start = time.perf_counter()
+    result = subprocess.run(arguments, capture_output=True, text=True, check=True)
+    return time.perf_counter() - start, result
+
+def profile_startup(lean=True, repeat=3):
+    mode = 'lean' if lean else 'full'
+    interpreter, total = [], []
+    imports, phases = defaultdict(list), defaultdict(list)
+    for _ in range(repeat):
+        interpreter.append(_run([sys.executable, '-c', 'pass'])[0])
+        elapsed, result = _run([sys.executable, '-X', 'importtime', '-c', PROFILE_SCRIPT, mode])
+        total.append(elapsed)
+        for package, ms in _imports_by_package(result.stderr).items():
+            imports[package].append(ms)
+        for name, seconds in json.loads(result.stdout.strip().splitlines()[-1]):
+            phases[name].append(seconds * 1000)
+    return {
+        'mode': mode,
+        'runs': repeat,
+        'interpreter_ms': round(min(interpreter) * 1000, 1),
+        'imports_ms': {package: round(min(times), 1) for package, times in sorted(imports.items(), key=lambda item: -min(item[1]))},
+        'create_app_ms': {name: round(min(times), 1) for name, times in phases.items()},
+        'total_ms': round(min(total) * 1000, 1),
+    }
+
+def format_startup_profile(profile, top=10):
+    lines = [f"Startup ({profile['mode']} app), best of {profile['runs']} runs:"]
+    lines.append(f"  {'interpreter':<28}{profile['interpreter_ms']:>9.1f} ms")
+    imports = list(profile['imports_ms'].items())
+    lines.append(f"  imports ({sum(ms for _, ms in imports):.1f} ms)")
+    for package, ms in imports[:top]:
+        lines.append(f"    {package:<26}{ms:>9.1f} ms")
+    if len(imports) > top:
+        lines.append(f"    {f'{len(imports) - top} more':<26}{sum(ms for _, ms in imports[top:]):>9.1f} ms")
+    lines.append(f"  create_app ({sum(profile['create_app_ms'].values()):.1f} ms)")
+    for name, ms in profile['create_app_ms'].items():
+        lines.append(f"    {name:<26}{ms:>9.1f} ms")
+    lines.append(f"  {'total':<28}{profile['total_ms']:>9.1f} ms")
+    return "\n".join(lines)
@@ -0,0 +1,31 @@
+import pytest
+from contextlib import contextmanager
+from sqlalchemy import event
+
+from App.database import db
+
+
+# Fails the test when the block runs more SQL statements than its budget.
+# The session is expired first so identity map hits cannot hide lazy loads.
+#
+#   def test_view(query_budget):
+#       with query_budget(2):
+#           view_job_status_all(1)
+@pytest.fixture
+def query_budget():
+    @contextmanager
+    def budget(max_queries):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        db.session.expire_all()
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        assert len(statements) <= max_queries, \
+            f"Expected at most {max_queries} queries, ran {len(statements)}:\n" + "\n\n".join(statements)
+    return budget
@@ -0,0 +1,296 @@
+import pytest
+from sqlalchemy import event, inspect
+from sqlalchemy.exc import OperationalError
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Employer, JobSeeker, Job, Application
+from App.controllers import (
+    create_user,
+    create_job,
+    apply_to_job,
+    review_application,
+    review_applications,
+    remove_application,
+    remove_user,
+    get_job_counts,
+    get_job_seeker_counts,
+    recount_applications,
+    view_job_status,
+    view_job_status_all,
+    get_applicants_for_job,
+    read_rows,
+    json_rows,
+    import_users,
+    import_jobs,
+    import_applications,
+    search_jobs,
+    login
+)
+
+'''
+    Integration Tests
+'''
+
+# Module scoped in-memory database with one employer, two job seekers and two jobs
+@pytest.fixture(autouse=True, scope="module")
+def applications_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    create_db()
+    create_user('acme', 'acmepass', 'acme@mail.com', 'employer')
+    create_user('sally', 'sallypass', 'sally@mail.com', 'job_seeker')
+    create_user('sam', 'sampass', 'sam@mail.com', 'job_seeker')
+    employer = Employer.query.filter_by(username='acme').first()
+    create_job('Backend Engineer', 'Python services', employer.id)
+    create_job('Frontend Engineer', 'React apps', employer.id)
+    yield app.test_client()
+    db.drop_all()
+
+def seeker(username):
+    return JobSeeker.query.filter_by(username=username).first()
+
+def job(category):
+    return Job.query.filter_by(category=category).first()
+
+
+def test_application_indexes():
+    indexes = {index['name']: index for index in inspect(db.engine).get_indexes('applications')}
+    assert indexes['ix_applications_job_id_job_seeker_id']['unique']
+    assert 'ix_applications_job_seeker_id' in indexes
+    assert {index['name'] for index in inspect(db.engine).get_indexes('jobs')} >= {'ix_jobs_employer_id', 'ix_jobs_date_posted'}
+
+def test_apply_to_job():
+    backend, sally = job('Backend Engineer'), seeker('sally')
+    assert apply_to_job(backend.id, sally.id, 'Hire me') == f"Application submitted for Job {backend.id} by Job Seeker {sally.id}."
+    assert Application.query.filter_by(job_id=backend.id, job_seeker_id=sally.id).count() == 1
+
+def test_apply_to_job_twice():
+    backend, sally = job('Backend Engineer'), seeker('sally')
+    assert apply_to_job(str(backend.id), str(sally.id), 'Again') == f"Job Seeker {sally.id} has already applied for Job {backend.id}."
+    assert Application.query.filter_by(job_id=backend.id, job_seeker_id=sally.id).count() == 1
+
+def test_apply_to_missing_job_or_seeker():
+    backend, sam = job('Backend Engineer'), seeker('sam')
+    assert apply_to_job(999, sam.id, 'Hi') == "Job with ID 999 does not exist."
+    assert apply_to_job('abc', sam.id, 'Hi') == "Job with ID abc does not exist."
+    assert apply_to_job(backend.id, 999, 'Hi') == "Job Seeker with ID 999 does not exist."
+    # An employer id is not a job seeker id
+    employer = Employer.query.filter_by(username='acme').first()
+    assert apply_to_job(backend.id, employer.id, 'Hi') == f"Job Seeker with ID {employer.id} does not exist."
+
+def test_bulk_import(tmp_path):
+    users = tmp_path / 'users.csv'
+    users.write_text(
+        "username,password,email,role,company_name\n"
+        "globex,globexpass,globex@mail.com,employer,Globex\n"
+        "sally,pass,other@mail.com,job_seeker,\n"
+        "wizard,pass,wizard@mail.com,wizard,\n"
+        "tina,tinapass,tina@mail.com,job_seeker,\n"
+    )
+    report = import_users(read_rows(str(users)), chunk_size=2)
+    assert report.created == 2
+    assert [line for line, _ in sorted(report.errors)] == [3, 4]
+    globex = Employer.query.filter_by(username='globex').first()
+    assert globex.company_name == 'Globex' and globex.check_password('globexpass')
+
+    jobs = tmp_path / 'jobs.jsonl'
+    jobs.write_text(
+        f'{{"category": "Site Reliability", "description": "Kubernetes on call", "employer_id": {globex.id}}}\n'
+        '{"category": "Ghost", "description": "No employer", "employer_id": 999}\n'
+        'not json\n'
+        f'{{"category": ["Listed"], "description": "Not text", "employer_id": {globex.id}}}\n'
+    )
+    report = import_jobs(read_rows(str(jobs)))
+    assert report.created == 1
+    assert [line for line, _ in sorted(report.errors)] == [2, 3, 4]
+    assert sorted(report.errors)[2] == (4, 'category must be text.')
+    sre = search_jobs('kubernetes')[0]
+
+    tina = seeker('tina')
+    applications = tmp_path / 'applications.jsonl'
+    applications.write_text(
+        f'{{"job_id": {sre.id}, "job_seeker_id": {tina.id}, "application_text": "On call veteran"}}\n'
+        f'{{"job_id": {sre.id}, "job_seeker_id": {tina.id}, "application_text": "Duplicate"}}\n'
+        f'{{"job_id": {sre.id}, "job_seeker_id": {globex.id}, "application_text": "Not a seeker"}}\n'
+    )
+    report = import_applications(read_rows(str(applications)))
+    assert report.created == 1
+    assert [line for line, _ in sorted(report.errors)] == [2, 3]
+    assert Application.query.filter_by(job_id=sre.id).count() == 1
+
+def test_bulk_import_jobs_without_insert_returning(monkeypatch):
+    # As on MySQL, where the new ids can't come back from the INSERT
+    dialect = db.session.get_bind().dialect
+    monkeypatch.setattr(dialect, 'insert_returning', False)
+    monkeypatch.setattr(dialect, 'insert_executemany_returning', False)
+    employer_id = Employer.query.filter_by(username='acme').first().id
+    rows = [{'category': 'Row Engineer', 'description': f'One at a time {i}', 'employer_id': employer_id} for i in range(3)]
+    report = import_jobs(json_rows(rows), chunk_size=2)
+    assert report.created == 3 and report.errors == []
+    assert {job.description for job in search_jobs('time')} == {f'One at a time {i}' for i in range(3)}
+
+def test_bulk_import_retries_rows_of_a_rejected_chunk():
+    # The database refuses the first chunk's insert
+    def refuse_once(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('INSERT INTO users'):
+            event.remove(db.engine, 'before_cursor_execute', refuse_once)
+            raise OperationalError(statement, parameters, Exception('disk I/O error'))
+    event.listen(db.engine, 'before_cursor_execute', refuse_once)
+    rows = [{'username': 'retry', 'password': 'retrypass', 'email': 'retry@mail.com', 'role': 'job_seeker'}] * 2
+    report = import_users(json_rows(rows), chunk_size=1)
+    assert report.created == 1
+    assert [line for line, _ in report.errors] == [1]
+    assert seeker('retry') is not None
+
+def test_status_views_query_budget(query_budget):
+    frontend, sam = job('Frontend Engineer'), seeker('sam')
+    apply_to_job(frontend.id, sam.id, 'Pixel perfect')
+    application = Application.query.filter_by(job_id=frontend.id, job_seeker_id=sam.id).first()
+    review_application(application.application_id, True)
+    apply_to_job(job('Backend Engineer').id, sam.id, 'Full stack')
+    frontend_id, sam_id, application_id = frontend.id, sam.id, application.application_id
+
+    with query_budget(2):
+        statuses = view_job_status_all(sam_id)
+    assert [(status['job_category'], status['status']) for status in statuses] == [('Frontend Engineer', 'Accepted'), ('Backend Engineer', 'Pending')]
+
+    with query_budget(1):
+        status = view_job_status(sam_id, application_id)
+    assert status == f"Job ID: {frontend_id}, Category: Frontend Engineer, Description: React apps, Status: Accepted"
+
+    with query_budget(2):
+        applicants = get_applicants_for_job(frontend_id)
+        assert [applicant.job_seeker_id for applicant in applicants] == [sam_id]
+
+def test_apply_query_budget(query_budget):
+    frontend_id, tina_id = job('Frontend Engineer').id, seeker('tina').id
+    # The insert, one counter UPDATE each for the job and the job seeker, and one upsert of their cache versions
+    with query_budget(4):
+        apply_to_job(frontend_id, tina_id, 'Design systems')
+
+def test_review_applications_in_bulk(query_budget):
+    employer = Employer.query.filter_by(username='acme').first()
+    create_job('Data Engineer', 'Pipelines', employer.id)
+    data = job('Data Engineer')
+    for username in ('dana', 'eli', 'fay'):
+        create_user(username, f'{username}pass', f'{username}@mail.com', 'job_seeker')
+        apply_to_job(data.id, seeker(username).id, 'Spark and SQL')
+    ids = {username: Application.query.filter_by(job_id=data.id, job_seeker_id=seeker(username).id).first().application_id for username in ('dana', 'eli', 'fay')}
+    elsewhere = Application.query.filter(Application.job_id != data.id).first()
+    data_id, elsewhere_id, elsewhere_job_id = data.id, elsewhere.application_id, elsewhere.job_id
+    elsewhere_status = elsewhere.is_accepted
+
+    # Lookup, one UPDATE per decision, one counter UPDATE per table, the status events and the cache version bump, however many ids
+    with query_budget(8):
+        outcomes = review_applications(data_id, accept=[ids['dana'], elsewhere_id, 999], reject_rest=True)
+    assert outcomes == {
+        ids['dana']: 'Accepted',
+        ids['eli']: 'Rejected',
+        ids['fay']: 'Rejected',
+        elsewhere_id: f"Refused: belongs to Job {elsewhere_job_id}.",
+        999: 'Refused: does not exist.',
+    }
+    assert db.session.get(Application, elsewhere_id).is_accepted == elsewhere_status
+
+    outcomes = review_applications(data_id, accept=[ids['eli']], reject=[ids['eli'], ids['fay']])
+    assert outcomes == {ids['eli']: 'Refused: listed to both accept and reject.', ids['fay']: 'Rejected'}
+    assert db.session.get(Application, ids['eli']).is_accepted is False
+    assert review_applications(999, accept=[ids['eli']]) == "Job with ID 999 does not exist."
+
+def test_counters_follow_application_changes(applications_db):
+    employer = Employer.query.filter_by(username='acme').first()
+    create_job('Counter Engineer', 'Keeps count', employer.id)
+    job_id = job('Counter Engineer').id
+    create_user('gus', 'guspass', 'gus@mail.com', 'job_seeker')
+    create_user('hal', 'halpass', 'hal@mail.com', 'job_seeker')
+    gus_id, hal_id = seeker('gus').id, seeker('hal').id
+
+    apply_to_job(job_id, gus_id, 'Counting on it')
+    apply_to_job(job_id, hal_id, 'Count me in')
+    assert get_job_counts(job_id) == {'job_id': job_id, 'applicants': 2, 'pending': 2, 'accepted': 0, 'rejected': 0}
+
+    gus_application = Application.query.filter_by(job_id=job_id, job_seeker_id=gus_id).first().application_id
+    review_application(gus_application, True)
+    review_applications(job_id, reject_rest=True)
+    assert get_job_counts(job_id) == {'job_id': job_id, 'applicants': 2, 'pending': 0, 'accepted': 1, 'rejected': 1}
+    assert get_job_seeker_counts(gus_id) == {'job_seeker_id': gus_id, 'applications': 1, 'pending': 0, 'accepted': 1, 'rejected': 0}
+
+    remove_application(gus_application)
+    assert get_job_seeker_counts(gus_id)['applications'] == 0
+    remove_user(hal_id)
+    counts_url = f'/api/jobs/{job_id}/counts'
+    assert applications_db.get(counts_url, headers=auth_header('acme', 'acmepass')).get_json() == {'job_id': job_id, 'applicants': 0, 'pending': 0, 'accepted': 0, 'rejected': 0}
+    assert applications_db.get(counts_url).status_code == 401
+    assert applications_db.get(counts_url, headers=auth_header('gus', 'guspass')).status_code == 403
+    assert applications_db.get(f'/api/job_seekers/{gus_id}/counts', headers=auth_header('gus', 'guspass')).get_json()['applications'] == 0
+    assert applications_db.get(f'/api/job_seekers/{gus_id}/counts', headers=auth_header('sam', 'sampass')).status_code == 403
+
+    # Every counter in the database matches a recount from the applications table
+    counters = lambda: sorted((j.id, j.applicant_count, j.pending_count, j.accepted_count, j.rejected_count) for j in Job.query.populate_existing())
+    before = counters()
+    acme = auth_header('acme', 'acmepass')
+    etag = applications_db.get(counts_url, headers=acme).headers['ETag']
+    Job.query.update({Job.applicant_count: 42})
+    db.session.commit()
+    assert applications_db.get(counts_url, headers={**acme, 'If-None-Match': etag}).status_code == 304
+    recount_applications()
+    assert counters() == before
+    # The recount corrected the job's counters, so the copy cached before it is stale
+    response = applications_db.get(counts_url, headers={**acme, 'If-None-Match': etag})
+    assert response.status_code == 200 and response.get_json()['applicants'] == 0
+    create_user('counter_admin', 'adminpass', 'counter_admin@mail.com', 'admin')
+    assert applications_db.get('/api/job_seekers/999/counts', headers=auth_header('counter_admin', 'adminpass')).status_code == 404
+
+def auth_header(username, password):
+    return {'Authorization': f'Bearer {login(username, password)}'}
+
+def test_seeker_applications_conditional_get(applications_db):
+    sally = seeker('sally')
+    url = f'/api/job_seekers/{sally.id}/applications'
+    headers = auth_header('sally', 'sallypass')
+    response = applications_db.get(url, headers=headers)
+    assert [application['job_category'] for application in response.get_json()['applications']] == ['Backend Engineer']
+    etag = response.headers['ETag']
+    assert applications_db.get(url, headers={**headers, 'If-None-Match': etag}).status_code == 304
+
+    application = Application.query.filter_by(job_seeker_id=sally.id).first()
+    review_application(application.application_id, False)
+    response = applications_db.get(url, headers={**headers, 'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['applications'][0]['status'] == 'Rejected'
+    assert applications_db.get('/api/job_seekers/999/applications', headers=headers).status_code == 403
+
+def test_application_reads_need_the_owner_or_an_admin(applications_db):
+    sally, backend = seeker('sally'), job('Backend Engineer')
+    create_user('root', 'rootpass', 'root@mail.com', 'admin')
+    seeker_url, applicants_url = f'/api/job_seekers/{sally.id}/applications', f'/api/jobs/{backend.id}/applicants'
+
+    for url in (seeker_url, applicants_url):
+        assert applications_db.get(url).status_code == 401
+        assert applications_db.get(url, headers=auth_header('root', 'rootpass')).status_code == 200
+    # Not even a 304 for someone else's cached copy
+    etag = applications_db.get(seeker_url, headers=auth_header('sally', 'sallypass')).headers['ETag']
+    assert applications_db.get(seeker_url, headers={**auth_header('sam', 'sampass'), 'If-None-Match': etag}).status_code == 403
+
+    response = applications_db.get(applicants_url, headers=auth_header('acme', 'acmepass'))
+    assert sally.id in [application['job_seeker_id'] for application in response.get_json()['applications']]
+    assert applications_db.get(applicants_url, headers=auth_header('sally', 'sallypass')).status_code == 403
+    create_user('rival', 'rivalpass', 'rival@mail.com', 'employer')
+    assert applications_db.get(applicants_url, headers=auth_header('rival', 'rivalpass')).status_code == 403
+    assert applications_db.get('/api/jobs/999/applicants', headers=auth_header('acme', 'acmepass')).status_code == 404
+    assert applications_db.get('/api/job_seekers/999/applications', headers=auth_header('root', 'rootpass')).status_code == 404
+
+def test_apply_api(applications_db):
+    create_job('API Engineer', 'Applied to over HTTP', Employer.query.filter_by(username='acme').first().id)
+    job_id = job('API Engineer').id
+    headers = auth_header('sam', 'sampass')
+    url = f'/api/jobs/{job_id}/applications'
+
+    response = applications_db.post(url, json={'application_text': 'I build APIs'}, headers=headers)
+    assert response.status_code == 201
+    assert Application.query.filter_by(job_id=job_id, job_seeker_id=seeker('sam').id).count() == 1
+    assert applications_db.post(url, json={'application_text': 'Again'}, headers=headers).status_code == 409
+    assert applications_db.post('/api/jobs/999/applications', json={'application_text': 'Hi'}, headers=headers).status_code == 404
+    assert applications_db.post(url, json={'application_text': ' '}, headers=headers).status_code == 400
+    assert applications_db.post(url, json={'application_text': 'Hi'}).status_code == 401
+    assert applications_db.post(url, json={'application_text': 'Hi'}, headers=auth_header('acme', 'acmepass')).status_code == 403
@@ -0,0 +1,141 @@
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import update
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Employer, JobSeeker, Job, Application, ArchivedJob, ArchivedApplication
+from App.controllers import (
+    create_user,
+    create_job,
+    apply_to_job,
+    remove_user,
+    archive_cutoff,
+    archive_jobs,
+    list_job_rows,
+    list_archived_jobs,
+    search_jobs,
+    get_category_facets,
+    get_job_seeker_counts,
+    view_job_status_all,
+    view_archived_job_status_all,
+    login
+)
+
+'''
+    Integration Tests
+'''
+
+def auth_header(username, password):
+    return {'Authorization': f'Bearer {login(username, password)}'}
+
+@pytest.fixture(autouse=True)
+def archive_db(tmp_path):
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'archive.db'}"})
+    create_db()
+    yield app
+    db.session.remove()
+    db.engine.dispose()
+
+# An employer with old jobs of 0, 1, 2 and 3 applicants, and one recent job; returns (employer_id, seeker_ids)
+def _old_and_new_jobs():
+    create_user('acme', 'acmepass', 'acme@mail.com', 'employer')
+    employer_id = Employer.query.filter_by(username='acme').first().id
+    seeker_ids = []
+    for i in range(3):
+        create_user(f'seeker{i}', 'seekerpass', f'seeker{i}@mail.com', 'job_seeker')
+        seeker_ids.append(JobSeeker.query.filter_by(username=f'seeker{i}').first().id)
+    for applicants in range(4):
+        create_job('Welder', f'Old opening {applicants}', employer_id)
+        job = Job.query.filter_by(description=f'Old opening {applicants}').first()
+        for seeker_id in seeker_ids[:applicants]:
+            apply_to_job(job.id, seeker_id, f'Welding for {applicants}')
+        db.session.execute(update(Job).where(Job.id == job.id).values(date_posted=datetime.utcnow() - timedelta(days=400 - applicants)))
+    db.session.commit()
+    create_job('Welder', 'New opening', employer_id)
+    return employer_id, seeker_ids
+
+def test_archives_old_jobs_with_their_applications_in_bounded_batches(archive_db):
+    employer_id, seeker_ids = _old_and_new_jobs()
+    cutoff = archive_cutoff(older_than_days=365)
+
+    # Rows per batch: a job and its applicants, so 0+1 applicants fit in 3 rows, then 2, then 3 alone
+    assert archive_jobs(cutoff, batch_size=3, max_batches=1) == {'jobs': 2, 'applications': 1}
+    assert archive_jobs(cutoff, batch_size=3) == {'jobs': 2, 'applications': 5}
+    assert archive_jobs(cutoff, batch_size=3) == {}
+
+    assert [job.description for job in Job.query] == ['New opening']
+    assert Application.query.count() == 0
+    assert ArchivedJob.query.count() == 4 and ArchivedApplication.query.count() == 6
+    assert db.session.get(ArchivedJob, ArchivedApplication.query.first().job_id).applicant_count == 1
+    # Nothing derived from the open jobs still knows about the archived ones
+    assert [job.description for job in search_jobs('opening')] == ['New opening']
+    assert get_category_facets() == [{'id': Job.query.first().category_id, 'name': 'Welder', 'jobs': 1}]
+    assert get_job_seeker_counts(seeker_ids[0])['applications'] == 0
+    assert view_job_status_all(seeker_ids[0]) == []
+    assert [status['description'] for status in view_archived_job_status_all(seeker_ids[0])] == ['Old opening 1', 'Old opening 2', 'Old opening 3']
+
+    jobs, cursor = list_archived_jobs(limit=3)
+    assert [job.description for job in jobs] == ['Old opening 3', 'Old opening 2', 'Old opening 1'] and cursor is not None
+    jobs, cursor = list_archived_jobs(limit=3, after=cursor, employer_id=employer_id)
+    assert [job.description for job in jobs] == ['Old opening 0'] and cursor is None
+    assert [job.description for job in list_job_rows()[0]] == ['New opening']
+
+    # The archive goes with the employer
+    remove_user(employer_id)
+    assert ArchivedJob.query.count() == 0 and ArchivedApplication.query.count() == 0
+
+def test_archive_read_api(archive_db):
+    employer_id, seeker_ids = _old_and_new_jobs()
+    client = archive_db.test_client()
+    response = client.get('/api/archive/jobs')
+    assert response.get_json() == {'jobs': [], 'next': None}
+
+    archive_jobs(archive_cutoff(older_than_days=365))
+    assert client.get('/api/archive/jobs', headers={'If-None-Match': response.headers['ETag']}).status_code == 200
+    jobs = client.get('/api/archive/jobs?limit=2').get_json()
+    assert [job['description'] for job in jobs['jobs']] == ['Old opening 3', 'Old opening 2']
+    assert [job['description'] for job in client.get(f"/api/archive/jobs?after={jobs['next']}").get_json()['jobs']] == ['Old opening 1', 'Old opening 0']
+    assert client.get('/api/archive/jobs?after=nonsense').status_code == 400
+
+    job_id = jobs['jobs'][0]['id']
+    assert client.get(f'/api/archive/jobs/{job_id}').get_json()['applicants'] == 3
+    acme = auth_header('acme', 'acmepass')
+    applications = client.get(f'/api/archive/jobs/{job_id}/applicants', headers=acme).get_json()['applications']
+    assert [application['job_seeker_id'] for application in applications] == seeker_ids
+    assert client.get(f'/api/archive/jobs/{job_id}/applicants').status_code == 401
+    assert client.get(f'/api/archive/jobs/{job_id}/applicants', headers=auth_header('seeker0', 'seekerpass')).status_code == 403
+    assert client.get(f'/api/jobs/{job_id}').status_code == 404
+    assert client.get('/api/archive/jobs/999').status_code == 404
+    assert client.get('/api/archive/jobs/999/applicants', headers=acme).status_code == 404
+
+    seeker = auth_header('seeker2', 'seekerpass')
+    statuses = client.get(f'/api/archive/job_seekers/{seeker_ids[2]}/applications', headers=seeker).get_json()['applications']
+    assert statuses == [{'job_id': job_id, 'job_category': 'Welder', 'description': 'Old opening 3', 'status': 'Pending'}]
+    assert client.get(f'/api/archive/job_seekers/{seeker_ids[2]}/applications').status_code == 401
+    assert client.get(f'/api/archive/job_seekers/{seeker_ids[2]}/applications', headers=acme).status_code == 403
+    create_user('root', 'rootpass', 'root@mail.com', 'admin')
+    admin = auth_header('root', 'rootpass')
+    assert client.get(f'/api/archive/job_seekers/{seeker_ids[2]}/applications', headers=admin).get_json()['applications'] == statuses
+    assert client.get('/api/archive/job_seekers/999/applications', headers=admin).status_code == 404
+
+def test_new_jobs_never_take_archived_ids(archive_db):
+    employer_id, seeker_ids = _old_and_new_jobs()
+    cutoff = archive_cutoff(older_than_days=365)
+    db.session.execute(update(Job).values(date_posted=datetime.utcnow() - timedelta(days=400)))
+    db.session.commit()
+    archive_jobs(cutoff)
+    archived_job_ids = {job.id for job in ArchivedJob.query}
+    archived_application_ids = {application.application_id for application in ArchivedApplication.query}
+
+    create_job('Welder', 'Posted after the archive', employer_id)
+    job = Job.query.filter_by(description='Posted after the archive').first()
+    apply_to_job(job.id, seeker_ids[0], 'Fresh application')
+    assert job.id not in archived_job_ids
+    assert Application.query.first().application_id not in archived_application_ids
+
+    # Archiving the new job too does not collide with the archive
+    db.session.execute(update(Job).values(date_posted=datetime.utcnow() - timedelta(days=400)))
+    db.session.commit()
+    assert archive_jobs(cutoff) == {'jobs': 1, 'applications': 1}
+    assert ArchivedJob.query.count() == len(archived_job_ids) + 1
@@ -0,0 +1,75 @@
+import pytest
+from starlette.testclient import TestClient
+
+from App.main import create_app
+from App.async_api import create_async_app, async_database_url
+from App.database import db, create_db
+from App.models import Employer, JobSeeker, Application
+from App.controllers import (
+    create_user,
+    create_job,
+    apply_to_job,
+    review_application,
+    list_jobs,
+    view_job_status_all,
+    login
+)
+
+'''
+    Integration Tests
+'''
+
+# The async tier reads the database file the Flask app writes
+@pytest.fixture(scope="module")
+def async_client(tmp_path_factory):
+    uri = f"sqlite:///{tmp_path_factory.mktemp('async') / 'async.db'}"
+    create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': uri})
+    create_db()
+    create_user('acme', 'acmepass', 'acme@mail.com', 'employer')
+    create_user('sally', 'sallypass', 'sally@mail.com', 'job_seeker')
+    employer = Employer.query.filter_by(username='acme').first()
+    for i in range(3):
+        create_job(f'Category {i}', f'Description {i}', employer.id)
+    sally = JobSeeker.query.filter_by(username='sally').first()
+    apply_to_job(list_jobs()[0][0].id, sally.id, 'Hello')
+    review_application(Application.query.first().application_id, True)
+    with TestClient(create_async_app({'SQLALCHEMY_DATABASE_URI': uri})) as client:
+        yield client
+    db.drop_all()
+
+
+def test_async_database_url():
+    assert str(async_database_url('sqlite:///temp-database.db', '/srv/instance')) == 'sqlite+aiosqlite:////srv/instance/temp-database.db'
+    assert async_database_url('postgresql://u:p@db/jobs', '/srv/instance').drivername == 'postgresql+asyncpg'
+
+def test_async_job_listing_matches_sync(async_client):
+    data = async_client.get('/api/jobs?limit=2').json()
+    jobs, cursor = list_jobs(limit=2)
+    assert data == {'jobs': [job.get_json() for job in jobs], 'next': cursor}
+    rest = async_client.get(f'/api/jobs?after={cursor}').json()
+    assert [job['category'] for job in rest['jobs']] == ['Category 0']
+    assert async_client.get('/api/jobs?after=bad').status_code == 400
+
+def test_async_job_detail(async_client):
+    job = list_jobs()[0][0]
+    assert async_client.get(f'/api/jobs/{job.id}').json() == job.get_json()
+    assert async_client.get('/api/jobs/999').status_code == 404
+
+def test_async_application_status(async_client):
+    sally = JobSeeker.query.filter_by(username='sally').first()
+    application = Application.query.first()
+    headers = {'Authorization': f"Bearer {login('sally', 'sallypass')}"}
+    response = async_client.get(f'/api/job_seekers/{sally.id}/applications', headers=headers)
+    assert response.json() == {'applications': view_job_status_all(sally.id)}
+    response = async_client.get(f'/api/job_seekers/{sally.id}/applications/{application.application_id}', headers=headers)
+    assert response.json()['status'].endswith('Status: Accepted')
+
+    # Only the job seeker or an admin may read them, like on the Flask app
+    assert async_client.get(f'/api/job_seekers/{sally.id}/applications').status_code == 401
+    assert async_client.get(f'/api/job_seekers/{sally.id}/applications', headers={'Authorization': 'Bearer nonsense'}).status_code == 401
+    acme = {'Authorization': f"Bearer {login('acme', 'acmepass')}"}
+    assert async_client.get(f'/api/job_seekers/{sally.id}/applications/{application.application_id}', headers=acme).status_code == 403
+    create_user('async_admin', 'adminpass', 'async_admin@mail.com', 'admin')
+    admin = {'Authorization': f"Bearer {login('async_admin', 'adminpass')}"}
+    assert async_client.get(f'/api/job_seekers/{sally.id}/applications', headers=admin).json() == {'applications': view_job_status_all(sally.id)}
+    assert async_client.get('/api/job_seekers/999/applications', headers=admin).status_code == 404
@@ -0,0 +1,104 @@
+import pytest
+
+from App.main import create_app
+from App.database import db, create_db
+from App.controllers import (
+    create_user,
+    login,
+    get_user_by_username,
+    update_user,
+    remove_user,
+    create_job,
+    remove_job,
+    apply_to_job
+)
+from App.models import Job, Application
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def auth_client():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'JWT_SECRET_KEY': 'test-secret-key-that-is-long-enough'})
+    create_db()
+    create_user('bob', 'bobpass', 'bob@mail.com', 'job_seeker')
+    yield app.test_client()
+    db.drop_all()
+
+def auth_header(username, password):
+    return {'Authorization': f'Bearer {login(username, password)}'}
+
+
+def test_identify_uses_cached_user(auth_client, query_budget):
+    headers = auth_header('bob', 'bobpass')
+    assert auth_client.get('/api/identify', headers=headers).status_code == 200
+    with query_budget(0):
+        response = auth_client.get('/api/identify', headers=headers)
+    assert response.status_code == 200
+    assert 'username: bob' in response.get_json()['message']
+
+def test_anonymous_page_render(auth_client, capsys):
+    assert auth_client.get('/').status_code == 200
+    assert capsys.readouterr().out == ''
+
+def test_update_and_remove_invalidate_cache(auth_client):
+    headers = auth_header('bob', 'bobpass')
+    user_id = get_user_by_username('bob').id
+    update_user(user_id, 'robert')
+    assert 'username: robert' in auth_client.get('/api/identify', headers=headers).get_json()['message']
+    remove_user(user_id)
+    assert auth_client.get('/api/identify', headers=headers).status_code == 401
+
+def test_bulk_signup(auth_client):
+    create_user('root', 'rootpass', 'root@mail.com', 'admin')
+    users = [
+        {'username': f'seeker{i}', 'password': f'pass{i}', 'email': f'seeker{i}@mail.com', 'role': 'job_seeker'}
+        for i in range(4)
+    ] + [{'username': 'seeker0', 'password': 'x', 'email': 'again@mail.com', 'role': 'job_seeker'}]
+    response = auth_client.post('/api/users/bulk', json=users, headers=auth_header('root', 'rootpass'))
+    assert response.status_code == 201
+    assert response.get_json() == {'created': 4, 'errors': [{'line': 5, 'message': "Username 'seeker0' is already taken."}]}
+    assert login('seeker3', 'pass3') is not None
+    assert auth_client.post('/api/users/bulk', json=users, headers=auth_header('seeker1', 'pass1')).status_code == 403
+
+    # Fields of the wrong JSON type are rejected row by row
+    odd = [
+        {'username': ['u'], 'password': 'x', 'email': 'list@mail.com', 'role': 'job_seeker'},
+        {'username': 'listrole', 'password': 'x', 'email': 'role@mail.com', 'role': ['a']},
+        {'username': 'fine', 'password': 'finepass', 'email': 'fine@mail.com', 'role': 'job_seeker'},
+    ]
+    response = auth_client.post('/api/users/bulk', json=odd, headers=auth_header('root', 'rootpass'))
+    assert response.status_code == 201
+    assert response.get_json() == {'created': 1, 'errors': [
+        {'line': 1, 'message': 'username must be text.'},
+        {'line': 2, 'message': 'role must be text.'},
+    ]}
+
+def test_bulk_review_is_limited_to_the_jobs_employer(auth_client):
+    create_user('hr', 'hrpass', 'hr@mail.com', 'employer')
+    create_user('rival', 'rivalpass', 'rival@mail.com', 'employer')
+    create_user('applicant', 'applicantpass', 'applicant@mail.com', 'job_seeker')
+    employer_id, seeker_id = get_user_by_username('hr').id, get_user_by_username('applicant').id
+    create_job('Recruiter', 'Hiring', employer_id)
+    job_id = Job.query.filter_by(employer_id=employer_id).first().id
+    apply_to_job(job_id, seeker_id, 'Pick me')
+    application_id = Application.query.filter_by(job_id=job_id).first().application_id
+
+    url = f'/api/jobs/{job_id}/applications/review'
+    assert auth_client.post(url, json={'accept': [application_id]}, headers=auth_header('rival', 'rivalpass')).status_code == 403
+    assert auth_client.post(url, json={'accept': ['x']}, headers=auth_header('hr', 'hrpass')).status_code == 400
+    response = auth_client.post(url, json={'accept': [application_id]}, headers=auth_header('hr', 'hrpass'))
+    assert response.status_code == 200
+    assert response.get_json() == {
+        'job_id': job_id, 'accepted': 1, 'rejected': 0,
+        'results': [{'application_id': application_id, 'outcome': 'Accepted'}]
+    }
+
+    # A soft-deleted job is gone for reviews too
+    auth_client.application.config['SOFT_DELETE'] = True
+    try:
+        remove_job(job_id)
+    finally:
+        auth_client.application.config['SOFT_DELETE'] = False
+    assert auth_client.post(url, json={'accept': [application_id]}, headers=auth_header('hr', 'hrpass')).status_code == 404
@@ -0,0 +1,59 @@
+import pytest
+
+from benchmarks.compare import compare
+from benchmarks.controllers import run_scale
+from benchmarks import read_models, load
+
+
+def _report(cases):
+    return {'scales': {'100': {'cases': cases}}}
+
+def test_compare_flags_slower_cases_and_extra_queries():
+    base = _report({
+        'list_jobs': {'median_ms': 1.0, 'queries': 1},
+        'get_job': {'median_ms': 1.0, 'queries': 1},
+        'get_all_jobs': {'median_ms': 1.0, 'queries': 2},
+    })
+    head = _report({
+        'list_jobs': {'median_ms': 1.05, 'queries': 1},
+        'get_job': {'median_ms': 2.0, 'queries': 1},
+        'get_all_jobs': {'median_ms': 1.0, 'queries': 3},
+        'search_jobs': {'median_ms': 1.0, 'queries': 1},
+    })
+    rows = {row['case']: row for row in compare(base, head, threshold=0.10)}
+    assert not rows['list_jobs']['regressed']
+    assert rows['get_job']['regressed']
+    assert rows['get_all_jobs']['regressed']
+    assert rows['search_jobs']['base_ms'] is None and not rows['search_jobs']['regressed']
+
+def test_run_scale_times_cases_against_seeded_data():
+    result = run_scale(20, repeat=2, cases=['create_job', 'apply_to_job', 'view_job_status_all', 'remove_job'])
+    assert result['volumes'] == {'employers': 1, 'job_seekers': 10, 'jobs': 20, 'applications': 60}
+    assert set(result['cases']) == {'create_job', 'apply_to_job', 'view_job_status_all', 'remove_job'}
+    assert result['cases']['apply_to_job']['runs'] == 2
+    assert result['cases']['view_job_status_all']['queries'] == 2
+
+def test_read_models_compares_orm_and_rows_per_row():
+    result = read_models.run(20, repeat=1)
+    assert set(result['listings']) == {'jobs', 'users', 'applications'}
+    jobs = result['listings']['jobs']
+    assert jobs['orm']['rows'] == jobs['rows']['rows'] == 20
+    # Tuples hold far less than instances with their state, whatever the machine
+    assert jobs['rows']['bytes_per_row'] < jobs['orm']['bytes_per_row']
+
+def test_load_summary_and_mix():
+    assert load.parse_mix('login=1, apply=2.5') == {'login': 1.0, 'apply': 2.5}
+    with pytest.raises(ValueError):
+        load.parse_mix('login=0')
+    samples = [(i / 1000, 200) for i in range(1, 100)] + [(1.0, 500)]
+    summary = load.summarize(samples, seconds=10)
+    assert summary['requests'] == 100 and summary['throughput_rps'] == 10
+    assert (summary['p50_ms'], summary['p95_ms'], summary['p99_ms']) == (50, 95, 99)
+    assert summary['errors'] == 1 and summary['error_rate'] == 0.01
+    assert summary['statuses'] == {'200': 99, '500': 1}
+
+def test_load_drives_gunicorn_against_seeded_data():
+    report = load.run(scale=20, concurrency=2, duration=1, warmup=0, workers=1)
+    assert report['meta']['workers'] == 1 and report['meta']['worker_class'] == 'gevent'
+    assert set(report['routes']) <= set(load.ROUTES) and report['routes']
+    assert report['total']['requests'] > 0 and report['total']['errors'] == 0
@@ -0,0 +1,102 @@
+import pytest
+from sqlalchemy import event
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Employer, Job, Category, CategoryFacet
+from App.controllers import (
+    create_user,
+    create_job,
+    remove_job,
+    remove_user,
+    import_jobs,
+    json_rows,
+    list_job_rows,
+    get_category_facets,
+    rebuild_categories
+)
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True)
+def categories_db(tmp_path):
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'categories.db'}"})
+    create_db()
+    create_user('acme', 'acmepass', 'acme@mail.com', 'employer')
+    create_user('globex', 'globexpass', 'globex@mail.com', 'employer')
+    yield app
+    db.session.remove()
+    db.engine.dispose()
+
+def employer(username):
+    return Employer.query.filter_by(username=username).first().id
+
+def facets():
+    return {facet['name']: facet['jobs'] for facet in get_category_facets()}
+
+def test_writers_keep_normalized_categories_and_facets(categories_db):
+    acme, globex = employer('acme'), employer('globex')
+    create_job('Data Analyst', 'SQL', acme)
+    create_job('data  analyst ', 'Dashboards', acme)
+    create_job('Nurse', 'Nights', globex)
+    report = import_jobs(json_rows([{'category': 'NURSE', 'description': 'Days', 'employer_id': globex}]))
+    assert report.created == 1
+    assert Category.query.count() == 2
+    assert facets() == {'Data Analyst': 2, 'Nurse': 2}
+
+    remove_job(Job.query.filter_by(description='SQL').first().id)
+    assert facets() == {'Data Analyst': 1, 'Nurse': 2}
+    categories_db.config['SOFT_DELETE'] = True
+    remove_user(globex)
+    assert facets() == {'Data Analyst': 1}
+
+    # The maintained counts are what a full recount finds
+    def counts():
+        return sorted((facet.category_id, facet.job_count) for facet in CategoryFacet.query if facet.job_count)
+    maintained = counts()
+    rebuild_categories()
+    assert counts() == maintained
+
+def test_listing_filters_by_category_through_the_index(categories_db):
+    acme = employer('acme')
+    for category in ('Nurse', 'Baker', 'nurse', 'Nurse'):
+        create_job(category, 'Listing', acme)
+    nurse_id = Category.query.filter_by(key='nurse').first().id
+
+    listings = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith('SELECT jobs.id'):
+            listings.append((statement, parameters))
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        jobs, cursor = list_job_rows(limit=2, category=' NURSE')
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    assert len(jobs) == 2 and cursor is not None
+    statement, parameters = listings[0]
+    plan = db.session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    assert any('ix_jobs_category_id_date_posted_id' in row[-1] for row in plan)
+    jobs, cursor = list_job_rows(limit=2, after=cursor, category_id=nurse_id)
+    assert [job.category for job in jobs] == ['Nurse'] and cursor is None
+    assert list_job_rows(category='Courier') == ([], None)
+
+    client = categories_db.test_client()
+    assert [job['category'] for job in client.get(f'/api/jobs?category_id={nurse_id}').get_json()['jobs']] == ['Nurse', 'nurse', 'Nurse']
+    assert client.get('/api/jobs/facets').get_json() == {'categories': [
+        {'id': nurse_id, 'name': 'Nurse', 'jobs': 3},
+        {'id': Category.query.filter_by(key='baker').first().id, 'name': 'Baker', 'jobs': 1},
+    ]}
+
+def test_rebuild_links_jobs_without_a_category(categories_db):
+    acme = employer('acme')
+    db.session.add_all([Job(category='Courier', description='Bikes', employer_id=acme), Job(category=' courier', description='Vans', employer_id=acme)])
+    db.session.commit()
+    assert facets() == {}
+    client = categories_db.test_client()
+    etag = client.get('/api/jobs/facets').headers['ETag']
+    assert rebuild_categories() == "Linked 2 jobs to their categories; 1 categories counted."
+    assert facets() == {'Courier': 2}
+    response = client.get('/api/jobs/facets', headers={'If-None-Match': etag})
+    assert response.status_code == 200 and [facet['jobs'] for facet in response.get_json()['categories']] == [2]
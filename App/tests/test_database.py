@@ -0,0 +1,61 @@
+import pytest
+from sqlalchemy import text
+
+from App.main import create_app
+from App.database import db, engine_options, sqlite_pragmas, pool_status
+from sqlalchemy.engine import make_url
+
+'''
+    Unit Tests
+'''
+
+def _config(uri, **overrides):
+    config = {
+        'SQLALCHEMY_DATABASE_URI': uri,
+        'DB_POOL_SIZE': 5,
+        'DB_MAX_OVERFLOW': 2,
+        'DB_POOL_TIMEOUT': 10,
+        'DB_POOL_RECYCLE': 600,
+        'DB_POOL_PRE_PING': True,
+        'SQLITE_JOURNAL_MODE': 'WAL',
+        'SQLITE_BUSY_TIMEOUT': 5000,
+        'SQLITE_SYNCHRONOUS': 'normal',
+        'SQLITE_FOREIGN_KEYS': True,
+    }
+    config.update(overrides)
+    return config
+
+def test_engine_options_size_the_pool():
+    options = engine_options(_config('postgresql://db/jobs'))
+    assert options == {'pool_size': 5, 'max_overflow': 2, 'pool_timeout': 10, 'pool_recycle': 600, 'pool_pre_ping': True}
+
+def test_in_memory_sqlite_keeps_its_single_connection():
+    assert engine_options(_config('sqlite://')) == {}
+    assert sqlite_pragmas(_config('sqlite://'), make_url('sqlite://')) == ['busy_timeout = 5000', 'synchronous = NORMAL', 'foreign_keys = ON']
+
+def test_invalid_synchronous_level_is_rejected():
+    with pytest.raises(ValueError):
+        sqlite_pragmas(_config('sqlite:///jobs.db', SQLITE_SYNCHRONOUS='sometimes'), make_url('sqlite:///jobs.db'))
+
+'''
+    Integration Tests
+'''
+
+def test_sqlite_file_connections_use_wal(tmp_path):
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'wal.db'}"})
+    with app.app_context():
+        with db.engine.connect() as connection:
+            assert connection.execute(text("PRAGMA journal_mode")).scalar() == 'wal'
+            assert connection.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+            assert connection.execute(text("PRAGMA synchronous")).scalar() == 1
+            assert connection.execute(text("PRAGMA foreign_keys")).scalar() == 1
+
+        status = pool_status(app)['default']
+        assert status['pool'] == 'QueuePool'
+        assert status['size'] == app.config['DB_POOL_SIZE']
+        assert status['checkouts'] >= 1 and status['checked_out'] == 0
+
+        response = app.test_client().get('/health/pool')
+        assert response.status_code == 200
+        assert response.json['default']['max_overflow'] == app.config['DB_MAX_OVERFLOW']
+        db.engine.dispose()
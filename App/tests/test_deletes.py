@@ -0,0 +1,126 @@
+import pytest
+from sqlalchemy import event
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import User, Employer, JobSeeker, Job, Application
+from App.controllers import (
+    create_user,
+    create_job,
+    apply_to_job,
+    remove_user,
+    remove_job,
+    list_jobs,
+    get_job,
+    get_jobs_for_employer,
+    get_all_users_json,
+    login_user,
+    login,
+    get_job_seeker_counts,
+    view_job_status_all,
+    purge_deleted,
+    json_rows,
+    import_jobs,
+    import_applications,
+    search_jobs,
+    rebuild_search_index
+)
+from App.controllers import search
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True)
+def deletes_db(tmp_path):
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'deletes.db'}"})
+    create_db()
+    yield app
+    db.session.remove()
+    db.engine.dispose()
+
+def _employer_with_applications(name, jobs=3):
+    create_user(name, f'{name}pass', f'{name}@mail.com', 'employer')
+    create_user(f'{name}_seeker', 'seekerpass', f'{name}_seeker@mail.com', 'job_seeker')
+    employer_id = Employer.query.filter_by(username=name).first().id
+    seeker_id = JobSeeker.query.filter_by(username=f'{name}_seeker').first().id
+    for i in range(jobs):
+        create_job(f'{name} job {i}', 'Cascades', employer_id)
+    for job in Job.query.filter_by(employer_id=employer_id):
+        apply_to_job(job.id, seeker_id, 'Delete me')
+    return employer_id, seeker_id
+
+def test_remove_employer_cascades_in_the_database(deletes_db):
+    employer_id, seeker_id = _employer_with_applications('bigcorp')
+    db.session.expunge_all()
+
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        remove_user(employer_id)
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+    # Jobs and applications were never loaded or deleted row by row
+    assert not any(statement.startswith('DELETE FROM applications') or statement.startswith('DELETE FROM jobs ') for statement in statements)
+    assert Job.query.filter_by(employer_id=employer_id).count() == 0
+    assert Application.query.count() == 0
+    assert get_job_seeker_counts(seeker_id)['applications'] == 0
+
+def test_soft_delete_hides_then_purges_in_batches(deletes_db):
+    deletes_db.config['SOFT_DELETE'] = True
+    employer_id, seeker_id = _employer_with_applications('oldcorp', jobs=5)
+    job_id = Job.query.filter_by(employer_id=employer_id).first().id
+
+    client = deletes_db.test_client()
+    token = login('oldcorp', 'oldcorppass')
+    assert client.get('/api/identify', headers={'Authorization': f'Bearer {token}'}).status_code == 200
+    assert remove_user(employer_id) == f"User with ID {employer_id} removed successfully."
+    assert login('oldcorp', 'oldcorppass') is None
+    assert client.post('/api/login', json={'username': 'oldcorp', 'password': 'oldcorppass'}).status_code == 401
+    assert client.get('/api/identify', headers={'Authorization': f'Bearer {token}'}).status_code == 401
+    assert get_jobs_for_employer(employer_id) == f"Employer with ID {employer_id} does not exist."
+    assert [user['username'] for user in get_all_users_json()] == ['oldcorp_seeker']
+    assert login_user('oldcorp', 'oldcorppass') == "Invalid username or password."
+    assert list_jobs()[0] == [] and get_job(job_id) is None
+    assert view_job_status_all(seeker_id) == []
+    assert apply_to_job(job_id, seeker_id, 'Too late') == f"Job with ID {job_id} does not exist."
+    assert remove_job(job_id) == f"Job with ID {job_id} does not exist."
+    # Nothing was deleted yet
+    assert Application.query.count() == 5
+
+    assert purge_deleted(batch_size=2, max_batches=1) == {'applications': 2}
+    assert purge_deleted(batch_size=2) == {'applications': 3, 'jobs': 5, 'employers': 1}
+    assert db.session.get(User, employer_id) is None
+    assert get_job_seeker_counts(seeker_id)['applications'] == 0
+    assert purge_deleted() == {}
+
+def test_imports_skip_soft_deleted_employers_and_jobs(deletes_db):
+    deletes_db.config['SOFT_DELETE'] = True
+    employer_id, seeker_id = _employer_with_applications('gonecorp', jobs=1)
+    create_user('other_seeker', 'seekerpass', 'other_seeker@mail.com', 'job_seeker')
+    other_id = JobSeeker.query.filter_by(username='other_seeker').first().id
+    job_id = Job.query.filter_by(employer_id=employer_id).first().id
+    remove_user(employer_id)
+
+    report = import_jobs(json_rows([{'category': 'Ghost', 'description': 'Posted too late', 'employer_id': employer_id}]))
+    assert report.created == 0 and report.errors == [(1, f"Employer with ID {employer_id} does not exist.")]
+    report = import_applications(json_rows([{'job_id': job_id, 'job_seeker_id': other_id, 'application_text': 'Too late'}]))
+    assert report.created == 0 and report.errors == [(1, f"Job with ID {job_id} does not exist.")]
+    # Nothing holds the employer back from being purged
+    purge_deleted()
+    assert db.session.get(User, employer_id) is None
+
+@pytest.mark.parametrize('fts5', [True, False])
+def test_reindexing_leaves_out_soft_deleted_jobs(deletes_db, monkeypatch, fts5):
+    if not fts5:
+        monkeypatch.setattr(search, '_uses_fts5', lambda connection: False)
+    deletes_db.config['SOFT_DELETE'] = True
+    employer_id, _ = _employer_with_applications('hiddencorp', jobs=2)
+    _employer_with_applications('livecorp', jobs=1)
+    remove_user(employer_id)
+    assert rebuild_search_index() == "Search index rebuilt for 1 jobs."
+    assert search_jobs('hiddencorp') == []
+    assert [job.category for job in search_jobs('livecorp')] == ['livecorp job 0']
@@ -0,0 +1,103 @@
+import json
+import threading
+import time
+
+import pytest
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Employer, JobSeeker, Job
+from App.controllers import (
+    create_user,
+    login,
+    create_job,
+    apply_to_job,
+    review_application,
+    review_applications,
+    get_application_events
+)
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture(autouse=True, scope="module")
+def events_app(tmp_path_factory):
+    # A database file, so the poller thread and the requests each have their own connection
+    database = tmp_path_factory.mktemp('events') / 'events.db'
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database}',
+        'JWT_SECRET_KEY': 'test-secret-key-that-is-long-enough',
+        'EVENTS_POLL_INTERVAL': 0.05
+    })
+    create_db()
+    create_user('hiring', 'hiringpass', 'hiring@mail.com', 'employer')
+    create_user('ann', 'annpass', 'ann@mail.com', 'job_seeker')
+    create_user('ben', 'benpass', 'ben@mail.com', 'job_seeker')
+    employer_id = Employer.query.filter_by(username='hiring').first().id
+    for category in ('Analyst', 'Baker', 'Courier'):
+        create_job(category, 'Events', employer_id)
+    for job in Job.query.filter_by(employer_id=employer_id):
+        for seeker in JobSeeker.query:
+            apply_to_job(job.id, seeker.id, 'Hello')
+    yield app
+    db.session.remove()
+    db.drop_all()
+    db.engine.dispose()
+
+def auth_header(username, password):
+    return {'Authorization': f'Bearer {login(username, password)}'}
+
+def _ids(username):
+    seeker = JobSeeker.query.filter_by(username=username).first()
+    return seeker.id, [application.application_id for application in seeker.applications]
+
+def test_reviews_write_one_event_per_status_change(events_app):
+    ann_id, applications = _ids('ann')
+    review_application(applications[0], True)
+    review_application(applications[0], True)
+    job_id = Job.query.filter_by(category='Baker').first().id
+    review_applications(job_id, reject_rest=True)
+
+    events = get_application_events(ann_id)
+    assert [(event['application_id'], event['status']) for event in events] == [(applications[0], 'Accepted'), (applications[1], 'Rejected')]
+    assert get_application_events(ann_id, since=events[-1]['id']) == []
+
+    client = events_app.test_client()
+    response = client.get(f'/api/job_seekers/{ann_id}/events?since={events[0]["id"]}&timeout=0', headers=auth_header('ann', 'annpass'))
+    assert response.status_code == 200
+    assert response.get_json() == {'events': events[1:], 'cursor': events[-1]['id']}
+    ben_id, _ = _ids('ben')
+    assert client.get(f'/api/job_seekers/{ben_id}/events', headers=auth_header('ann', 'annpass')).status_code == 403
+
+def test_long_poll_wakes_up_on_a_review(events_app):
+    ann_id, applications = _ids('ann')
+    cursor = get_application_events(ann_id)[-1]['id']
+
+    def review_later():
+        time.sleep(0.2)
+        with events_app.app_context():
+            review_application(applications[2], False)
+    reviewer = threading.Thread(target=review_later)
+    reviewer.start()
+    started = time.perf_counter()
+    response = events_app.test_client().get(f'/api/job_seekers/{ann_id}/events?since={cursor}&timeout=5', headers=auth_header('ann', 'annpass'))
+    reviewer.join()
+
+    assert time.perf_counter() - started < 2
+    assert [event['status'] for event in response.get_json()['events']] == ['Rejected']
+
+def test_stream_sends_events_after_last_event_id(events_app):
+    ann_id, _ = _ids('ann')
+    events = get_application_events(ann_id)
+    headers = {**auth_header('ann', 'annpass'), 'Last-Event-ID': str(events[0]['id'])}
+    response = events_app.test_client().get(f'/api/job_seekers/{ann_id}/events/stream', headers=headers, buffered=False)
+    assert response.mimetype == 'text/event-stream'
+    chunks = iter(response.response)
+    assert next(chunks) == b"retry: 3000\n\n"
+    received = [next(chunks).decode() for _ in events[1:]]
+    response.close()
+
+    for chunk, event in zip(received, events[1:]):
+        assert chunk == f"id: {event['id']}\nevent: application_status\ndata: {json.dumps(event)}\n\n"
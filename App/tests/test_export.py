@@ -0,0 +1,67 @@
+import json
+import pytest
+from datetime import datetime, timedelta
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Employer, JobSeeker, Job
+from App.controllers import (
+    create_user,
+    apply_to_job,
+    review_application,
+    export_entities,
+    get_all_entities
+)
+
+'''
+    Integration Tests
+'''
+
+# Module scoped in-memory database with four jobs posted a day apart and two applications
+@pytest.fixture(autouse=True, scope="module")
+def export_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    create_db()
+    create_user('initech', 'initechpass', 'initech@mail.com', 'employer')
+    create_user('peter', 'peterpass', 'peter@mail.com', 'job_seeker')
+    employer = Employer.query.filter_by(username='initech').first()
+    start = datetime(2024, 1, 1)
+    for i in range(4):
+        db.session.add(Job(category=f'Category {i}', description=f'Description {i}', employer_id=employer.id, date_posted=start + timedelta(days=i)))
+    db.session.commit()
+    peter = JobSeeker.query.filter_by(username='peter').first()
+    jobs = Job.query.order_by(Job.id).all()
+    apply_to_job(jobs[0].id, peter.id, 'TPS reports')
+    apply_to_job(jobs[3].id, peter.id, 'Red stapler')
+    review_application(1, True)
+    yield app
+    db.drop_all()
+
+
+def test_get_all_entities_text():
+    output = get_all_entities()
+    assert output.startswith("\n--- Users ---\nUserID: 1 Username: initech, Role: employer\n")
+    assert "\n--- Jobs ---\nJob ID: 1, Category: Category 0, Description: Description 0, Employer ID: 1\n" in output
+    assert output.endswith("\n--- Applications ---\nApplication ID: 1, Job ID: 1, Job Seeker ID: 2, Status: Accepted\nApplication ID: 2, Job ID: 4, Job Seeker ID: 2, Status: Pending\n")
+
+def test_export_csv_sections():
+    lines = "".join(export_entities(['users', 'applications'], 'csv')).split("\n")
+    assert lines[:4] == ['id,username,email,user_type', '1,initech,initech@mail.com,employer', '2,peter,peter@mail.com,job_seeker', '']
+    assert lines[4] == 'application_id,job_id,job_seeker_id,is_accepted,status'
+
+def test_export_jsonl_with_date_filters():
+    rows = [json.loads(line) for line in export_entities(['jobs', 'applications'], 'jsonl', since=datetime(2024, 1, 2), until=datetime(2024, 1, 4))]
+    assert [(row['table'], row.get('id')) for row in rows] == [('jobs', 2), ('jobs', 3)]
+
+    rows = [json.loads(line) for line in export_entities(['applications'], 'jsonl', since=datetime(2024, 1, 4))]
+    assert [(row['application_id'], row['status']) for row in rows] == [(2, 'Pending')]
+
+def test_export_streams_in_batches(query_budget):
+    db.session.expunge_all()
+    lines = export_entities(['jobs'], 'jsonl', batch_size=2)
+    # The first line is ready after a single query, and no ORM objects pile up in the session
+    with query_budget(1):
+        first = next(lines)
+    assert json.loads(first)['id'] == 1
+    assert len(list(lines)) == 3
+    assert len(db.session.identity_map) == 0
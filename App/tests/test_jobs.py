@@ -0,0 +1,134 @@
+import pytest
+from datetime import datetime, timedelta
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Employer, Job
+from App.controllers import (
+    create_user,
+    get_all_jobs,
+    create_job,
+    remove_job,
+    list_jobs,
+    list_job_rows,
+    iter_jobs,
+    search_jobs,
+    rebuild_search_index
+)
+from App.controllers import search
+
+'''
+    Integration Tests
+'''
+
+# Module scoped in-memory database shared by the job tests
+@pytest.fixture(autouse=True, scope="module")
+def jobs_db():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'JOB_PAGE_SIZE': 2})
+    create_db()
+    create_user('acme', 'acmepass', 'acme@mail.com', 'employer')
+    employer = Employer.query.filter_by(username='acme').first()
+    start = datetime(2024, 1, 1)
+    for i in range(5):
+        db.session.add(Job(category=f'Category {i}', description=f'Description {i}', employer_id=employer.id, date_posted=start + timedelta(days=i)))
+    db.session.commit()
+    rebuild_search_index()
+    yield app.test_client()
+    db.drop_all()
+
+
+def test_list_jobs_pages_newest_first():
+    jobs, cursor = list_jobs()
+    assert [job.category for job in jobs] == ['Category 4', 'Category 3']
+    jobs, cursor = list_jobs(after=cursor)
+    assert [job.category for job in jobs] == ['Category 2', 'Category 1']
+    jobs, cursor = list_jobs(after=cursor)
+    assert [job.category for job in jobs] == ['Category 0']
+    assert cursor is None
+
+def test_list_jobs_rejects_bad_cursor():
+    with pytest.raises(ValueError):
+        list_jobs(after='not-a-cursor')
+
+def test_iter_jobs_streams_every_job():
+    assert len(list(iter_jobs(batch_size=2))) == 5
+    assert get_all_jobs().count('Job ID:') == 5
+
+def test_list_jobs_api(jobs_db):
+    response = jobs_db.get('/api/jobs?limit=3')
+    data = response.get_json()
+    assert response.status_code == 200
+    assert [job['category'] for job in data['jobs']] == ['Category 4', 'Category 3', 'Category 2']
+    response = jobs_db.get(f"/api/jobs?after={data['next']}")
+    assert [job['category'] for job in response.get_json()['jobs']] == ['Category 1', 'Category 0']
+    assert jobs_db.get('/api/jobs?after=bad').status_code == 400
+    assert jobs_db.get('/api/jobs?limit=0').status_code == 400
+    assert jobs_db.get('/api/jobs?limit=-1').status_code == 400
+
+def test_job_rows_match_the_orm_listing(jobs_db):
+    jobs, cursor = list_jobs(limit=3)
+    rows, row_cursor = list_job_rows(limit=3)
+    assert [row.get_json() for row in rows] == [job.get_json() for job in jobs]
+    assert row_cursor == cursor
+    assert jobs_db.get('/api/jobs?limit=3').get_json()['jobs'] == [job.get_json() for job in jobs]
+
+def test_search_jobs_tracks_create_and_remove():
+    employer = Employer.query.filter_by(username='acme').first()
+    create_job('Backend Engineer', 'Python and SQL services', employer.id)
+    create_job('Data Engineer', 'Python pipelines', employer.id)
+    assert {job.category for job in search_jobs('python')} == {'Data Engineer', 'Backend Engineer'}
+    assert [job.category for job in search_jobs('engineer sql')] == ['Backend Engineer']
+    backend = search_jobs('backend')[0]
+    remove_job(backend.id)
+    assert search_jobs('backend') == []
+
+def test_search_jobs_without_fts5(monkeypatch):
+    monkeypatch.setattr(search, '_uses_fts5', lambda connection: False)
+    rebuild_search_index()
+    assert [job.category for job in search_jobs('category 3')] == ['Category 3']
+    assert [job.category for job in search_jobs('data python')] == ['Data Engineer']
+    assert search_jobs('nothing matches') == []
+
+def test_search_jobs_api(jobs_db):
+    response = jobs_db.get('/api/jobs/search?q=pipelines')
+    assert [job['category'] for job in response.get_json()['jobs']] == ['Data Engineer']
+    assert jobs_db.get('/api/jobs/search?q=pipelines', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+    rebuild_search_index()
+    assert jobs_db.get('/api/jobs/search?q=pipelines', headers={'If-None-Match': response.headers['ETag']}).status_code == 200
+    assert jobs_db.get('/api/jobs/search?q=python&limit=-1').status_code == 400
+    assert jobs_db.get('/api/jobs/search?q=python&limit=0').status_code == 400
+    with pytest.raises(ValueError):
+        search_jobs('python', limit=-1)
+
+def test_job_listing_conditional_get(jobs_db, query_budget):
+    employer_id = Employer.query.filter_by(username='acme').first().id
+    create_job('Support Engineer', 'Help customers', employer_id)
+    response = jobs_db.get('/api/jobs')
+    etag, last_modified = response.headers['ETag'], response.headers['Last-Modified']
+    with query_budget(1):
+        response = jobs_db.get('/api/jobs', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert jobs_db.get('/api/jobs', headers={'If-Modified-Since': last_modified}).status_code == 304
+
+    create_job('QA Engineer', 'Test plans', employer_id)
+    response = jobs_db.get('/api/jobs', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+def test_if_modified_since_sees_writes_in_the_same_second(jobs_db):
+    employer_id = Employer.query.filter_by(username='acme').first().id
+    create_job('Night Engineer', 'First of the second', employer_id)
+    last_modified = jobs_db.get('/api/jobs').headers['Last-Modified']
+    # However quick the next write, it lands in a later second than the cached copy
+    create_job('Night Engineer', 'Second of the second', employer_id)
+    response = jobs_db.get('/api/jobs', headers={'If-Modified-Since': last_modified})
+    assert response.status_code == 200
+    assert response.headers['Last-Modified'] != last_modified
+
+def test_job_detail_conditional_get(jobs_db):
+    job = search_jobs('support')[0]
+    response = jobs_db.get(f'/api/jobs/{job.id}')
+    assert response.get_json()['category'] == 'Support Engineer'
+    assert jobs_db.get(f'/api/jobs/{job.id}', headers={'If-None-Match': response.headers['ETag']}).status_code == 304
+    remove_job(job.id)
+    assert jobs_db.get(f'/api/jobs/{job.id}', headers={'If-None-Match': response.headers['ETag']}).status_code == 404
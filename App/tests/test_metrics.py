@@ -0,0 +1,72 @@
+import json
+import logging
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from App.main import create_app
+from App.database import db, create_db
+from App.metrics import Metrics
+from App.controllers import create_user, create_job
+from App.models import Employer
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture
+def metrics_app(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'metrics.db'}",
+        'METRICS_DIR': str(tmp_path / 'metrics'),
+        'METRICS_SLOW_REQUEST_SECONDS': 1e-9
+    })
+    create_db()
+    create_user('metrics', 'metricspass', 'metrics@mail.com', 'employer')
+    create_job('Gauger', 'Metrics', Employer.query.filter_by(username='metrics').first().id)
+    yield app
+    db.session.remove()
+    db.engine.dispose()
+
+def test_metrics_count_requests_and_statements_by_route(metrics_app, caplog):
+    client = metrics_app.test_client()
+    with caplog.at_level(logging.WARNING, logger=metrics_app.logger.name):
+        for _ in range(2):
+            assert client.get('/api/jobs').status_code == 200
+    assert client.get('/api/jobs/999999').status_code == 404
+
+    text = client.get('/metrics').get_data(as_text=True)
+    assert '# TYPE http_request_duration_seconds histogram' in text
+    assert 'http_requests_total{blueprint="job_views",route="/api/jobs",method="GET",status="200"} 2' in text
+    assert 'http_requests_total{blueprint="job_views",route="/api/jobs/<int:job_id>",method="GET",status="404"} 1' in text
+    assert 'http_request_duration_seconds_count{blueprint="job_views",route="/api/jobs",method="GET"} 2' in text
+    assert 'http_request_duration_seconds_bucket{blueprint="job_views",route="/api/jobs",method="GET",le="+Inf"} 2' in text
+    # The listing ran SQL, so no request fell into the le="0" statement bucket
+    assert 'http_request_db_statements_bucket{blueprint="job_views",route="/api/jobs",method="GET",le="0"} 0' in text
+    assert 'http_request_db_statements_count{blueprint="job_views",route="/api/jobs",method="GET"} 2' in text
+
+    slow = [record.getMessage() for record in caplog.records if record.getMessage().startswith('Slow request: GET /api/jobs ')]
+    assert len(slow) == 2 and 'SELECT' in slow[0]
+
+def test_metrics_add_up_the_files_of_other_workers(metrics_app):
+    other = Metrics(metrics_app.config['METRICS_LATENCY_BUCKETS'], metrics_app.config['METRICS_DIR'])
+    other.path = other.path.replace('metrics-', 'metrics-other-')
+    other.observe_request('job_views', '/api/jobs', 'GET', 200, 0.02, 3, 0.001)
+    other.flush()
+    with open(other.path) as file:
+        assert json.load(file)['http_requests_total'] == [[['job_views', '/api/jobs', 'GET', '200'], 1]]
+
+    client = metrics_app.test_client()
+    client.get('/api/jobs')
+    text = client.get('/metrics').get_data(as_text=True)
+    assert 'http_requests_total{blueprint="job_views",route="/api/jobs",method="GET",status="200"} 2' in text
+    assert 'http_request_db_statements_bucket{blueprint="job_views",route="/api/jobs",method="GET",le="5"} 2' in text
+
+def test_failed_statements_leave_no_timer_behind(metrics_app):
+    connection = db.session.connection()
+    for _ in range(3):
+        with pytest.raises(OperationalError):
+            connection.exec_driver_sql('SELECT * FROM no_such_table')
+    assert not connection.info.get('metrics_started')
+    db.session.rollback()
@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from sqlalchemy import update
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Employer, JobSeeker, Job
+from App.controllers import (
+    create_user,
+    login,
+    create_job,
+    remove_job,
+    apply_to_job,
+    recommend_jobs,
+    bump_versions,
+    archive_cutoff,
+    archive_jobs,
+    ALL_JOBS,
+    tokenize
+)
+from App.controllers.recommender import JobRecommender
+
+'''
+    Unit Tests
+'''
+
+JOBS = [
+    (1, 'Baker', 'Bread and pastry baker for the early shift'),
+    (2, 'Courier', 'Deliver parcels by bike across the city'),
+    (3, 'Pastry Chef', 'Pastry chef for a busy bakery'),
+    (4, 'Analyst', 'Data analyst for city transport'),
+]
+
+def _dense_scores(jobs, profile):
+    # The same TF-IDF cosine, computed the slow way
+    vocabulary = sorted({token for _, category, description in jobs for token in tokenize(category) + tokenize(description)})
+    counts = np.array([
+        [2 * tokenize(category).count(term) + tokenize(description).count(term) for term in vocabulary]
+        for _, category, description in jobs
+    ], dtype=float)
+    idf = np.log((1 + len(jobs)) / (1 + (counts > 0).sum(axis=0))) + 1
+    matrix = counts * idf
+    query = np.array([profile.get(term, 0) for term in vocabulary]) * idf
+    scores = matrix @ query / (np.linalg.norm(matrix, axis=1) * np.linalg.norm(query))
+    return {job_id: score for (job_id, _, _), score in zip(jobs, scores) if score > 0}
+
+def test_recommender_scores_match_dense_tf_idf_after_changes():
+    recommender = JobRecommender()
+    recommender.add_jobs(JOBS)
+    profile = {'pastry': 2, 'city': 1}
+    assert dict(recommender.recommend(profile, 10)) == pytest.approx(_dense_scores(JOBS, profile))
+
+    recommender.remove_jobs([1, 2, 4])
+    recommender.add_jobs([(5, 'Baker', 'Night baker for city bakery')])
+    remaining = [JOBS[2], (5, 'Baker', 'Night baker for city bakery')]
+    assert dict(recommender.recommend(profile, 10)) == pytest.approx(_dense_scores(remaining, profile))
+    # More than half the entries were removed, so the matrix was compacted
+    assert recommender.row_count == 2 and recommender.dead_entries == 0
+
+    best = recommender.recommend(profile, 1, exclude={3})
+    assert [job_id for job_id, _ in best] == [5]
+
+'''
+    Integration Tests
+'''
+
+@pytest.fixture
+def recommend_app(tmp_path):
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'recommend.db'}", 'JWT_SECRET_KEY': 'test-secret-key-that-is-long-enough'})
+    create_db()
+    create_user('bakery', 'bakerypass', 'bakery@mail.com', 'employer')
+    create_user('cara', 'carapass', 'cara@mail.com', 'job_seeker')
+    employer_id = Employer.query.filter_by(username='bakery').first().id
+    for _, category, description in JOBS:
+        create_job(category, description, employer_id)
+    yield app
+    db.session.remove()
+    db.engine.dispose()
+
+def test_recommendations_follow_applications_and_job_changes(recommend_app):
+    seeker_id = JobSeeker.query.filter_by(username='cara').first().id
+    employer_id = Employer.query.filter_by(username='bakery').first().id
+    assert recommend_jobs(seeker_id) == []
+
+    baker = Job.query.filter_by(category='Baker').first()
+    apply_to_job(baker.id, seeker_id, 'I bake bread and pastry every morning')
+    assert [job.category for job, _ in recommend_jobs(seeker_id)] == ['Pastry Chef']
+
+    # Made in this worker: the matrix is updated in place
+    create_job('Pastry Cook', 'Pastry and bread', employer_id)
+    remove_job(Job.query.filter_by(category='Pastry Chef').first().id)
+    assert [job.category for job, _ in recommend_jobs(seeker_id)] == ['Pastry Cook']
+
+    # Made elsewhere: caught up when the jobs version moves
+    db.session.add(Job(category='Bread Baker', description='Sourdough bread', employer_id=employer_id))
+    bump_versions(ALL_JOBS)
+    db.session.commit()
+    assert [job.category for job, _ in recommend_jobs(seeker_id)] == ['Pastry Cook', 'Bread Baker']
+
+    client = recommend_app.test_client()
+    response = client.get(f'/api/job_seekers/{seeker_id}/recommendations?limit=1', headers={'Authorization': f"Bearer {login('cara', 'carapass')}"})
+    assert response.status_code == 200
+    assert [job['category'] for job in response.get_json()['jobs']] == ['Pastry Cook']
+    assert recommend_jobs(999999) == "Job Seeker with ID 999999 does not exist."
+
+def test_recommender_catches_up_on_other_workers_changes(recommend_app, monkeypatch):
+    seeker_id = JobSeeker.query.filter_by(username='cara').first().id
+    employer_id = Employer.query.filter_by(username='bakery').first().id
+    baker = Job.query.filter_by(category='Baker').first()
+    apply_to_job(baker.id, seeker_id, 'I bake bread and pastry every morning')
+    assert [job.category for job, _ in recommend_jobs(seeker_id)] == ['Pastry Chef']
+
+    # Another worker: this one's recommender only sees the changes through the database
+    def elsewhere(change):
+        recommender = recommend_app.extensions.pop('job_recommender')
+        change()
+        recommend_app.extensions['job_recommender'] = recommender
+
+    compared = []
+    monkeypatch.setattr(JobRecommender, '_compare_open_jobs', lambda self: compared.append(True))
+    recommend_app.config['SOFT_DELETE'] = True
+    elsewhere(lambda: create_job('Pastry Cook', 'Pastry and bread', employer_id))
+    elsewhere(lambda: remove_job(Job.query.filter_by(category='Pastry Chef').first().id))
+    assert [job.category for job, _ in recommend_jobs(seeker_id)] == ['Pastry Cook']
+
+    def archive_pastry_cook():
+        db.session.execute(update(Job).where(Job.category == 'Pastry Cook').values(date_posted=datetime.utcnow() - timedelta(days=400)))
+        db.session.commit()
+        archive_jobs(archive_cutoff(older_than_days=365))
+    elsewhere(lambda: create_job('Bread Baker', 'Sourdough bread', employer_id))
+    elsewhere(archive_pastry_cook)
+    assert [job.category for job, _ in recommend_jobs(seeker_id)] == ['Bread Baker']
+    # New, soft deleted and archived jobs came from the deltas alone
+    assert compared == []
+
+    # A hard delete leaves no trace but the count of open jobs
+    monkeypatch.undo()
+    recommend_app.config['SOFT_DELETE'] = False
+    elsewhere(lambda: remove_job(Job.query.filter_by(category='Bread Baker').first().id))
+    assert recommend_jobs(seeker_id) == []
+    assert sorted(recommend_app.extensions['job_recommender'].rows) == sorted(job.id for job in Job.query.filter(Job.deleted_at.is_(None)))
+
+def test_recommend_limit_defaults_to_the_config(recommend_app):
+    seeker_id = JobSeeker.query.filter_by(username='cara').first().id
+    apply_to_job(Job.query.filter_by(category='Baker').first().id, seeker_id, 'Pastry, bread and the city by bike')
+    assert len(recommend_jobs(seeker_id)) == 3
+    recommend_app.config['RECOMMEND_LIMIT'] = 2
+    assert len(recommend_jobs(seeker_id)) == 2
@@ -0,0 +1,67 @@
+import pytest
+from sqlalchemy import update
+
+from App.main import create_app
+from App.database import db, create_db, reset_routing, sync_sqlite_replicas
+from App.models import Employer, Job
+from App.controllers import create_user, create_job, get_all_jobs, list_jobs
+
+'''
+    Integration Tests
+'''
+
+# A primary and a replica SQLite file; the replica only changes when it is synced
+@pytest.fixture(scope="module")
+def replicated_app(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('replicas')
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{directory / 'primary.db'}",
+        'DB_REPLICAS': [f"sqlite:///{directory / 'replica.db'}"],
+    })
+    create_db()
+    create_user('replicorp', 'replicorppass', 'replicorp@mail.com', 'employer')
+    assert sync_sqlite_replicas(app) == ['replica_0']
+    yield app
+    db.session.remove()
+    for engine in db.engines.values():
+        engine.dispose()
+
+def _employer_id():
+    return Employer.query.filter_by(username='replicorp').first().id
+
+def test_read_only_controllers_read_from_the_replica(replicated_app):
+    employer_id = _employer_id()
+    create_job('Replica Engineer', 'Reads from the replica', employer_id)
+
+    # A new request reads from the replica, which has not seen the job yet
+    reset_routing()
+    assert get_all_jobs() == "No jobs available."
+    assert replicated_app.test_client().get('/api/jobs').json['jobs'] == []
+
+    sync_sqlite_replicas(replicated_app)
+    reset_routing()
+    jobs, _ = list_jobs()
+    assert [job.category for job in jobs] == ['Replica Engineer']
+
+def test_reads_stick_to_the_primary_after_a_write(replicated_app):
+    reset_routing()
+    create_job('Sticky Engineer', 'Read your own writes', _employer_id())
+    jobs, _ = list_jobs()
+    assert 'Sticky Engineer' in [job.category for job in jobs]
+
+    reset_routing()
+    jobs, _ = list_jobs()
+    assert 'Sticky Engineer' not in [job.category for job in jobs]
+
+def test_reads_stick_to_the_primary_after_a_core_write(replicated_app):
+    create_job('Core Engineer', 'Before the update', _employer_id())
+    sync_sqlite_replicas(replicated_app)
+
+    # An UPDATE through execute() never flushes, it still counts as a write
+    reset_routing()
+    db.session.execute(update(Job).where(Job.category == 'Core Engineer').values(description='After the update'))
+    db.session.commit()
+    assert db.session.info.get('wrote_primary')
+    jobs, _ = list_jobs()
+    assert [job.description for job in jobs if job.category == 'Core Engineer'] == ['After the update']
@@ -0,0 +1,127 @@
+import pytest
+from sqlalchemy import select, update
+
+from App.main import create_app
+from App.database import db, create_db, using_shard
+from App.models import Employer, JobSeeker, Job, Application, JobShard
+from App.controllers import (
+    create_user,
+    create_job,
+    apply_to_job,
+    review_application,
+    review_applications,
+    remove_application,
+    remove_job,
+    remove_user,
+    get_applicants_for_job,
+    view_job_status_all,
+    view_job_status,
+    get_job_seeker_counts,
+    recount_applications,
+    rebalance_job,
+    rebalance_shards,
+    get_shard_status
+)
+
+'''
+    Integration Tests
+'''
+
+# A primary and two application shards, each its own SQLite file
+@pytest.fixture(autouse=True)
+def sharded_app(tmp_path):
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'primary.db'}",
+        'DB_SHARDS': [f"sqlite:///{tmp_path / 'shard0.db'}", f"sqlite:///{tmp_path / 'shard1.db'}"],
+    })
+    create_db()
+    yield app
+    db.session.remove()
+    for engine in db.engines.values():
+        engine.dispose()
+
+def _shard_application_ids(shard):
+    with using_shard(shard):
+        return db.session.scalars(select(Application.application_id).order_by(Application.application_id)).all()
+
+# An employer with two jobs (ids 1 and 2, so one on each shard) and two job seekers
+def _jobs_and_seekers():
+    create_user('shardco', 'shardcopass', 'shardco@mail.com', 'employer')
+    employer_id = Employer.query.filter_by(username='shardco').first().id
+    create_job('Welder', 'Even job', employer_id)
+    create_job('Welder', 'Odd job', employer_id)
+    jobs = [job.id for job in Job.query.order_by(Job.id)]
+    seekers = []
+    for name in ('alice', 'bob'):
+        create_user(name, f'{name}pass', f'{name}@mail.com', 'job_seeker')
+        seekers.append(JobSeeker.query.filter_by(username=name).first().id)
+    return employer_id, jobs, seekers
+
+def test_applications_live_on_their_jobs_shard():
+    employer_id, (job_a, job_b), (alice, bob) = _jobs_and_seekers()
+    assert apply_to_job(job_a, alice, 'A for alice').startswith('Application submitted')
+    assert apply_to_job(job_b, alice, 'B for alice').startswith('Application submitted')
+    assert apply_to_job(job_b, bob, 'B for bob').startswith('Application submitted')
+    assert apply_to_job(job_b, bob, 'Again') == f"Job Seeker {bob} has already applied for Job {job_b}."
+    assert apply_to_job(999, bob, 'Nope') == "Job with ID 999 does not exist."
+
+    # Ids come from the primary's directory, so they are unique across the shards
+    shard_a, shard_b = (db.session.get(JobShard, job_id).shard for job_id in (job_a, job_b))
+    assert shard_a != shard_b
+    assert _shard_application_ids(shard_a) == [1] and _shard_application_ids(shard_b) == [2, 3]
+    assert Application.query.count() == 0
+
+    assert [row.job_seeker_id for row in get_applicants_for_job(job_b)] == [alice, bob]
+    assert review_application(3, True) == 'Application 3 has been accepted.'
+    # Application 1 is on the other shard, with the other job
+    assert review_applications(job_b, reject=[1], reject_rest=True) == {1: "Refused: does not exist.", 2: 'Rejected'}
+    statuses = view_job_status_all(alice)
+    assert [(status['job_id'], status['status']) for status in statuses] == [(job_a, 'Pending'), (job_b, 'Rejected')]
+    assert view_job_status(bob, 3).endswith('Status: Accepted')
+    assert get_job_seeker_counts(alice)['applications'] == 2
+    assert get_shard_status() == [
+        {'shard': shard, 'jobs': 1, 'applications': 1 if shard == shard_a else 2} for shard in ('shard_0', 'shard_1')
+    ]
+
+    assert remove_application(1) == 'Application with ID 1 removed successfully.'
+    assert remove_application(1) == 'Application with ID 1 does not exist.'
+    assert get_job_seeker_counts(alice)['applications'] == 1
+    # A removed job seeker's applications are found on every shard
+    remove_user(alice)
+    assert _shard_application_ids(shard_b) == [3]
+    remove_job(job_b)
+    assert _shard_application_ids(shard_b) == []
+    assert get_job_seeker_counts(bob)['applications'] == 0
+
+def test_rebalance_moves_whole_jobs_between_shards():
+    employer_id, (job_a, job_b), seekers = _jobs_and_seekers()
+    for name in ('carol', 'dave'):
+        create_user(name, f'{name}pass', f'{name}@mail.com', 'job_seeker')
+        seekers.append(JobSeeker.query.filter_by(username=name).first().id)
+    create_job('Welder', 'Third job', employer_id)
+    job_c = Job.query.filter_by(description='Third job').first().id
+    for seeker_id in seekers:
+        apply_to_job(job_a, seeker_id, 'Busy shard')
+    apply_to_job(job_c, seekers[0], 'Busy shard too')
+    apply_to_job(job_b, seekers[0], 'Quiet shard')
+    busy = db.session.get(JobShard, job_a).shard
+    quiet = db.session.get(JobShard, job_b).shard
+    assert db.session.get(JobShard, job_c).shard == busy
+
+    assert rebalance_job(job_a, 'shard_9') == "Unknown shard 'shard_9'. Choose from shard_0, shard_1."
+    assert rebalance_job(job_b, quiet) == f"Job {job_b} is already on {quiet}."
+    # 5 against 1: moving job_a would only swap the sides, moving job_c narrows the gap
+    assert rebalance_shards() == [(job_c, busy, quiet, 1)]
+    assert rebalance_shards() == []
+    assert len(_shard_application_ids(quiet)) == 2
+    assert rebalance_job(job_a, quiet) == f"Moved 4 applications of Job {job_a} to {quiet}."
+    assert _shard_application_ids(busy) == []
+    assert [row.job_seeker_id for row in get_applicants_for_job(job_a)] == seekers
+    assert apply_to_job(job_a, seekers[0], 'Again') == f"Job Seeker {seekers[0]} has already applied for Job {job_a}."
+
+    # Counters rebuilt from the shards match the ones kept by the writers
+    db.session.execute(update(Job).values(applicant_count=0))
+    db.session.commit()
+    recount_applications()
+    assert [job.applicant_count for job in Job.query.order_by(Job.id)] == [4, 1, 1]
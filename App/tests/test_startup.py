@@ -0,0 +1,40 @@
+import subprocess
+import sys
+
+from App.main import create_app, setup_web
+from App.database import db
+from App.startup import IMPORTS_MARKER, CREATE_APP_MARKER, _imports_by_package
+
+'''
+    Unit Tests
+'''
+
+def test_lean_app_leaves_out_the_web_until_asked():
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite://'}, lean=True)
+    assert 'flask-jwt-extended' in app.extensions
+    assert 'admin' not in app.extensions and not app.blueprints
+    assert [name for name, _ in app.extensions['startup_phases']] == ['config', 'database', 'jwt']
+
+    setup_web(app)
+    setup_web(app)
+    assert 'job_views' in app.blueprints and len(app.extensions['admin']) == 1
+    assert any(rule.rule == '/api/jobs' for rule in app.url_map.iter_rules())
+    db.engine.dispose()
+
+def test_imports_are_summed_by_package_between_the_markers():
+    importtime = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:      500 |        500 | site",
+        IMPORTS_MARKER,
+        "import time:      100 |        100 |     sqlalchemy.sql",
+        "import time:      200 |        300 |   sqlalchemy",
+        "import time:       50 |        350 | App",
+        CREATE_APP_MARKER,
+        "import time:     9000 |       9000 | flask_admin",
+    ])
+    assert _imports_by_package(importtime) == {'sqlalchemy': 0.3, 'App': 0.05}
+
+def test_cli_start_leaves_numpy_for_the_first_recommendation():
+    # A fresh interpreter, since this one has loaded everything the other tests needed
+    check = "import sys, wsgi; sys.exit('numpy' in sys.modules)"
+    assert subprocess.run([sys.executable, '-c', check], capture_output=True).returncode == 0
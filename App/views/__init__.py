@@ -3,8 +3,11 @@
 from .user import user_views
 from .index import index_views
 from .auth import auth_views
+from .job import job_views
+from .application import application_views
+from .archive import archive_views
 from .admin import setup_admin
 
 
-views = [user_views, index_views, auth_views] 
+views = [user_views, index_views, auth_views, job_views, application_views, archive_views] 
 # blueprints must be added to this list
\ No newline at end of file
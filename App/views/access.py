@@ -0,0 +1,21 @@
+from flask import jsonify
+from flask_jwt_extended import current_user
+
+from App.models import JobSeeker
+
+# Checks for routes behind @jwt_required(). Each returns the error response to
+# send, or None when the logged in user may go on; admins may see everything.
+# Routes run them before conditional_response, so a 304 tells nothing to others.
+
+def job_seeker_forbidden(job_seeker_id, message):
+    if current_user.user_type != 'admin' and current_user.id != job_seeker_id:
+        return jsonify(message=message), 403
+    if not JobSeeker.query.get(job_seeker_id):
+        return jsonify(error=f"Job Seeker with ID {job_seeker_id} does not exist."), 404
+    return None
+
+# For a job (open or archived) the caller has already found, posted by employer_id
+def employer_forbidden(employer_id, message):
+    if current_user.user_type != 'admin' and current_user.id != employer_id:
+        return jsonify(message=message), 403
+    return None
@@ -0,0 +1,189 @@
+import json
+
+from flask import Blueprint, current_app, jsonify, request, stream_with_context
+from flask_jwt_extended import jwt_required, current_user as jwt_current_user
+
+from App.models import Job
+from App.controllers import (
+    apply_to_job,
+    get_applicants_for_job,
+    review_applications,
+    get_job_counts,
+    get_job_seeker_counts,
+    view_job_status_all,
+    wait_for_application_events,
+    recommend_jobs,
+    job_scope,
+    job_seeker_scope
+)
+
+from .access import job_seeker_forbidden, employer_forbidden
+from .caching import conditional_response
+from .serialization import json_response
+
+application_views = Blueprint('application_views', __name__, template_folder='../templates')
+
+'''
+API Routes
+'''
+
+def _job_forbidden(job_id, message):
+    job = Job.query.get(job_id)
+    if not job or job.deleted_at is not None:
+        return jsonify(error=f"Job with ID {job_id} does not exist."), 404
+    return employer_forbidden(job.employer_id, message)
+
+# [EMPLOYER who posted the job, ADMIN]
+@application_views.route('/api/jobs/<int:job_id>/applicants', methods=['GET'])
+@jwt_required()
+def get_applicants_action(job_id):
+    forbidden = _job_forbidden(job_id, 'only the employer who posted the job can see its applicants')
+    if forbidden:
+        return forbidden
+    def build():
+        applications = get_applicants_for_job(job_id)
+        return json_response({'applications': [application.get_json() for application in applications]})
+    return conditional_response(job_scope(job_id), build)
+
+# [JOB_SEEKER, ADMIN]
+@application_views.route('/api/job_seekers/<int:job_seeker_id>/applications', methods=['GET'])
+@jwt_required()
+def get_job_seeker_applications_action(job_seeker_id):
+    forbidden = job_seeker_forbidden(job_seeker_id, 'only the job seeker can see their applications')
+    if forbidden:
+        return forbidden
+    def build():
+        applications = view_job_status_all(job_seeker_id)
+        if isinstance(applications, str):
+            return jsonify(error=applications), 404
+        return jsonify({'applications': applications})
+    return conditional_response(job_seeker_scope(job_seeker_id), build)
+
+# [EMPLOYER who posted the job, ADMIN]
+@application_views.route('/api/jobs/<int:job_id>/counts', methods=['GET'])
+@jwt_required()
+def get_job_counts_action(job_id):
+    forbidden = _job_forbidden(job_id, 'only the employer who posted the job can see its counts')
+    if forbidden:
+        return forbidden
+    def build():
+        counts = get_job_counts(job_id)
+        if isinstance(counts, str):
+            return jsonify(error=counts), 404
+        return jsonify(counts)
+    return conditional_response(job_scope(job_id), build)
+
+# [JOB_SEEKER, ADMIN]
+@application_views.route('/api/job_seekers/<int:job_seeker_id>/counts', methods=['GET'])
+@jwt_required()
+def get_job_seeker_counts_action(job_seeker_id):
+    forbidden = job_seeker_forbidden(job_seeker_id, 'only the job seeker can see their counts')
+    if forbidden:
+        return forbidden
+    def build():
+        counts = get_job_seeker_counts(job_seeker_id)
+        if isinstance(counts, str):
+            return jsonify(error=counts), 404
+        return jsonify(counts)
+    return conditional_response(job_seeker_scope(job_seeker_id), build)
+
+# Body: {"accept": [ids], "reject": [ids], "reject_rest": false} [EMPLOYER who posted the job, ADMIN]
+@application_views.route('/api/jobs/<int:job_id>/applications/review', methods=['POST'])
+@jwt_required()
+def review_applications_action(job_id):
+    forbidden = _job_forbidden(job_id, 'only the employer who posted the job can review its applications')
+    if forbidden:
+        return forbidden
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify(message='expected a JSON object with accept and/or reject lists'), 400
+    accept, reject = data.get('accept', []), data.get('reject', [])
+    if not all(isinstance(ids, list) and all(isinstance(i, int) and not isinstance(i, bool) for i in ids) for ids in (accept, reject)):
+        return jsonify(message='accept and reject must be lists of application ids'), 400
+
+    outcomes = review_applications(job_id, accept, reject, bool(data.get('reject_rest', False)))
+    # The job went away since the check above
+    if isinstance(outcomes, str):
+        return jsonify(error=outcomes), 404
+    return jsonify({
+        'job_id': job_id,
+        'accepted': sum(1 for outcome in outcomes.values() if outcome == 'Accepted'),
+        'rejected': sum(1 for outcome in outcomes.values() if outcome == 'Rejected'),
+        'results': [{'application_id': application_id, 'outcome': outcome} for application_id, outcome in outcomes.items()]
+    })
+
+# Body: {"application_text": "..."} [JOB_SEEKER]
+@application_views.route('/api/jobs/<int:job_id>/applications', methods=['POST'])
+@jwt_required()
+def apply_to_job_action(job_id):
+    if jwt_current_user.user_type != 'job_seeker':
+        return jsonify(message='only job seekers can apply to jobs'), 403
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get('application_text'), str) or not data['application_text'].strip():
+        return jsonify(message='expected a JSON object with an application_text'), 400
+
+    message = apply_to_job(job_id, jwt_current_user.id, data['application_text'])
+    if message.startswith('Application submitted'):
+        return jsonify(message=message), 201
+    if message.startswith('Job with ID'):
+        return jsonify(error=message), 404
+    return jsonify(error=message), 409
+
+# Long poll: answers as soon as there are events after ?since=<cursor>, or with none after ?timeout= seconds
+# Pass the returned cursor as since in the next request [JOB_SEEKER, ADMIN]
+@application_views.route('/api/job_seekers/<int:job_seeker_id>/events', methods=['GET'])
+@jwt_required()
+def get_application_events_action(job_seeker_id):
+    forbidden = job_seeker_forbidden(job_seeker_id, 'only the job seeker can follow their application events')
+    if forbidden:
+        return forbidden
+    since = max(request.args.get('since', 0, type=int), 0)
+    longest = current_app.config['EVENTS_LONG_POLL_TIMEOUT']
+    timeout = min(max(request.args.get('timeout', longest, type=float), 0), longest)
+    events = wait_for_application_events(job_seeker_id, since, timeout)
+    response = jsonify({'events': events, 'cursor': events[-1]['id'] if events else since})
+    response.cache_control.no_store = True
+    return response
+
+# Server-Sent Events: one `application_status` event per status change after the cursor,
+# taken from Last-Event-ID when the browser reconnects, else from ?since= [JOB_SEEKER, ADMIN]
+@application_views.route('/api/job_seekers/<int:job_seeker_id>/events/stream', methods=['GET'])
+@jwt_required()
+def stream_application_events_action(job_seeker_id):
+    forbidden = job_seeker_forbidden(job_seeker_id, 'only the job seeker can follow their application events')
+    if forbidden:
+        return forbidden
+    since = request.headers.get('Last-Event-ID', request.args.get('since', 0, type=int), type=int)
+    heartbeat = current_app.config['EVENTS_HEARTBEAT']
+
+    def stream(cursor):
+        yield "retry: 3000\n\n"
+        while True:
+            events = wait_for_application_events(job_seeker_id, cursor, heartbeat)
+            for event in events:
+                yield f"id: {event['id']}\nevent: application_status\ndata: {json.dumps(event)}\n\n"
+            if events:
+                cursor = events[-1]['id']
+            else:
+                # A comment line, so proxies keep the connection open and a gone client is noticed
+                yield ": keep-alive\n\n"
+
+    response = current_app.response_class(stream_with_context(stream(max(since, 0))), mimetype='text/event-stream')
+    response.cache_control.no_cache = True
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+# Open jobs most like the job seeker's applications, best first: ?limit= [JOB_SEEKER, ADMIN]
+@application_views.route('/api/job_seekers/<int:job_seeker_id>/recommendations', methods=['GET'])
+@jwt_required()
+def get_recommendations_action(job_seeker_id):
+    forbidden = job_seeker_forbidden(job_seeker_id, 'only the job seeker can see their recommendations')
+    if forbidden:
+        return forbidden
+    limit = request.args.get('limit', current_app.config['RECOMMEND_LIMIT'], type=int)
+    limit = min(max(limit, 1), current_app.config['JOB_PAGE_SIZE_MAX'])
+    recommendations = recommend_jobs(job_seeker_id, limit)
+    if isinstance(recommendations, str):
+        return jsonify(error=recommendations), 404
+    return jsonify({'jobs': [{**job.get_json(), 'score': round(score, 4)} for job, score in recommendations]})
@@ -0,0 +1,74 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required
+
+from App.controllers import (
+    list_archived_jobs,
+    get_archived_job,
+    get_archived_applicants,
+    view_archived_job_status_all,
+    ARCHIVE
+)
+
+from .access import job_seeker_forbidden, employer_forbidden
+from .caching import conditional_response
+from .serialization import json_response
+
+archive_views = Blueprint('archive_views', __name__, template_folder='../templates')
+
+'''
+API Routes
+'''
+
+# Read API over the jobs and applications moved out by `flask admin archive_jobs`.
+# Every route is versioned on the one ARCHIVE scope, which archiving and user removal bump
+
+# ?employer_id=<id> lists only that employer's archived jobs
+@archive_views.route('/api/archive/jobs', methods=['GET'])
+def list_archived_jobs_action():
+    def build():
+        try:
+            jobs, next_cursor = list_archived_jobs(
+                request.args.get('limit', type=int), request.args.get('after'), request.args.get('employer_id', type=int)
+            )
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+        return json_response({'jobs': [job.get_json() for job in jobs], 'next': next_cursor})
+    return conditional_response(ARCHIVE, build)
+
+@archive_views.route('/api/archive/jobs/<int:job_id>', methods=['GET'])
+def get_archived_job_action(job_id):
+    def build():
+        job = get_archived_job(job_id)
+        if not job:
+            return jsonify(error=f"Archived job with ID {job_id} does not exist."), 404
+        return json_response(job.get_json())
+    return conditional_response(ARCHIVE, build)
+
+# [EMPLOYER who posted the job, ADMIN]
+@archive_views.route('/api/archive/jobs/<int:job_id>/applicants', methods=['GET'])
+@jwt_required()
+def get_archived_applicants_action(job_id):
+    job = get_archived_job(job_id)
+    if not job:
+        return jsonify(error=f"Archived job with ID {job_id} does not exist."), 404
+    forbidden = employer_forbidden(job.employer_id, 'only the employer who posted the job can see its applicants')
+    if forbidden:
+        return forbidden
+    def build():
+        applications = get_archived_applicants(job_id)
+        return json_response({'applications': [application.get_json() for application in applications]})
+    return conditional_response(ARCHIVE, build)
+
+# [JOB_SEEKER, ADMIN]
+@archive_views.route('/api/archive/job_seekers/<int:job_seeker_id>/applications', methods=['GET'])
+@jwt_required()
+def get_archived_job_seeker_applications_action(job_seeker_id):
+    forbidden = job_seeker_forbidden(job_seeker_id, 'only the job seeker can see their applications')
+    if forbidden:
+        return forbidden
+    def build():
+        applications = view_archived_job_status_all(job_seeker_id)
+        if isinstance(applications, str):
+            return jsonify(error=applications), 404
+        return json_response({'applications': applications})
+    return conditional_response(ARCHIVE, build)
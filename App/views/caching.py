@@ -0,0 +1,29 @@
+from datetime import timezone
+
+from flask import current_app, make_response, request
+
+from App.controllers import get_version
+
+# Serves a read endpoint conditionally on the version counter of its scope.
+# When the client's If-None-Match / If-Modified-Since still matches, the
+# answer is 304 Not Modified after one version lookup and build is never called.
+def conditional_response(scope, build):
+    version, updated_at = get_version(*scope)
+    etag = f"{scope[0]}-{scope[1]}-{version}"
+    last_modified = updated_at.replace(tzinfo=timezone.utc, microsecond=0) if updated_at else None
+
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains_weak(etag)
+    else:
+        not_modified = last_modified is not None and request.if_modified_since is not None \
+            and last_modified <= request.if_modified_since
+
+    # The version is read before the body is built, so a write in between only makes the ETag older than the body
+    response = current_app.response_class(status=304) if not_modified else make_response(build())
+    if response.status_code in (200, 304):
+        response.set_etag(etag, weak=True)
+        if last_modified is not None:
+            response.last_modified = last_modified
+        # Clients may keep the body but have to revalidate before reusing it
+        response.cache_control.no_cache = True
+    return response
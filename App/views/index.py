@@ -1,4 +1,6 @@
-from flask import Blueprint, redirect, render_template, request, send_from_directory, jsonify
+from flask import Blueprint, redirect, render_template, request, send_from_directory, jsonify, current_app, abort
+from App.database import pool_status
+from App.metrics import render_metrics
 from App.controllers import create_user, initialize
 
 index_views = Blueprint('index_views', __name__, template_folder='../templates')
@@ -14,4 +16,17 @@ def init():
 
 @index_views.route('/health', methods=['GET'])
 def health_check():
-    return jsonify({'status':'healthy'})
\ No newline at end of file
+    return jsonify({'status':'healthy'})
+
+# Connection pool usage of the worker that serves the request, for sizing DB_POOL_SIZE
+@index_views.route('/health/pool', methods=['GET'])
+def pool_health_check():
+    return jsonify(pool_status(current_app))
+
+# Request and SQL metrics of every worker in the Prometheus text format, for scraping
+@index_views.route('/metrics', methods=['GET'])
+def metrics():
+    text = render_metrics(current_app)
+    if text is None:
+        abort(404)
+    return current_app.response_class(text, content_type='text/plain; version=0.0.4; charset=utf-8')
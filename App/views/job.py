@@ -0,0 +1,70 @@
+from flask import Blueprint, jsonify, request
+
+from App.controllers import (
+    list_job_rows,
+    get_category_facets,
+    search_jobs,
+    get_job,
+    get_jobs_for_employer,
+    ALL_JOBS,
+    employer_scope,
+    job_scope
+)
+
+from .caching import conditional_response
+from .serialization import json_response
+
+job_views = Blueprint('job_views', __name__, template_folder='../templates')
+
+'''
+API Routes
+'''
+
+# ?category=<name> or ?category_id=<id> lists only the jobs of that category
+@job_views.route('/api/jobs', methods=['GET'])
+def list_jobs_action():
+    def build():
+        try:
+            jobs, next_cursor = list_job_rows(
+                request.args.get('limit', type=int), request.args.get('after'),
+                request.args.get('category'), request.args.get('category_id', type=int)
+            )
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+        return json_response({'jobs': [job.get_json() for job in jobs], 'next': next_cursor})
+    return conditional_response(ALL_JOBS, build)
+
+# Open jobs per category, most jobs first
+@job_views.route('/api/jobs/facets', methods=['GET'])
+def job_facets_action():
+    def build():
+        return json_response({'categories': get_category_facets()})
+    return conditional_response(ALL_JOBS, build)
+
+@job_views.route('/api/jobs/search', methods=['GET'])
+def search_jobs_action():
+    def build():
+        try:
+            jobs = search_jobs(request.args.get('q', ''), request.args.get('limit', 20, type=int))
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+        return jsonify({'jobs': [job.get_json() for job in jobs]})
+    return conditional_response(ALL_JOBS, build)
+
+@job_views.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_job_action(job_id):
+    def build():
+        job = get_job(job_id)
+        if not job:
+            return jsonify(error=f"Job with ID {job_id} does not exist."), 404
+        return jsonify(job.get_json())
+    return conditional_response(job_scope(job_id), build)
+
+@job_views.route('/api/employers/<int:employer_id>/jobs', methods=['GET'])
+def get_employer_jobs_action(employer_id):
+    def build():
+        jobs = get_jobs_for_employer(employer_id)
+        if isinstance(jobs, str):
+            return jsonify(error=jobs), 404
+        return jsonify({'jobs': [job.get_json() for job in jobs]})
+    return conditional_response(employer_scope(employer_id), build)
@@ -2,11 +2,14 @@ from flask import Blueprint, render_template, jsonify, request, send_from_direct
 from flask_jwt_extended import jwt_required, current_user as jwt_current_user
 
 from.index import index_views
+from .serialization import json_response
 
 from App.controllers import (
     create_user,
     get_all_users,
     get_all_users_json,
+    import_users,
+    json_rows,
     jwt_required
 )
 
@@ -27,7 +30,7 @@ def create_user_action():
 @user_views.route('/api/users', methods=['GET'])
 def get_users_action():
     users = get_all_users_json()
-    return jsonify(users)
+    return json_response(users)
 
 @user_views.route('/api/users', methods=['POST'])
 def create_user_endpoint():
@@ -35,6 +38,18 @@ def create_user_endpoint():
     user = create_user(data['username'], data['password'])
     return jsonify({'message': f"user {user.username} created with id {user.id}"})
 
+# Body: a JSON list of {username, password, email, role[, company_name]} objects [ADMIN]
+@user_views.route('/api/users/bulk', methods=['POST'])
+@jwt_required()
+def bulk_signup_endpoint():
+    if jwt_current_user.user_type != 'admin':
+        return jsonify(message='admin access required'), 403
+    data = request.get_json(silent=True)
+    if not isinstance(data, list):
+        return jsonify(message='expected a JSON list of users'), 400
+    report = import_users(json_rows(data))
+    return jsonify(report.get_json()), 201 if report.created else 200
+
 @user_views.route('/static/users', methods=['GET'])
 def static_user_page():
   return send_from_directory('static', 'static-user.html')
\ No newline at end of file
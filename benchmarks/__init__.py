@@ -0,0 +1 @@
+# Benchmarks for the controllers; run with `python -m benchmarks --help`
@@ -0,0 +1,132 @@
+import argparse
+import json
+import sys
+
+from .compare import DEFAULT_THRESHOLD, compare, format_comparison
+
+# Usage:
+#   python -m benchmarks run --scales 100,1000 --repeat 5 -o before.json
+#   python -m benchmarks compare before.json after.json
+#   python -m benchmarks read_models --scale 10000
+#   python -m benchmarks load --concurrency 32 --duration 60 -o load.json
+
+
+def _log(message):
+    print(message, file=sys.stderr, flush=True)
+
+def _scales(value):
+    return [int(scale) for scale in value.split(',') if scale]
+
+def run_command(args):
+    # Imported here so `compare` works without the app's dependencies
+    from .controllers import run
+    report = run(args.scales, args.repeat, args.database_uri, args.case, args.seed, _log)
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + "\n")
+        _log(f"Results written to {args.output}")
+    else:
+        print(output)
+    return 0
+
+def read_models_command(args):
+    from .read_models import run
+    report = run(args.scale, args.repeat, args.seed, _log)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(json.dumps(report, indent=2, sort_keys=True) + "\n")
+        _log(f"Results written to {args.output}")
+    return 0
+
+def _env(value):
+    name, separator, setting = value.partition('=')
+    if not separator or not name:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got '{value}'")
+    return name, setting
+
+def _mix(value):
+    from .load import parse_mix
+    try:
+        return parse_mix(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def load_command(args):
+    from .load import run
+    try:
+        report = run(
+            args.scale, args.concurrency, args.duration, args.warmup, args.mix, args.workers,
+            args.worker_class, args.database_uri, dict(args.env or []), args.seed, _log
+        )
+    except RuntimeError as e:
+        _log(str(e))
+        return 1
+    output = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(output + "\n")
+        _log(f"Results written to {args.output}")
+    else:
+        print(output)
+    return 0
+
+def compare_command(args):
+    with open(args.base) as file:
+        base = json.load(file)
+    with open(args.head) as file:
+        head = json.load(file)
+    rows = compare(base, head, args.threshold)
+    print(format_comparison(rows))
+    regressions = [row for row in rows if row['regressed']]
+    if regressions:
+        _log(f"{len(regressions)} case(s) slower than {args.threshold:.0%} or running more queries.")
+        return 1
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Controller benchmarks for the job board.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Seed a database at each scale and time every controller.')
+    run_parser.add_argument('--scales', type=_scales, default='100,1000,10000', help='Comma separated numbers of jobs to seed (default: 100,1000,10000).')
+    run_parser.add_argument('--repeat', type=int, default=5, help='Runs per case and scale (default: 5).')
+    run_parser.add_argument('--case', action='append', help='Only time this case; may be given more than once.')
+    run_parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic data (default: 0).')
+    run_parser.add_argument('--database-uri', help='Database to benchmark against; its tables are dropped. Defaults to a temporary SQLite file.')
+    run_parser.add_argument('-o', '--output', help='Write the JSON report here instead of stdout.')
+    run_parser.set_defaults(handler=run_command)
+
+    compare_parser = commands.add_parser('compare', help='Compare two JSON reports.')
+    compare_parser.add_argument('base')
+    compare_parser.add_argument('head')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Median slowdown that counts as a regression (default: 0.10).')
+    compare_parser.set_defaults(handler=compare_command)
+
+    read_models_parser = commands.add_parser('read_models', help='Compare ORM instances and read model rows for the list endpoints, per row.')
+    read_models_parser.add_argument('--scale', type=int, default=10000, help='Number of jobs to seed (default: 10000).')
+    read_models_parser.add_argument('--repeat', type=int, default=5, help='Runs per listing (default: 5).')
+    read_models_parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic data (default: 0).')
+    read_models_parser.add_argument('-o', '--output', help='Also write the JSON report here.')
+    read_models_parser.set_defaults(handler=read_models_command)
+
+    load_parser = commands.add_parser('load', help='Seed a database, start gunicorn on it and drive it with a mix of API requests.')
+    load_parser.add_argument('--scale', type=int, default=1000, help='Number of jobs to seed (default: 1000).')
+    load_parser.add_argument('--concurrency', type=int, default=16, help='Virtual users sending requests at once (default: 16).')
+    load_parser.add_argument('--duration', type=float, default=30.0, help='Seconds of measured traffic (default: 30).')
+    load_parser.add_argument('--warmup', type=float, default=3.0, help='Seconds of traffic before measuring starts (default: 3).')
+    load_parser.add_argument('--mix', type=_mix, help='Weights of the actions, e.g. login=1,list_jobs=6,apply=2,review=1 (the default).')
+    load_parser.add_argument('--workers', type=int, help='gunicorn workers (default: gunicorn_config.py).')
+    load_parser.add_argument('--worker-class', help='gunicorn worker class, e.g. sync or gevent (default: gunicorn_config.py).')
+    load_parser.add_argument('--env', type=_env, action='append', help='NAME=VALUE for the server, e.g. FLASK_DB_POOL_SIZE=5; may be given more than once.')
+    load_parser.add_argument('--seed', type=int, default=0, help='Random seed for the data and the traffic (default: 0).')
+    load_parser.add_argument('--database-uri', help='Database to seed and serve; its tables are dropped. Defaults to a temporary SQLite file.')
+    load_parser.add_argument('-o', '--output', help='Write the JSON report here instead of stdout.')
+    load_parser.set_defaults(handler=load_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,42 @@
+# Compares two benchmark reports case by case, on the median time and the query count
+
+DEFAULT_THRESHOLD = 0.10
+
+
+def compare(base, head, threshold=DEFAULT_THRESHOLD):
+    rows = []
+    for scale, head_scale in head['scales'].items():
+        base_cases = base['scales'].get(scale, {}).get('cases', {})
+        for name, result in head_scale['cases'].items():
+            before = base_cases.get(name)
+            row = {
+                'scale': scale,
+                'case': name,
+                'base_ms': before['median_ms'] if before else None,
+                'head_ms': result['median_ms'],
+                'base_queries': before['queries'] if before else None,
+                'head_queries': result['queries'],
+                'change': None,
+                'regressed': False,
+            }
+            if before and before['median_ms'] > 0:
+                row['change'] = result['median_ms'] / before['median_ms'] - 1
+                row['regressed'] = row['change'] > threshold
+            if before and result['queries'] > before['queries']:
+                row['regressed'] = True
+            rows.append(row)
+    return rows
+
+def _cell(value, format):
+    return format.format(value) if value is not None else '-'
+
+def format_comparison(rows):
+    lines = [f"{'scale':>7}  {'case':<24} {'base ms':>10} {'head ms':>10} {'change':>8} {'queries':>9}"]
+    for row in rows:
+        queries = f"{_cell(row['base_queries'], '{}')}->{row['head_queries']}"
+        flag = '  !' if row['regressed'] else ''
+        lines.append(
+            f"{row['scale']:>7}  {row['case']:<24} {_cell(row['base_ms'], '{:.3f}'):>10} {row['head_ms']:>10.3f} "
+            f"{_cell(row['change'], '{:+.1%}'):>8} {queries:>9}{flag}"
+        )
+    return "\n".join(lines)
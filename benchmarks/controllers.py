@@ -0,0 +1,247 @@
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from statistics import mean, median
+
+import sqlalchemy
+from sqlalchemy import event, func
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Job, Application
+from App.controllers import (
+    create_user,
+    login_user,
+    review_application,
+    application_status,
+    view_job_status_all,
+    view_job_status,
+    create_job,
+    apply_to_job,
+    list_jobs,
+    iter_jobs,
+    get_job,
+    get_jobs_for_employer,
+    get_all_jobs,
+    get_all_users,
+    get_applicants_for_job,
+    remove_user,
+    remove_job,
+    remove_application,
+    drop_database,
+    get_all_entities,
+    initialize
+)
+from .seed import PASSWORD, seed, volumes
+
+# Times every controller function in App/controllers/controllers.py against a
+# seeded database, once per scale. The query builders and formatters that the
+# views share (job_seeker_*_statement, format_*, jobs_page*) run inside the
+# controllers that use them, so they are measured there.
+#
+# Every run starts with an empty session, like a request does, and only the
+# controller call itself is timed; picking ids and other setup happens outside
+# the timer. Cases that write pick fresh rows for each run so every run takes
+# the same path (an insert that inserts, a delete that deletes).
+
+DEFAULT_SCALES = [100, 1000, 10000]
+DEFAULT_REPEAT = 5
+
+
+class Case:
+    def __init__(self, name, function, arguments=lambda state, run: (), runs=None):
+        self.name = name
+        self.function = function
+        # arguments(state, run) picks the controller's arguments for one run, outside the timer
+        self.arguments = arguments
+        # Upper bound on runs for cases that use up rows, whatever --repeat says
+        self.runs = runs
+
+
+def _busiest_job_seeker():
+    return (
+        db.session.query(Application.job_seeker_id)
+        .group_by(Application.job_seeker_id)
+        .order_by(func.count().desc(), Application.job_seeker_id)
+        .limit(1)
+        .scalar()
+    )
+
+def _busiest_job():
+    return (
+        db.session.query(Application.job_id)
+        .group_by(Application.job_id)
+        .order_by(func.count().desc(), Application.job_id)
+        .limit(1)
+        .scalar()
+    )
+
+def _first_application(job_seeker_id):
+    return (
+        db.session.query(Application.application_id)
+        .filter_by(job_seeker_id=job_seeker_id)
+        .order_by(Application.application_id)
+        .limit(1)
+        .scalar()
+    )
+
+def _apply_arguments(state, run):
+    # The jobs create_job posted have no applications yet, so every run inserts
+    if not state['new_jobs']:
+        create_job('Benchmark Engineer', 'Benchmarks the job board controllers', state['employer_id'])
+        state['new_jobs'].append(db.session.query(func.max(Job.id)).scalar())
+    job_id = state['new_jobs'][run % len(state['new_jobs'])]
+    return job_id, state['ids']['job_seekers'][run], 'Benchmark application'
+
+def _take(kind):
+    # Removal cases use up rows from the end of the seeded ids
+    return lambda state, run: (state['ids'][kind].pop(),)
+
+def _consume_jobs():
+    return sum(1 for _ in iter_jobs())
+
+
+CASES = [
+    Case('create_user', create_user, lambda state, run: (f'bench_user{run}', PASSWORD, f'bench_user{run}@bench.test', 'job_seeker')),
+    Case('login_user', login_user, lambda state, run: ('seeker0', PASSWORD)),
+    Case('create_job', create_job, lambda state, run: ('Benchmark Engineer', 'Benchmarks the job board controllers', state['employer_id'])),
+    Case('apply_to_job', apply_to_job, _apply_arguments),
+    Case('review_application', review_application, lambda state, run: (state['ids']['applications'][run], run % 2 == 0)),
+    Case('application_status', application_status, lambda state, run: (True,)),
+    Case('view_job_status_all', view_job_status_all, lambda state, run: (state['busiest_job_seeker'],)),
+    Case('view_job_status', view_job_status, lambda state, run: (state['busiest_job_seeker'], state['busiest_application'])),
+    Case('list_jobs', list_jobs),
+    Case('iter_jobs', _consume_jobs),
+    Case('get_job', get_job, lambda state, run: (state['ids']['jobs'][0],)),
+    Case('get_jobs_for_employer', get_jobs_for_employer, lambda state, run: (state['employer_id'],)),
+    Case('get_all_jobs', get_all_jobs),
+    Case('get_all_users', get_all_users),
+    Case('get_applicants_for_job', get_applicants_for_job, lambda state, run: (state['busiest_job'],)),
+    Case('get_all_entities', get_all_entities),
+    Case('remove_application', remove_application, _take('applications')),
+    Case('remove_job', remove_job, _take('jobs')),
+    Case('remove_user_job_seeker', remove_user, _take('job_seekers')),
+    # The first employer stays behind, it owns the jobs create_job posted
+    Case('remove_user_employer', remove_user, _take('employers'), runs=lambda state: len(state['ids']['employers']) - 1),
+    Case('initialize', initialize),
+    # Drops every table, so it has to run last and only once
+    Case('drop_database', drop_database, lambda state, run: (state['ids']['admins'][0],), runs=lambda state: 1),
+]
+
+
+def _summary(timings, queries):
+    return {
+        'runs': len(timings),
+        'min_ms': round(min(timings) * 1000, 3),
+        'median_ms': round(median(timings) * 1000, 3),
+        'mean_ms': round(mean(timings) * 1000, 3),
+        'max_ms': round(max(timings) * 1000, 3),
+        'queries': int(median(queries)),
+    }
+
+def run_case(case, state, repeat):
+    runs = repeat
+    if case.runs is not None:
+        runs = max(0, min(repeat, case.runs(state)))
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    timings, queries = [], []
+    for run in range(runs):
+        # A fresh session per run, so no run is served from the previous run's identity map
+        db.session.remove()
+        arguments = case.arguments(state, run)
+        db.session.remove()
+        statements.clear()
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            start = time.perf_counter()
+            case.function(*arguments)
+            elapsed = time.perf_counter() - start
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        timings.append(elapsed)
+        queries.append(len(statements))
+        if case.function is create_job:
+            state['new_jobs'].append(db.session.query(func.max(Job.id)).scalar())
+    db.session.remove()
+    if not timings:
+        return None
+    return _summary(timings, queries)
+
+# Seeds a fresh database at one scale and times every case against it
+def run_scale(scale, repeat=DEFAULT_REPEAT, database_uri=None, cases=None, seed_value=0, log=None):
+    directory = None
+    if database_uri is None:
+        directory = tempfile.mkdtemp(prefix='jobboard-bench-')
+        database_uri = 'sqlite:///' + os.path.join(directory, 'bench.db')
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': database_uri})
+    try:
+        with app.app_context():
+            db.drop_all()
+            create_db()
+            counts = volumes(scale)
+            start = time.perf_counter()
+            ids = seed(random_seed=seed_value, **counts)
+            seed_seconds = time.perf_counter() - start
+
+            busiest_job_seeker = _busiest_job_seeker()
+            state = {
+                'ids': ids,
+                'employer_id': ids['employers'][0],
+                'new_jobs': [],
+                'busiest_job_seeker': busiest_job_seeker,
+                'busiest_application': _first_application(busiest_job_seeker),
+                'busiest_job': _busiest_job(),
+            }
+
+            results = {}
+            for case in CASES:
+                if cases and case.name not in cases:
+                    continue
+                summary = run_case(case, state, repeat)
+                if summary is None:
+                    continue
+                results[case.name] = summary
+                if log:
+                    log(f"  {case.name:<24} median {summary['median_ms']:>10.3f} ms  {summary['queries']:>4} queries")
+            db.engine.dispose()
+    finally:
+        if directory:
+            shutil.rmtree(directory, ignore_errors=True)
+    return {'volumes': counts, 'seed_seconds': round(seed_seconds, 3), 'cases': results}
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(scales=DEFAULT_SCALES, repeat=DEFAULT_REPEAT, database_uri=None, cases=None, seed_value=0, log=None):
+    report = {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'sqlalchemy': sqlalchemy.__version__,
+            'platform': sys.platform,
+            'database': sqlalchemy.engine.make_url(database_uri).get_backend_name() if database_uri else 'sqlite',
+            'repeat': repeat,
+            'seed': seed_value,
+        },
+        'scales': {}
+    }
+    for scale in scales:
+        if log:
+            log(f"scale {scale}: {volumes(scale)}")
+        report['scales'][str(scale)] = run_scale(scale, repeat, database_uri, cases, seed_value, log)
+    return report
@@ -0,0 +1,352 @@
+import http.client
+import json
+import os
+import random
+import runpy
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+import sqlalchemy
+from sqlalchemy import select
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import Employer, JobSeeker, Job, Application
+from .controllers import _git_commit
+from .seed import PASSWORD, seed, volumes
+
+# Drives the real server, gunicorn with gunicorn_config.py, against a seeded
+# database with a mix of API traffic, and reports throughput, latency
+# percentiles and error rates per route.
+#
+# Every virtual user is a thread with its own keep-alive connection, logged in
+# as one job seeker and one employer of the seeded data. It sends requests back
+# to back, picking the next action at random by the weights of the mix:
+#
+# - login: POST /api/login as its job seeker (a password hash per request)
+# - list_jobs: GET /api/jobs, the first page or the next one of its last listing
+# - apply: POST /api/jobs/<job_id>/applications to a job its job seeker has not applied to
+# - review: POST /api/jobs/<job_id>/applications/review, accepting or rejecting
+#   one seeded application to a job of its employer
+#
+# Requests in the first `warmup` seconds are sent but not counted. A response
+# is an error when it is not a 2xx, or when the request failed altogether.
+
+DEFAULT_SCALE = 1000
+DEFAULT_CONCURRENCY = 16
+DEFAULT_DURATION = 30.0
+DEFAULT_WARMUP = 3.0
+DEFAULT_MIX = {'login': 1, 'list_jobs': 6, 'apply': 2, 'review': 1}
+STARTUP_TIMEOUT = 60.0
+REQUEST_TIMEOUT = 30.0
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ROUTES = {
+    'login': 'POST /api/login',
+    'list_jobs': 'GET /api/jobs',
+    'apply': 'POST /api/jobs/<job_id>/applications',
+    'review': 'POST /api/jobs/<job_id>/applications/review',
+}
+
+
+# "login=1,list_jobs=6" into {'login': 1, 'list_jobs': 6}
+def parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        if not part.strip():
+            continue
+        action, _, weight = part.partition('=')
+        action = action.strip()
+        if action not in ROUTES:
+            raise ValueError(f"Unknown action '{action}'. Choose from {', '.join(ROUTES)}.")
+        try:
+            mix[action] = float(weight)
+        except ValueError:
+            raise ValueError(f"Weight of '{action}' must be a number.")
+        if mix[action] < 0:
+            raise ValueError(f"Weight of '{action}' cannot be negative.")
+    if not any(mix.values()):
+        raise ValueError("The mix needs at least one action with a positive weight.")
+    return mix
+
+# The value below which `percent` of the sorted samples fall (nearest rank)
+def percentile(samples, percent):
+    if not samples:
+        return None
+    rank = max(1, -(-len(samples) * percent // 100))
+    return samples[int(rank) - 1]
+
+def summarize(samples, seconds):
+    latencies = sorted(latency for latency, _ in samples)
+    statuses = Counter(status for _, status in samples)
+    errors = sum(count for status, count in statuses.items() if not 200 <= status < 300)
+    milliseconds = lambda value: None if value is None else round(value * 1000, 3)
+    return {
+        'requests': len(samples),
+        'throughput_rps': round(len(samples) / seconds, 2) if seconds else None,
+        'p50_ms': milliseconds(percentile(latencies, 50)),
+        'p95_ms': milliseconds(percentile(latencies, 95)),
+        'p99_ms': milliseconds(percentile(latencies, 99)),
+        'mean_ms': milliseconds(sum(latencies) / len(latencies)) if latencies else None,
+        'max_ms': milliseconds(latencies[-1]) if latencies else None,
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+        # 0 stands for requests that got no response at all
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+# Seeds an empty database and returns what the virtual users need to know about it
+def prepare_database(database_uri, scale, seed_value=0):
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': database_uri}, lean=True)
+    with app.app_context():
+        db.drop_all()
+        create_db()
+        seed(random_seed=seed_value, **volumes(scale))
+        seekers = db.session.execute(select(JobSeeker.id, JobSeeker.username).order_by(JobSeeker.id)).all()
+        employers = db.session.execute(select(Employer.id, Employer.username).order_by(Employer.id)).all()
+        job_ids = db.session.scalars(select(Job.id).order_by(Job.id)).all()
+        applied, reviewable = defaultdict(set), defaultdict(list)
+        for job_id, seeker_id, application_id, employer_id in db.session.execute(
+            select(Application.job_id, Application.job_seeker_id, Application.application_id, Job.employer_id)
+            .join(Job, Job.id == Application.job_id)
+        ):
+            applied[seeker_id].add(job_id)
+            reviewable[employer_id].append((job_id, application_id))
+        db.session.remove()
+        db.engine.dispose()
+    return {
+        'seekers': [tuple(row) for row in seekers],
+        'employers': [tuple(row) for row in employers],
+        'jobs': job_ids,
+        'applied': applied,
+        'reviewable': reviewable,
+    }
+
+# The workers and worker class the server runs with: the arguments, or else gunicorn_config.py's
+def server_settings(workers=None, worker_class=None):
+    config = runpy.run_path(os.path.join(ROOT, 'gunicorn_config.py'))
+    return workers or config.get('workers', 1), worker_class or config.get('worker_class', 'sync')
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Server:
+    # gunicorn with gunicorn_config.py on 127.0.0.1:port; workers and worker_class override the config file
+    def __init__(self, database_uri, port, workers=None, worker_class=None, env=None, log_path=None):
+        self.port = port
+        command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn_config.py', '--bind', f'127.0.0.1:{port}']
+        if workers:
+            command += ['--workers', str(workers)]
+        if worker_class:
+            command += ['--worker-class', worker_class]
+        command.append('wsgi:app')
+        self.command = command
+        self.env = {**os.environ, **(env or {}), 'FLASK_SQLALCHEMY_DATABASE_URI': database_uri}
+        self.log_path = log_path or os.devnull
+        self.process = None
+
+    def start(self, timeout=STARTUP_TIMEOUT):
+        self.log = open(self.log_path, 'w')
+        self.process = subprocess.Popen(self.command, cwd=ROOT, env=self.env, stdout=self.log, stderr=subprocess.STDOUT)
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                self.stop()
+                raise RuntimeError(f"gunicorn exited with status {self.process.returncode}:\n{self.log_tail()}")
+            try:
+                connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=5)
+                connection.request('GET', '/api/jobs?limit=1')
+                if connection.getresponse().status == 200:
+                    connection.close()
+                    return
+                connection.close()
+            except OSError:
+                pass
+            time.sleep(0.2)
+        self.stop()
+        raise RuntimeError(f"gunicorn did not answer within {timeout:.0f} seconds:\n{self.log_tail()}")
+
+    # The end of the server's output, for errors: the log goes with the temporary directory
+    def log_tail(self, lines=20):
+        try:
+            with open(self.log_path) as file:
+                return ''.join(file.readlines()[-lines:])
+        except OSError:
+            return ''
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        if self.process:
+            self.log.close()
+
+
+class VirtualUser(threading.Thread):
+    def __init__(self, number, port, data, mix, start_at, measure_from, stop_at, random_seed):
+        super().__init__(daemon=True)
+        self.port = port
+        self.rng = random.Random(random_seed * 100003 + number)
+        self.seeker_id, self.seeker_name = data['seekers'][number % len(data['seekers'])]
+        self.employer_id, self.employer_name = data['employers'][number % len(data['employers'])]
+        # Jobs left to apply to, in this user's own order
+        self.open_jobs = [job_id for job_id in data['jobs'] if job_id not in data['applied'][self.seeker_id]]
+        self.rng.shuffle(self.open_jobs)
+        self.reviewable = data['reviewable'][self.employer_id]
+        self.actions, self.weights = zip(*[(action, weight) for action, weight in mix.items() if weight > 0])
+        self.start_at, self.measure_from, self.stop_at = start_at, measure_from, stop_at
+        self.samples = defaultdict(list)  # action: [(seconds, status)]
+        self.connection = None
+        self.tokens = {}
+        self.next_page = None
+
+    def _request(self, method, path, body=None, token=None):
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        payload = json.dumps(body) if body is not None else None
+        if self.connection is None:
+            self.connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=REQUEST_TIMEOUT)
+        try:
+            self.connection.request(method, path, payload, headers)
+            response = self.connection.getresponse()
+            data = response.read()
+            return response.status, data
+        except (OSError, http.client.HTTPException):
+            self.connection.close()
+            self.connection = None
+            return 0, b''
+
+    def _login(self, username):
+        status, data = self._request('POST', '/api/login', {'username': username, 'password': PASSWORD})
+        if status == 200:
+            self.tokens[username] = json.loads(data)['access_token']
+        return status
+
+    def login(self):
+        return self._login(self.seeker_name)
+
+    def list_jobs(self):
+        path = '/api/jobs' if self.next_page is None else f'/api/jobs?after={self.next_page}'
+        status, data = self._request('GET', path)
+        self.next_page = json.loads(data)['next'] if status == 200 else None
+        return status
+
+    def apply(self):
+        if not self.open_jobs:
+            return None
+        job_id = self.open_jobs.pop()
+        status, _ = self._request(
+            'POST', f'/api/jobs/{job_id}/applications',
+            {'application_text': 'Load test application'}, self.tokens.get(self.seeker_name)
+        )
+        return status
+
+    def review(self):
+        if not self.reviewable:
+            return None
+        job_id, application_id = self.rng.choice(self.reviewable)
+        decision = 'accept' if self.rng.random() < 0.5 else 'reject'
+        status, _ = self._request(
+            'POST', f'/api/jobs/{job_id}/applications/review',
+            {decision: [application_id]}, self.tokens.get(self.employer_name)
+        )
+        return status
+
+    def run(self):
+        while time.monotonic() < self.start_at:
+            time.sleep(0.01)
+        # Tokens for apply and review, before the clock starts
+        self._login(self.seeker_name)
+        self._login(self.employer_name)
+        while True:
+            started = time.monotonic()
+            if started >= self.stop_at:
+                break
+            action = self.rng.choices(self.actions, self.weights)[0]
+            status = getattr(self, action)()
+            if status is None:
+                continue
+            if started >= self.measure_from:
+                self.samples[action].append((time.monotonic() - started, status))
+        if self.connection:
+            self.connection.close()
+
+# Runs the virtual users against the server on port; returns ({action: [(seconds, status)]}, measured seconds)
+def drive(port, data, mix, concurrency, duration, warmup, random_seed=0):
+    start_at = time.monotonic() + 0.5
+    measure_from = start_at + warmup
+    stop_at = measure_from + duration
+    users = [VirtualUser(number, port, data, mix, start_at, measure_from, stop_at, random_seed) for number in range(concurrency)]
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    samples = defaultdict(list)
+    for user in users:
+        for action, action_samples in user.samples.items():
+            samples[action].extend(action_samples)
+    return samples, duration
+
+# Seeds a database, starts gunicorn on it and drives it with the mix; returns the JSON report
+def run(scale=DEFAULT_SCALE, concurrency=DEFAULT_CONCURRENCY, duration=DEFAULT_DURATION, warmup=DEFAULT_WARMUP,
+        mix=None, workers=None, worker_class=None, database_uri=None, env=None, seed_value=0, log=None):
+    mix = mix or DEFAULT_MIX
+    log = log or (lambda message: None)
+    directory = tempfile.mkdtemp(prefix='jobboard-load-')
+    if database_uri is None:
+        database_uri = 'sqlite:///' + os.path.join(directory, 'load.db')
+    try:
+        log(f"Seeding {scale} jobs...")
+        data = prepare_database(database_uri, scale, seed_value)
+        server = Server(database_uri, free_port(), workers, worker_class, env, os.path.join(directory, 'gunicorn.log'))
+        log(f"Starting {' '.join(server.command[2:])}")
+        server.start()
+        try:
+            log(f"Driving {concurrency} users for {duration:g}s after {warmup:g}s of warmup...")
+            samples, seconds = drive(server.port, data, mix, concurrency, duration, warmup, seed_value)
+        finally:
+            server.stop()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    workers, worker_class = server_settings(workers, worker_class)
+    routes = {action: {'route': ROUTES[action], **summarize(samples[action], seconds)} for action in mix if samples.get(action)}
+    total = summarize([sample for action_samples in samples.values() for sample in action_samples], seconds)
+    for action, summary in routes.items():
+        log(f"  {action:<10} {summary['throughput_rps']:>9.1f} req/s  p50 {summary['p50_ms']:>8.1f} ms  p95 {summary['p95_ms']:>8.1f} ms  p99 {summary['p99_ms']:>8.1f} ms  errors {summary['error_rate']:.2%}")
+    return {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': _git_commit(),
+            'python': sys.version.split()[0],
+            'database': sqlalchemy.engine.make_url(database_uri).get_backend_name(),
+            'scale': scale,
+            'volumes': volumes(scale),
+            'concurrency': concurrency,
+            'duration': duration,
+            'warmup': warmup,
+            'mix': mix,
+            'workers': workers,
+            'worker_class': worker_class,
+            'env': env or {},
+            'seed': seed_value,
+        },
+        'routes': routes,
+        'total': total,
+    }
@@ -0,0 +1,121 @@
+import gc
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from statistics import median
+
+import orjson
+from flask import current_app
+from sqlalchemy import select
+
+from App.main import create_app
+from App.database import db, create_db
+from App.models import User, Job, Application
+from App.controllers import (
+    JobRow,
+    UserRow,
+    ApplicationRow,
+    JOB_ROW_COLUMNS,
+    USER_ROW_COLUMNS,
+    APPLICATION_ROW_COLUMNS,
+    as_rows
+)
+from .seed import seed, volumes
+
+# Compares the two ways of serving a listing, per row:
+#
+# - orm: ORM instances (polymorphic for users) serialized with the standard
+#   library encoder behind jsonify, as the list endpoints used to
+# - rows: a Core select of the listed columns into read model namedtuples,
+#   serialized with orjson, as the list endpoints do now
+#
+# For each listing it reports the median time to load and to serialize every
+# row, and the memory the loaded rows hold (tracemalloc), divided by the row count.
+
+DEFAULT_SCALE = 10000
+DEFAULT_REPEAT = 5
+
+LISTINGS = {
+    'jobs': (
+        lambda: Job.query.filter(Job.deleted_at.is_(None)).all(),
+        lambda: as_rows(JobRow, db.session.execute(select(*JOB_ROW_COLUMNS).where(Job.__table__.c.deleted_at.is_(None)))),
+    ),
+    'users': (
+        lambda: User.query.all(),
+        lambda: as_rows(UserRow, db.session.execute(select(*USER_ROW_COLUMNS))),
+    ),
+    'applications': (
+        lambda: Application.query.all(),
+        lambda: as_rows(ApplicationRow, db.session.execute(select(*APPLICATION_ROW_COLUMNS))),
+    ),
+}
+SERIALIZERS = {
+    'orm': lambda payload: current_app.json.dumps(payload),
+    'rows': orjson.dumps,
+}
+
+
+def _held_bytes(load):
+    # Memory still allocated once the rows are loaded, with the session's identity map holding them as it would
+    db.session.remove()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        rows = load()
+        held, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    count = len(rows)
+    del rows
+    db.session.remove()
+    return held, count
+
+def measure(load, serialize, repeat):
+    load_times, serialize_times = [], []
+    for _ in range(repeat):
+        db.session.remove()
+        start = time.perf_counter()
+        rows = load()
+        load_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        serialize([row.get_json() for row in rows])
+        serialize_times.append(time.perf_counter() - start)
+    held, count = _held_bytes(load)
+    count = max(count, 1)
+    return {
+        'rows': count,
+        'load_us_per_row': round(median(load_times) / count * 1e6, 3),
+        'serialize_us_per_row': round(median(serialize_times) / count * 1e6, 3),
+        'bytes_per_row': round(held / count),
+    }
+
+def run(scale=DEFAULT_SCALE, repeat=DEFAULT_REPEAT, seed_value=0, log=None):
+    directory = tempfile.mkdtemp(prefix='jobboard-read-models-')
+    app = create_app({'TESTING': True, 'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + os.path.join(directory, 'bench.db')})
+    try:
+        with app.app_context():
+            create_db()
+            counts = volumes(scale)
+            seed(random_seed=seed_value, **counts)
+            results = {}
+            for name, (orm, rows) in LISTINGS.items():
+                results[name] = {
+                    'orm': measure(orm, SERIALIZERS['orm'], repeat),
+                    'rows': measure(rows, SERIALIZERS['rows'], repeat),
+                }
+                if log:
+                    log(format_listing(name, results[name]))
+            db.engine.dispose()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return {'volumes': counts, 'repeat': repeat, 'listings': results}
+
+def format_listing(name, result):
+    orm, rows = result['orm'], result['rows']
+    lines = [f"{name} ({rows['rows']} rows)"]
+    for key, unit in (('load_us_per_row', 'us'), ('serialize_us_per_row', 'us'), ('bytes_per_row', 'B')):
+        saved = 1 - rows[key] / orm[key] if orm[key] else 0
+        lines.append(f"  {key[:-len('_per_row')]:<12} orm {orm[key]:>10} {unit}  rows {rows[key]:>10} {unit}  ({saved:.0%} less)")
+    return "\n".join(lines)
@@ -0,0 +1,94 @@
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from App.models import db, User, Admin, Employer, JobSeeker, Job, Application
+from App.controllers import rebuild_search_index, recount_applications, rebuild_categories
+from App.passwords import hash_password
+
+# Synthetic data for benchmarks, written with one executemany per table and chunk.
+# Every user shares one password hash so seeding does not spend its time hashing.
+
+PASSWORD = 'benchpass'
+CHUNK_SIZE = 5000
+
+CATEGORIES = ['Software Engineer', 'Data Analyst', 'Product Manager', 'Designer', 'Nurse', 'Accountant', 'Teacher', 'Sales']
+WORDS = ['python', 'sql', 'react', 'remote', 'senior', 'junior', 'cloud', 'customer', 'team', 'agile', 'finance', 'health']
+
+
+# Volumes for a scale, expressed as the number of job postings
+def volumes(scale):
+    return {
+        'employers': max(1, scale // 20),
+        'job_seekers': max(1, scale // 2),
+        'jobs': scale,
+        'applications': min(scale * 3, max(1, scale // 2) * scale),
+    }
+
+def _insert_chunks(target, rows):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.session.execute(insert(target), rows[start:start + CHUNK_SIZE])
+
+def _users(prefix, count, password):
+    return [
+        {'username': f'{prefix}{i}', 'password': password, 'email': f'{prefix}{i}@bench.test'}
+        for i in range(count)
+    ]
+
+# Fills an empty database and returns the ids that were created
+def seed(employers, job_seekers, jobs, applications, random_seed=0):
+    rng = random.Random(random_seed)
+    password = hash_password(PASSWORD)
+
+    _insert_chunks(Admin, [dict(row, user_type='admin') for row in _users('admin', 1, password)])
+    _insert_chunks(Employer, [
+        dict(row, user_type='employer', company_name=f'Company {i}')
+        for i, row in enumerate(_users('employer', employers, password))
+    ])
+    _insert_chunks(JobSeeker, [dict(row, user_type='job_seeker') for row in _users('seeker', job_seekers, password)])
+    db.session.commit()
+
+    admin_ids = [user_id for (user_id,) in db.session.query(Admin.id)]
+    employer_ids = [user_id for (user_id,) in db.session.query(Employer.id).order_by(Employer.id)]
+    seeker_ids = [user_id for (user_id,) in db.session.query(JobSeeker.id).order_by(JobSeeker.id)]
+
+    start = datetime(2024, 1, 1)
+    _insert_chunks(Job, [
+        {
+            'category': rng.choice(CATEGORIES),
+            'description': ' '.join(rng.choices(WORDS, k=8)),
+            'employer_id': rng.choice(employer_ids),
+            'date_posted': start + timedelta(minutes=i)
+        }
+        for i in range(jobs)
+    ])
+    db.session.commit()
+    job_ids = [job_id for (job_id,) in db.session.query(Job.id).order_by(Job.id)]
+
+    # Distinct (job, seeker) pairs, as the unique index requires
+    pairs = set()
+    while len(pairs) < applications:
+        pairs.add((rng.choice(job_ids), rng.choice(seeker_ids)))
+    _insert_chunks(Application, [
+        {
+            'job_id': job_id,
+            'job_seeker_id': seeker_id,
+            'application_text': ' '.join(rng.choices(WORDS, k=12)),
+            'is_accepted': rng.choice([None, None, True, False])
+        }
+        for job_id, seeker_id in sorted(pairs)
+    ])
+    db.session.commit()
+    rebuild_search_index()
+    recount_applications()
+    rebuild_categories()
+
+    application_ids = [application_id for (application_id,) in db.session.query(Application.application_id).order_by(Application.application_id)]
+    return {
+        'admins': admin_ids,
+        'employers': employer_ids,
+        'job_seekers': seeker_ids,
+        'jobs': job_ids,
+        'applications': application_ids,
+    }
@@ -1,5 +1,7 @@
 # gunicorn_config.py
+import glob
 import multiprocessing
+import os
 
 # The socket to bind.
 # "0.0.0.0" to bind to all interfaces. 8000 is the port number.
@@ -16,4 +18,13 @@ loglevel = 'info'
 
 # Where to log to
 accesslog = '-'  # '-' means log to stdout
-errorlog = '-'  # '-' means log to stderr
\ No newline at end of file
+errorlog = '-'  # '-' means log to stderr
+
+# Workers write their metrics to FLASK_METRICS_DIR for /metrics to add up;
+# counting starts over with every server start.
+def on_starting(server):
+    directory = os.environ.get('FLASK_METRICS_DIR')
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, 'metrics-*.json*')):
+            os.remove(path)
@@ -0,0 +1,87 @@
+"""job categories
+
+Revision ID: 13ef2e3b8f5e
+Revises: 6e3003e2852c
+Create Date: 2026-10-18 02:57:15.647258
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '13ef2e3b8f5e'
+down_revision = '6e3003e2852c'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+jobs = sa.table('jobs', sa.column('id', sa.Integer), sa.column('category', sa.String), sa.column('category_id', sa.Integer), sa.column('deleted_at', sa.DateTime))
+categories = sa.table('categories', sa.column('id', sa.Integer), sa.column('name', sa.String), sa.column('key', sa.String))
+category_facets = sa.table('category_facets', sa.column('category_id', sa.Integer), sa.column('job_count', sa.Integer))
+
+
+# Same as App.controllers.categories.category_key at the time of this migration
+def _category_key(name):
+    return " ".join((name or '').split()).casefold()[:100]
+
+def _backfill():
+    connection = op.get_bind()
+    ids = {}
+    after = 0
+    while True:
+        rows = connection.execute(
+            sa.select(jobs.c.id, jobs.c.category).where(jobs.c.id > after).order_by(jobs.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        new = {}
+        for _, category in rows:
+            key = _category_key(category)
+            if key not in ids:
+                new.setdefault(key, " ".join((category or '').split())[:100])
+        if new:
+            connection.execute(sa.insert(categories), [{'key': key, 'name': name} for key, name in new.items()])
+            ids.update(connection.execute(sa.select(categories.c.key, categories.c.id).where(categories.c.key.in_(list(new)))).all())
+        connection.execute(
+            sa.update(jobs).where(jobs.c.id == sa.bindparam('job_id')).values(category_id=sa.bindparam('linked_id')),
+            [{'job_id': job_id, 'linked_id': ids[_category_key(category)]} for job_id, category in rows]
+        )
+        after = rows[-1].id
+    connection.execute(sa.insert(category_facets).from_select(
+        ['category_id', 'job_count'],
+        sa.select(jobs.c.category_id, sa.func.count())
+        .where(jobs.c.category_id.is_not(None), jobs.c.deleted_at.is_(None))
+        .group_by(jobs.c.category_id)
+    ))
+
+
+def upgrade():
+    op.create_table('categories',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('key', sa.String(length=100), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('key')
+    )
+    op.create_table('category_facets',
+    sa.Column('category_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('job_count', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('category_id')
+    )
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.add_column(sa.Column('category_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('jobs_category_id_fkey', 'categories', ['category_id'], ['id'])
+    op.create_index('ix_jobs_category_id_date_posted_id', 'jobs', ['category_id', 'date_posted', 'id'], unique=False)
+    _backfill()
+
+
+def downgrade():
+    op.drop_index('ix_jobs_category_id_date_posted_id', table_name='jobs')
+    with op.batch_alter_table('jobs') as batch_op:
+        batch_op.drop_constraint('jobs_category_id_fkey', type_='foreignkey')
+        batch_op.drop_column('category_id')
+    op.drop_table('category_facets')
+    op.drop_table('categories')
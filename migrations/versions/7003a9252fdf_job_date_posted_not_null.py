@@ -0,0 +1,44 @@
+"""job date_posted not null
+
+Revision ID: 7003a9252fdf
+Revises: fa45dced1b90
+Create Date: 2026-10-18 05:12:40.118274
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7003a9252fdf'
+down_revision = 'fa45dced1b90'
+branch_labels = None
+depends_on = None
+
+
+# Listings and their cursors order jobs by (date_posted, id), so a job without
+# a date could neither be paged past nor get a cursor. Jobs that never had one
+# are dated to this migration, the earliest time they are known to exist.
+TABLES = ['jobs', 'archived_jobs']
+
+
+def _alter(table, nullable):
+    # Rebuilding jobs on SQLite must keep its AUTOINCREMENT
+    table_kwargs = {'sqlite_autoincrement': True} if table == 'jobs' else {}
+    with op.batch_alter_table(table, table_kwargs=table_kwargs) as batch_op:
+        batch_op.alter_column('date_posted', existing_type=sa.DateTime(), nullable=nullable)
+
+
+def upgrade():
+    now = datetime.utcnow()
+    for name in TABLES:
+        table = sa.table(name, sa.column('date_posted', sa.DateTime()))
+        op.execute(table.update().where(table.c.date_posted.is_(None)).values(date_posted=now))
+        _alter(name, False)
+
+
+def downgrade():
+    for name in reversed(TABLES):
+        _alter(name, True)
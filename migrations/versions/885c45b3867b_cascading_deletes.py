@@ -0,0 +1,58 @@
+"""cascading deletes
+
+Revision ID: 885c45b3867b
+Revises: 34aae572a804
+Create Date: 2026-10-18 02:26:33.270758
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '885c45b3867b'
+down_revision = '34aae572a804'
+branch_labels = None
+depends_on = None
+
+
+# The initial schema left its foreign keys unnamed. PostgreSQL names them
+# <table>_<column>_fkey; the same convention lets SQLite's batch mode find the
+# reflected ones so they can be recreated with ON DELETE CASCADE.
+NAMING_CONVENTION = {'fk': '%(table_name)s_%(column_0_name)s_fkey'}
+
+FOREIGN_KEYS = [
+    ('admins', 'users', 'id', 'id'),
+    ('employers', 'users', 'id', 'id'),
+    ('job_seekers', 'users', 'id', 'id'),
+    ('jobs', 'employers', 'employer_id', 'id'),
+    ('applications', 'jobs', 'job_id', 'id'),
+    ('applications', 'job_seekers', 'job_seeker_id', 'id'),
+]
+
+
+def _recreate_foreign_keys(ondelete):
+    for table in dict.fromkeys(table for table, _, _, _ in FOREIGN_KEYS):
+        with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+            for source, referent, column, remote_column in FOREIGN_KEYS:
+                if source != table:
+                    continue
+                name = f'{table}_{column}_fkey'
+                batch_op.drop_constraint(name, type_='foreignkey')
+                batch_op.create_foreign_key(name, referent, [column], [remote_column], ondelete=ondelete)
+
+
+def upgrade():
+    op.add_column('users', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_users_deleted_at'), 'users', ['deleted_at'], unique=False)
+    op.add_column('jobs', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.create_index(op.f('ix_jobs_deleted_at'), 'jobs', ['deleted_at'], unique=False)
+    _recreate_foreign_keys('CASCADE')
+
+
+def downgrade():
+    _recreate_foreign_keys(None)
+    op.drop_index(op.f('ix_jobs_deleted_at'), table_name='jobs')
+    op.drop_column('jobs', 'deleted_at')
+    op.drop_index(op.f('ix_users_deleted_at'), table_name='users')
+    op.drop_column('users', 'deleted_at')
@@ -0,0 +1,53 @@
+"""autoincrement job and application ids
+
+Revision ID: fa45dced1b90
+Revises: 27a4cb5f1ec3
+Create Date: 2026-10-18 03:24:08.821377
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fa45dced1b90'
+down_revision = '27a4cb5f1ec3'
+branch_labels = None
+depends_on = None
+
+
+# SQLite gives a new row the highest id in the table plus one, so ids of
+# archived (or purged) rows at the top were handed out again. AUTOINCREMENT
+# tables only ever go up; SQLite can only add it by rebuilding the table.
+# Other databases never reused ids in the first place.
+#
+# (table, id column, tables that may hold ids it handed out before)
+SEQUENCES = [
+    ('jobs', 'id', [('archived_jobs', 'id')]),
+    ('applications', 'application_id', [('archived_applications', 'application_id')]),
+    ('application_directory', 'application_id', [('archived_applications', 'application_id')]),
+]
+
+
+def _rebuild(table, autoincrement):
+    with op.batch_alter_table(table, recreate='always', table_kwargs={'sqlite_autoincrement': autoincrement}):
+        pass
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _rebuild('jobs', True)
+    _rebuild('applications', True)
+    # New ids start after every id already used, archived ones included
+    for table, column, others in SEQUENCES:
+        used = ', '.join(f"(SELECT coalesce(max({other_column}), 0) FROM {other})" for other, other_column in [(table, column), *others])
+        op.execute(f"DELETE FROM sqlite_sequence WHERE name = '{table}'")
+        op.execute(f"INSERT INTO sqlite_sequence (name, seq) SELECT '{table}', max({used}, 0)")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    _rebuild('applications', False)
+    _rebuild('jobs', False)